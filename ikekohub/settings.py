@@ -13,6 +13,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -147,6 +150,9 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'static'
+
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Default primary key field type
@@ -186,6 +192,54 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
 # DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL')
 
+# Parent notification outbox delivery
+PARENT_NOTIFICATION_BATCH_SIZE = 100
+PARENT_NOTIFICATION_MAX_ATTEMPTS = 5
+PARENT_NOTIFICATION_RETRY_DELAY = 60  # seconds, doubled after every failed attempt
+# 'immediate' sends one message per report; 'digest' groups each parent's reports into one message per window
+PARENT_NOTIFICATION_MODE = 'immediate'
+# Each digest covers the PARENT_DIGEST_WINDOW_HOURS ending at a beat run, so the beat below runs once per
+# window, anchored on PARENT_DIGEST_HOUR; the window has to divide a day for the runs to tile it
+PARENT_DIGEST_HOUR = 17
+PARENT_DIGEST_WINDOW_HOURS = 24
+if 24 % PARENT_DIGEST_WINDOW_HOURS:
+    raise ImproperlyConfigured("PARENT_DIGEST_WINDOW_HOURS must divide 24")
+
+# Shared between web and Celery workers, e.g. for the grading scheme version
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/1',
+    }
+}
+
+# Compiled grading schemes follow a version in CACHES; this is the fallback expiry, in seconds,
+# for when the shared cache cannot be reached
+GRADING_SCHEME_CACHE_SECONDS = 300
+
+# Processes used to render report card PDFs in bulk; None uses every core
+REPORT_CARD_RENDER_WORKERS = None
+
+# Processes a report card ZIP download renders missing cards with; 1 renders inline in the request, more
+# start one spawned pool per download, so pre-render with the render_report_cards command instead
+REPORT_CARD_STREAM_WORKERS = 1
+
+# Celery
+CELERY_BROKER_URL = 'redis://localhost:6379/0'
+CELERY_TASK_ACKS_LATE = True
+CELERY_BEAT_SCHEDULE = {
+    'drain-parent-notifications': {
+        'task': 'report_module.tasks.drain_parent_notifications',
+        'schedule': 30.0,
+    },
+    'build-parent-digests': {
+        'task': 'report_module.tasks.build_parent_digests',
+        'schedule': crontab(minute=0, hour=','.join(
+            str((PARENT_DIGEST_HOUR + start) % 24) for start in range(0, 24, PARENT_DIGEST_WINDOW_HOURS)
+        )),
+    },
+}
+
 
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
@@ -219,6 +273,9 @@ SWAGGER_SETTINGS = {
     'SECURITY_REQUIREMENTS': [{'Bearer': []}]
 }
 
+# Gate check-ins after this time of day (HH:MM) are marked late, in each school's School.time_zone
+ATTENDANCE_LATE_CUTOFF = '08:00'
+
 TENANT_MODEL = 'public_app.School'
 TENANT_DOMAIN_MODEL = 'public_app.Domain'
 
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:16
+
+import public_app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('public_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='school',
+            name='time_zone',
+            field=models.CharField(default='UTC', max_length=64, validators=[public_app.models.validate_time_zone]),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import zoneinfo
+
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
@@ -6,9 +8,16 @@ from django.db.models.functions.text import Lower
 from django_tenants.models import DomainMixin, TenantMixin
 # Create your models here.
 
+def validate_time_zone(value):
+    if value not in zoneinfo.available_timezones():
+        raise ValidationError(f"{value} is not a known time zone")
+
+
 class School(TenantMixin):
     name = models.CharField(max_length=255, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Local time zone of the school, used for gate check-in dates and the late cutoff
+    time_zone = models.CharField(max_length=64, default='UTC', validators=[validate_time_zone])
 
     admin_email = models.EmailField()
     admin_first_name = models.CharField(max_length=30)
@@ -5,7 +5,8 @@ from django.urls import reverse
 from django.db.models import Avg, Count
 from .models import (
     Subject, ClassLevel, Attendance, DailyReport, DailySubjectReport,
-    WeeklyReport, WeeklySubjectSummary, TermReport, TermSubjectReport
+    WeeklyReport, WeeklySubjectSummary, TermReport, TermSubjectReport,
+    TermCalendar, GradingScheme, GradeBoundary
 )
 
 
@@ -33,6 +34,27 @@ class AttendanceAdmin(admin.ModelAdmin):
     recorded_by_name.short_description = 'Recorded By'
 
 
+@admin.register(TermCalendar)
+class TermCalendarAdmin(admin.ModelAdmin):
+    list_display = ['academic_year', 'term', 'start_date', 'end_date']
+    list_filter = ['academic_year', 'term']
+    ordering = ['-start_date']
+
+
+class GradeBoundaryInline(admin.TabularInline):
+    model = GradeBoundary
+    extra = 0
+    ordering = ['-min_score']
+
+
+@admin.register(GradingScheme)
+class GradingSchemeAdmin(admin.ModelAdmin):
+    list_display = ['name', 'exam_weight', 'continuous_assessment_weight', 'participation_weight', 'is_active']
+    list_filter = ['is_active']
+    readonly_fields = ['created_at', 'updated_at']
+    inlines = [GradeBoundaryInline]
+
+
 class DailySubjectReportInline(admin.TabularInline):
     model = DailySubjectReport
     extra = 0
@@ -374,8 +396,9 @@ class SubjectAdmin(admin.ModelAdmin):
 
 @admin.register(ClassLevel)
 class ClassLevelAdmin(admin.ModelAdmin):
-    list_display = ['name', 'code', 'age_range', 'is_toddler_class', 'students_count', 'subjects_count', 'created_at']
-    list_filter = ['is_toddler_class', 'created_at']
+    list_display = ['name', 'code', 'age_range', 'is_toddler_class', 'next_level', 'is_final_level',
+                    'students_count', 'subjects_count', 'created_at']
+    list_filter = ['is_toddler_class', 'is_final_level', 'created_at']
     search_fields = ['name', 'code']
     filter_horizontal = ['subjects']
     readonly_fields = ['created_at']
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ReportModuleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'report_module'
+
+    def ready(self):
+        import report_module.signals
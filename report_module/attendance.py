@@ -0,0 +1,296 @@
+# report_module/attendance.py
+import re
+import zoneinfo
+from datetime import datetime, time
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django_tenants.utils import get_tenant_model
+
+from .models import Attendance, AttendanceBitmap, GateScan, TermReport
+
+
+# "<device user id><separator><YYYY-MM-DD HH:MM[:SS]>..." - covers CSV exports and tab separated attlog files
+PUNCH_LINE = re.compile(
+    r'^\s*"?(?P<user_id>[^,;\t"]+?)"?\s*[,;\t]\s*"?(?P<timestamp>\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2})?)'
+)
+MAX_REPORTED_LINES = 20
+
+
+# Use apps.get_model to avoid circular imports
+def get_student_profile_model():
+    return apps.get_model('student_app', 'StudentProfile')
+
+
+def get_late_cutoff():
+    """Time of day after which a first check-in counts as late (ATTENDANCE_LATE_CUTOFF, "HH:MM")"""
+    cutoff = getattr(settings, 'ATTENDANCE_LATE_CUTOFF', '08:00')
+    if isinstance(cutoff, time):
+        return cutoff
+    return datetime.strptime(cutoff, '%H:%M').time()
+
+
+def school_timezone():
+    """Time zone of the current school (School.time_zone), in which gate scans are dated and judged late"""
+    name = getattr(getattr(connection, 'tenant', None), 'time_zone', None)
+    if name is None:
+        # schema_context() installs a stand-in tenant that only knows its schema name
+        name = get_tenant_model().objects.filter(schema_name=connection.schema_name).values_list(
+            'time_zone', flat=True
+        ).first()
+    return zoneinfo.ZoneInfo(name) if name else timezone.get_default_timezone()
+
+
+def punch_status(time_in, current_status, cutoff):
+    if current_status == Attendance.AttendanceStatus.EXCUSED:
+        return Attendance.AttendanceStatus.EXCUSED
+    if time_in > cutoff:
+        return Attendance.AttendanceStatus.LATE
+    return Attendance.AttendanceStatus.PRESENT
+
+
+def upsert_punches(punches, recorded_by_id, batch_size=1000):
+    """
+    Merge punches into Attendance.
+
+    `punches` maps (student_id, date) to (first_time, last_time). The earliest
+    punch of the day becomes time_in and the latest later one time_out, merged
+    with what is already stored, and status is derived from time_in against the
+    late cutoff. Excused days keep their status. Returns the number of rows written.
+
+    New student-days are inserted first with ON CONFLICT DO NOTHING, then every
+    row is locked and merged, so concurrent flushers touching the same day
+    queue up behind each other instead of overwriting each other's times.
+    """
+    if not punches:
+        return 0
+
+    cutoff = get_late_cutoff()
+    keys = sorted(punches)
+
+    with transaction.atomic():
+        Attendance.objects.bulk_create(
+            [
+                Attendance(
+                    student_id=student_id,
+                    date=date,
+                    status=punch_status(first, None, cutoff),
+                    time_in=first,
+                    time_out=last if last > first else None,
+                    recorded_by_id=recorded_by_id
+                )
+                for (student_id, date), (first, last) in ((key, punches[key]) for key in keys)
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
+
+        # Locked in a fixed order so flushers with overlapping batches cannot deadlock
+        rows = {
+            (row.student_id, row.date): row
+            for row in Attendance.objects.select_for_update().filter(
+                student_id__in={student_id for student_id, _ in keys}, date__in={date for _, date in keys}
+            ).order_by('student_id', 'date')
+        }
+
+        now = timezone.now()
+        records = []
+        for key in keys:
+            first, last = punches[key]
+            record = rows[key]
+            record.time_in = min(t for t in (record.time_in, first) if t is not None)
+            record.time_out = max((t for t in (record.time_out, last) if t is not None), default=None)
+            if record.time_out is not None and record.time_out <= record.time_in:
+                record.time_out = None
+            record.status = punch_status(record.time_in, record.status, cutoff)
+            record.updated_at = now
+            records.append(record)
+
+        Attendance.objects.bulk_update(records, ['status', 'time_in', 'time_out', 'updated_at'], batch_size=batch_size)
+        # Bulk writes skip the model signals, so the bitmaps are updated here
+        AttendanceBitmap.apply((record.student_id, record.date, record.status) for record in records)
+
+    return len(records)
+
+
+def collapse_punch(punches, key, punch_time):
+    """Widen the (first, last) window stored for key to include punch_time"""
+    window = punches.get(key)
+    if window is None:
+        punches[key] = (punch_time, punch_time)
+    else:
+        punches[key] = (min(window[0], punch_time), max(window[1], punch_time))
+
+
+def flush_gate_scans(batch_size=1000):
+    """
+    Fold one batch of queued gate scans into Attendance.
+
+    Scans are locked with SKIP LOCKED so several flushers can run side by side,
+    and are only marked processed in the same transaction as the upsert, which
+    gives at-least-once delivery. Returns the number of scans consumed.
+    """
+    StudentProfile = get_student_profile_model()
+
+    with transaction.atomic():
+        scans = list(
+            GateScan.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True)
+            .order_by('id')[:batch_size]
+        )
+        if not scans:
+            return 0
+
+        students = dict(
+            StudentProfile.objects.filter(
+                admission_number__in={scan.admission_number for scan in scans}
+            ).values_list('admission_number', 'id')
+        )
+
+        school_tz = school_timezone()
+        punches_by_recorder = {}
+        unmatched = []
+        for scan in scans:
+            student_id = students.get(scan.admission_number)
+            if student_id is None:
+                unmatched.append(scan.id)
+                continue
+            scanned_at = timezone.localtime(scan.scanned_at, school_tz)
+            punches = punches_by_recorder.setdefault(scan.recorded_by_id, {})
+            collapse_punch(punches, (student_id, scanned_at.date()), scanned_at.time().replace(microsecond=0))
+
+        for recorded_by_id, punches in punches_by_recorder.items():
+            upsert_punches(punches, recorded_by_id)
+
+        now = timezone.now()
+        GateScan.objects.filter(id__in=[scan.id for scan in scans]).exclude(id__in=unmatched).update(
+            processed_at=now
+        )
+        if unmatched:
+            GateScan.objects.filter(id__in=unmatched).update(processed_at=now, error='Unknown admission number')
+
+    return len(scans)
+
+
+def build_admission_lookup():
+    """Normalized admission number -> student id, loaded once per import"""
+    StudentProfile = get_student_profile_model()
+    return {
+        admission_number.strip().upper(): student_id
+        for admission_number, student_id in StudentProfile.objects.values_list('admission_number', 'id')
+    }
+
+
+def ingest_punch_log(lines, recorded_by_id, flush_every=5000):
+    """
+    Stream a biometric device punch log into Attendance.
+
+    Device user ids are matched to StudentProfile.admission_number. Punches are
+    collapsed to first-in / last-out per student and day and written with
+    batched upserts whenever `flush_every` student-days are pending; because the
+    upsert merges with stored times, a day split across flushes still ends up
+    with its earliest and latest punch. Memory is bounded by the pending
+    student-days and the number of distinct unmatched device ids, not by the
+    size of the log.
+    """
+    lookup = build_admission_lookup()
+    punches = {}
+    unmatched = {}
+    malformed = []
+    stats = {'lines': 0, 'punches': 0, 'malformed': 0, 'unmatched_punches': 0, 'attendance_rows': 0}
+
+    for line_number, line in enumerate(lines, start=1):
+        stats['lines'] += 1
+        match = PUNCH_LINE.match(line)
+        if not match:
+            if line.strip():
+                stats['malformed'] += 1
+                if len(malformed) < MAX_REPORTED_LINES:
+                    malformed.append(line_number)
+            continue
+
+        user_id = match.group('user_id').strip()
+        try:
+            punched_at = datetime.fromisoformat(match.group('timestamp'))
+        except ValueError:
+            stats['malformed'] += 1
+            if len(malformed) < MAX_REPORTED_LINES:
+                malformed.append(line_number)
+            continue
+
+        student_id = lookup.get(user_id.upper())
+        if student_id is None:
+            stats['unmatched_punches'] += 1
+            entry = unmatched.setdefault(user_id, {'device_user_id': user_id, 'first_line': line_number, 'punches': 0})
+            entry['punches'] += 1
+            continue
+
+        stats['punches'] += 1
+        collapse_punch(punches, (student_id, punched_at.date()), punched_at.time().replace(microsecond=0))
+        if len(punches) >= flush_every:
+            stats['attendance_rows'] += upsert_punches(punches, recorded_by_id)
+            punches = {}
+
+    stats['attendance_rows'] += upsert_punches(punches, recorded_by_id)
+    stats['unmatched'] = sorted(unmatched.values(), key=lambda entry: entry['first_line'])
+    stats['malformed_lines'] = malformed
+    return stats
+
+
+@transaction.atomic
+def fill_term_attendance(term_calendar, class_level, teacher=None):
+    """
+    Fill the attendance summary of every unfinalized term report in a class from Attendance.
+
+    School days are the dates on which attendance was taken for anyone in the
+    class during the term. Per-student counts come from one grouped aggregate
+    and every report is written with one bulk_update, attendance_percentage
+    included since bulk_update skips TermReport.save. Pass a teacher to limit
+    it to their own reports. Returns the updated reports.
+    """
+    reports = TermReport.objects.select_for_update().filter(
+        class_level=class_level, academic_year=term_calendar.academic_year, term=term_calendar.term,
+        finalized=False
+    )
+    if teacher is not None:
+        reports = reports.filter(teacher=teacher)
+    reports = list(reports)
+    if not reports:
+        return []
+
+    records = Attendance.objects.filter(
+        student_id__in=[report.student_id for report in reports],
+        date__range=[term_calendar.start_date, term_calendar.end_date]
+    )
+    total_school_days = records.values('date').distinct().count()
+    counts = {
+        row['student_id']: row for row in records.values('student_id').annotate(
+            present=Count('id', filter=Q(status='present')),
+            absent=Count('id', filter=Q(status='absent')),
+            late=Count('id', filter=Q(status='late'))
+        ).order_by()
+    }
+
+    now = timezone.now()
+    for report in reports:
+        row = counts.get(report.student_id, {})
+        report.total_school_days = total_school_days
+        report.days_present = row.get('present', 0)
+        report.days_absent = row.get('absent', 0)
+        report.days_late = row.get('late', 0)
+        report.attendance_percentage = (
+            (Decimal(report.days_present * 100) / total_school_days).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            if total_school_days else Decimal('0.00')
+        )
+        report.updated_at = now
+
+    TermReport.objects.bulk_update(
+        reports,
+        ['total_school_days', 'days_present', 'days_absent', 'days_late', 'attendance_percentage', 'updated_at'],
+        batch_size=500
+    )
+    return reports
@@ -0,0 +1,79 @@
+# report_module/comparison.py
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, IntegerField, Value, When, Window
+from django.db.models.functions import Cast, Lag, Left
+
+from .models import TermReport, TermSubjectReport
+
+# Position of each term within an academic year
+TERM_INDEX = {
+    TermReport.TermChoices.FIRST: 1,
+    TermReport.TermChoices.SECOND: 2,
+    TermReport.TermChoices.THIRD: 3,
+}
+
+
+def term_ordinal(prefix=''):
+    """
+    Chronological position of a term: the academic year's starting year * 10 plus the term index.
+
+    Academic years are stored as 'YYYY-YYYY', so the first four characters
+    give the starting year. `prefix` points the expression at a related
+    TermReport, e.g. 'term_report__'.
+    """
+    return Cast(Left(f'{prefix}academic_year', 4), IntegerField()) * 10 + Case(
+        *[When(**{f'{prefix}term': term, 'then': Value(index)}) for term, index in TERM_INDEX.items()],
+        output_field=IntegerField()
+    )
+
+
+def term_comparisons(students, up_to=None):
+    """
+    Each subject score of the given students next to the same subject's score the term before.
+
+    LAG() runs over every earlier term of the student, partitioned by student
+    and subject and ordered by term_ordinal(), so the whole comparison is one
+    query. `up_to` is an optional (academic_year, term); later terms are left
+    out and only that term's rows are returned. Rows come back ordered by
+    student, term and subject; the first term of a subject has no previous score.
+    """
+    ordinal = term_ordinal('term_report__')
+    window = {'partition_by': [F('term_report__student_id'), F('subject_id')], 'order_by': ordinal.asc()}
+    rows = TermSubjectReport.objects.filter(term_report__student__in=students).annotate(
+        ordinal=ordinal,
+        previous_score=Window(Lag('total_score'), **window),
+        delta=ExpressionWrapper(
+            F('total_score') - Window(Lag('total_score'), **window),
+            output_field=DecimalField(max_digits=6, decimal_places=2)
+        ),
+        previous_academic_year=Window(Lag('term_report__academic_year'), **window),
+        previous_term=Window(Lag('term_report__term'), **window),
+    )
+    target = None
+    if up_to is not None:
+        academic_year, term = up_to
+        target = int(academic_year[:4]) * 10 + TERM_INDEX[term]
+        # Earlier terms must stay in the window input; only the output is narrowed below
+        rows = rows.filter(ordinal__lte=target)
+
+    comparisons = []
+    for row in rows.values(
+        'term_report__student_id', 'subject_id', 'subject__name', 'term_report__academic_year',
+        'term_report__term', 'total_score', 'grade', 'ordinal', 'previous_score', 'delta',
+        'previous_academic_year', 'previous_term'
+    ).order_by('term_report__student_id', 'ordinal', 'subject__name'):
+        if target is not None and row['ordinal'] != target:
+            continue
+        comparisons.append({
+            'student_id': row['term_report__student_id'],
+            'subject_id': row['subject_id'],
+            'subject': row['subject__name'],
+            'academic_year': row['term_report__academic_year'],
+            'term': row['term_report__term'],
+            'score': row['total_score'],
+            'grade': row['grade'],
+            'previous_academic_year': row['previous_academic_year'],
+            'previous_term': row['previous_term'],
+            'previous_score': row['previous_score'],
+            'delta': row['delta'],
+        })
+    return comparisons
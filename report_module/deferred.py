@@ -0,0 +1,33 @@
+# report_module/deferred.py
+import threading
+
+from django.db import connection, transaction
+
+_pending = threading.local()
+
+
+def defer_until_commit(name, key, callback):
+    """
+    Collect `key` and call callback(keys) once when the current transaction commits.
+
+    Signal handlers use this so a batch of row writes in one transaction
+    triggers one recomputation per distinct key instead of one per row. Keys
+    gathered in a transaction (or savepoint) that rolls back are dropped with
+    it. Outside a transaction the callback runs immediately.
+    """
+    batch = getattr(_pending, name, None)
+    # The batch is still open while its callback is queued on this connection
+    if batch is not None and any(entry[1] is batch['run'] for entry in connection.run_on_commit):
+        batch['keys'].add(key)
+        return
+
+    keys = {key}
+
+    def run():
+        if getattr(_pending, name, None) is batch:
+            delattr(_pending, name)
+        callback(keys)
+
+    batch = {'keys': keys, 'run': run}
+    setattr(_pending, name, batch)
+    transaction.on_commit(run)
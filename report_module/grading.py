@@ -0,0 +1,105 @@
+# report_module/grading.py
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Round
+
+from .models import CompiledGradingScheme, TermReport, TermSubjectReport, to_hundredths
+from .ranking import refresh_rankings_for_reports
+
+
+def grade_matrix(cells):
+    """
+    Weighted totals and letter grades for a whole score matrix.
+
+    `cells` is a list of (exam, continuous_assessment, participation) scores.
+    Everything is computed on integer hundredths with the school's grading
+    scheme, so the results match TermSubjectReport.compute_scores exactly.
+    Returns a list of (total, grade).
+    """
+    scheme = CompiledGradingScheme.current()
+    totals = [scheme.total([to_hundredths(score) for score in cell]) for cell in cells]
+    return [(Decimal(total).scaleb(-2), scheme.grade(total)) for total in totals]
+
+
+@transaction.atomic
+def upsert_term_scores(entries, batch_size=500):
+    """
+    Write graded scores for many (term report, subject) pairs in one upsert.
+
+    `entries` is a list of (term_report_id, subject_id, exam, continuous_assessment,
+    participation). Existing rows keep their rubric and comments; new rows are
+    created with them blank for the teacher to fill in. Stored averages and
+    class rankings of the affected reports are refreshed. Returns the rows written.
+    """
+    graded = grade_matrix([entry[2:] for entry in entries])
+    rows = [
+        TermSubjectReport(
+            term_report_id=term_report_id,
+            subject_id=subject_id,
+            exam_score=exam,
+            continuous_assessment=continuous_assessment,
+            class_participation=participation,
+            total_score=total,
+            grade=grade
+        )
+        for (term_report_id, subject_id, exam, continuous_assessment, participation), (total, grade)
+        in zip(entries, graded)
+    ]
+    TermSubjectReport.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['term_report', 'subject'],
+        update_fields=['exam_score', 'continuous_assessment', 'class_participation'] + TermSubjectReport.computed_fields
+    )
+    term_report_ids = {row.term_report_id for row in rows}
+    TermReport.refresh_averages(id__in=term_report_ids)
+    refresh_rankings_for_reports(term_report_ids)
+    return rows
+
+
+def recompute_term_scores(academic_year, include_finalized=False, batch_size=2000):
+    """
+    Re-derive total_score and grade for a whole academic year under the active scheme.
+
+    Rows are processed in id batches, each with one UPDATE that computes the
+    weighted total and one that maps it to a letter, so nothing is loaded into
+    Python. PostgreSQL rounds numerics half away from zero, which matches the
+    half-up rounding of compute_scores for non-negative scores. Finalized
+    reports keep their grades unless include_finalized is set. Returns the
+    number of rows updated.
+    """
+    scheme = CompiledGradingScheme.current()
+    exam_weight, assessment_weight, participation_weight = scheme.weights
+    total = Round(
+        (F('exam_score') * exam_weight + F('continuous_assessment') * assessment_weight
+         + F('class_participation') * participation_weight) / 100,
+        precision=2,
+        output_field=DecimalField(max_digits=5, decimal_places=2)
+    )
+    # Highest boundary first, so the first matching When wins
+    grade = Case(
+        *[
+            When(total_score__gte=Decimal(boundary).scaleb(-2), then=Value(letter))
+            for boundary, letter in reversed(list(zip(scheme.boundaries, scheme.letters[1:])))
+        ],
+        default=Value(scheme.letters[0])
+    )
+
+    rows = TermSubjectReport.objects.filter(term_report__academic_year=academic_year).order_by('id')
+    if not include_finalized:
+        rows = rows.filter(term_report__finalized=False)
+    updated = 0
+    last_id = 0
+    while True:
+        # Keyset batches keep every statement on the primary key index
+        batch = list(rows.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+        if not batch:
+            return updated
+        with transaction.atomic():
+            batch_rows = TermSubjectReport.objects.filter(id__in=batch)
+            batch_rows.update(total_score=total)
+            updated += batch_rows.update(grade=grade)
+        last_id = batch[-1]
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from report_module.models import TermReport
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored overall_average and subject_count of term reports"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--academic-year', help="Only backfill this academic year, e.g. 2024-2025")
+
+    def handle(self, *args, **options):
+        academic_years = TermReport.objects.order_by('academic_year').values_list(
+            'academic_year', flat=True
+        ).distinct()
+        if options['academic_year']:
+            academic_years = [options['academic_year']]
+
+        # One UPDATE per academic year keeps each statement's lock footprint bounded
+        for academic_year in academic_years:
+            updated = TermReport.refresh_averages(academic_year=academic_year)
+            self.stdout.write(f"{academic_year}: {updated} term reports")
+
+        self.stdout.write(self.style.SUCCESS("Term report averages backfilled"))
@@ -0,0 +1,56 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from report_module.models import DailyReport
+from report_module.serializer import DailyReportSerializer, DailyReportProjection
+
+
+class Command(BaseCommand):
+    help = "Compare DailyReportSerializer with the projection fast path for one class-week of daily reports"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--class-level', type=int, required=True, help="ClassLevel id")
+        parser.add_argument('--week-start', required=True, help="First day of the week, YYYY-MM-DD")
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            week_start = date.fromisoformat(options['week_start'])
+        except ValueError:
+            raise CommandError("--week-start must be YYYY-MM-DD")
+
+        def reports():
+            return DailyReport.objects.filter(
+                class_level_id=options['class_level'],
+                date__range=[week_start, week_start + timedelta(days=6)]
+            ).order_by('-date', 'student__user__first_name')
+
+        paths = [
+            ('serializer', lambda: DailyReportSerializer(reports(), many=True).data),
+            ('serializer + eager loading', lambda: DailyReportSerializer(
+                reports().select_related('student__user', 'teacher__user', 'class_level')
+                .prefetch_related('subject_reports__subject'),
+                many=True
+            ).data),
+            ('projection', lambda: DailyReportProjection.serialize(reports())),
+        ]
+
+        results = {}
+        for name, run in paths:
+            with CaptureQueriesContext(connection) as queries:
+                rows = len(run())
+            started = time.process_time()
+            for _ in range(options['repeat']):
+                run()
+            cpu = (time.process_time() - started) / options['repeat']
+            results[name] = cpu
+            self.stdout.write(f"{name:<28} {rows:>5} reports {len(queries):>6} queries {cpu * 1000:>9.1f} ms CPU")
+
+        if results['projection']:
+            self.stdout.write(self.style.SUCCESS(
+                f"projection is {results['serializer'] / results['projection']:.1f}x cheaper than the serializer"
+            ))
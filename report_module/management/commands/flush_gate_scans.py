@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django_tenants.utils import schema_context
+
+from report_module.attendance import flush_gate_scans
+from report_module.tasks import tenant_schemas
+
+
+class Command(BaseCommand):
+    help = "Fold queued gate scanner check-ins into Attendance for every school"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help="Only flush this school's schema")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--loop', action='store_true', help="Keep polling the queues instead of exiting")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to wait when every queue is empty")
+
+    def flush_schema(self, schema_name, batch_size):
+        flushed = 0
+        with schema_context(schema_name):
+            while True:
+                batch = flush_gate_scans(batch_size=batch_size)
+                flushed += batch
+                if not batch:
+                    return flushed
+
+    def handle(self, *args, **options):
+        schemas = [options['schema']] if options['schema'] else None
+        total = 0
+        while True:
+            flushed = sum(
+                self.flush_schema(schema_name, options['batch_size'])
+                for schema_name in schemas or tenant_schemas()
+            )
+            total += flushed
+            if not options['loop']:
+                break
+            if not flushed:
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Flushed {total} gate scans"))
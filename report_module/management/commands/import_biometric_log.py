@@ -0,0 +1,42 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_tenant_model, schema_context
+
+from report_module.attendance import ingest_punch_log
+
+
+class Command(BaseCommand):
+    help = "Import a biometric device punch log (CSV or tab separated) into Attendance"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', required=True, help="Schema of the school the log belongs to")
+        parser.add_argument('path', help="Punch log file; each line starts with the device user id and a timestamp")
+        parser.add_argument('--recorded-by', type=int, required=True, help="TeacherProfile id recorded as the marker")
+        parser.add_argument('--encoding', default='utf-8')
+
+    def handle(self, *args, **options):
+        if not get_tenant_model().objects.filter(schema_name=options['schema']).exists():
+            raise CommandError(f"School schema {options['schema']} does not exist")
+
+        with schema_context(options['schema']):
+            TeacherProfile = apps.get_model('teacher_app', 'TeacherProfile')
+            if not TeacherProfile.objects.filter(id=options['recorded_by']).exists():
+                raise CommandError(f"Teacher with ID {options['recorded_by']} does not exist")
+
+            with open(options['path'], encoding=options['encoding'], errors='replace') as log:
+                stats = ingest_punch_log(log, options['recorded_by'])
+
+        self.stdout.write(
+            f"{stats['lines']} lines, {stats['punches']} punches matched, "
+            f"{stats['attendance_rows']} attendance rows written"
+        )
+        if stats['malformed']:
+            self.stdout.write(self.style.WARNING(
+                f"{stats['malformed']} malformed lines, e.g. {stats['malformed_lines']}"
+            ))
+        for entry in stats['unmatched']:
+            self.stdout.write(self.style.WARNING(
+                f"Unmatched device user {entry['device_user_id']}: {entry['punches']} punches "
+                f"(first on line {entry['first_line']})"
+            ))
+        self.stdout.write(self.style.SUCCESS("Biometric log imported"))
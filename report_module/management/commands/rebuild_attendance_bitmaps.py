@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from report_module.models import TermCalendar
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-term attendance bitmaps from Attendance records"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--academic-year', help="Only rebuild terms of this academic year, e.g. 2024-2025")
+        parser.add_argument('--term', help="Only rebuild this term (first, second or third)")
+
+    def handle(self, *args, **options):
+        terms = TermCalendar.objects.all().order_by('start_date')
+        if options['academic_year']:
+            terms = terms.filter(academic_year=options['academic_year'])
+        if options['term']:
+            terms = terms.filter(term=options['term'])
+
+        for term_calendar in terms:
+            students = term_calendar.rebuild_bitmaps()
+            self.stdout.write(f"{term_calendar}: rebuilt {students} bitmaps")
+
+        self.stdout.write(self.style.SUCCESS("Attendance bitmaps rebuilt"))
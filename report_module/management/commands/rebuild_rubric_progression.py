@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from report_module.models import RubricProgression
+
+
+class Command(BaseCommand):
+    help = "Rebuild the rubric progression table from DailySubjectReport records"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--student', type=int, action='append', dest='students',
+                            help="Only rebuild this student id; may be repeated")
+        parser.add_argument('--subject', type=int, action='append', dest='subjects',
+                            help="Only rebuild this subject id; may be repeated")
+
+    def handle(self, *args, **options):
+        written = RubricProgression.rebuild(options['students'], options['subjects'])
+        self.stdout.write(self.style.SUCCESS(f"Rubric progression rebuilt: {written} rows"))
@@ -0,0 +1,46 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from report_module.models import TermReport
+from report_module.report_cards import render_report_cards
+
+
+class Command(BaseCommand):
+    help = "Render (or re-render) term report card PDFs into storage"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--academic-year', help="Only render this academic year, e.g. 2024-2025")
+        parser.add_argument('--term', help="Only render this term")
+        parser.add_argument('--class-level', type=int, help="Only render this class level id")
+        parser.add_argument('--finalized-only', action='store_true', help="Skip reports that are not finalized")
+        parser.add_argument('--workers', type=int, help="Render processes (default REPORT_CARD_RENDER_WORKERS)")
+        parser.add_argument('--force', action='store_true', help="Re-render cards that are already stored")
+
+    def handle(self, *args, **options):
+        reports = TermReport.objects.all()
+        if options['academic_year']:
+            reports = reports.filter(academic_year=options['academic_year'])
+        if options['term']:
+            reports = reports.filter(term=options['term'])
+        if options['class_level']:
+            reports = reports.filter(class_level_id=options['class_level'])
+        if options['finalized_only']:
+            reports = reports.filter(finalized=True)
+        report_ids = list(reports.values_list('id', flat=True))
+
+        workers = options['workers'] or getattr(settings, 'REPORT_CARD_RENDER_WORKERS', None) or os.cpu_count() or 1
+        started = time.perf_counter()
+        errors = {}
+        render_report_cards(report_ids, workers=workers, force=options['force'], errors=errors)
+        elapsed = max(time.perf_counter() - started, 1e-6)
+
+        rate = len(report_ids) / elapsed
+        self.stdout.write(
+            f"{len(report_ids)} cards in {elapsed:.2f}s: {rate:.1f} cards/s, {rate / workers:.1f} cards/s per worker"
+        )
+        for report_id, error in errors.items():
+            self.stdout.write(self.style.WARNING(f"Term report {report_id} not rendered: {error}"))
+        self.stdout.write(self.style.SUCCESS("Report cards rendered"))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_module', '0002_initial'),
+        ('student_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.CharField(help_text='e.g., 2024-2025', max_length=20)),
+                ('term', models.CharField(choices=[('first', 'First Term'), ('second', 'Second Term'), ('third', 'Third Term')], max_length=10)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['start_date', 'end_date'], name='report_modu_start_d_f5f5e2_idx')],
+                'unique_together': {('academic_year', 'term')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('days', models.BinaryField(default=bytes)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='student_app.studentprofile')),
+                ('term_calendar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='report_module.termcalendar')),
+            ],
+            options={
+                'unique_together': {('student', 'term_calendar')},
+            },
+        ),
+    ]
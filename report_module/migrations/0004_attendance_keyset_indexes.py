@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_module', '0003_attendance_bitmaps'),
+        ('student_app', '0001_initial'),
+        ('teacher_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['-date', '-id'], name='attendance_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', '-date', '-id'], name='attendance_student_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_module', '0004_attendance_keyset_indexes'),
+        ('teacher_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GateScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('admission_number', models.CharField(max_length=20)),
+                ('scanned_at', models.DateTimeField()),
+                ('device_id', models.CharField(blank=True, max_length=50)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('error', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('recorded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='teacher_app.teacherprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['processed_at', 'id'], name='report_modu_process_374dc5_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_module', '0006_parent_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parentnotification',
+            name='digest_key',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:56
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_TRIGGERS = [
+    ('report_module_dailyreport', ['general_notes', 'parent_message', 'social_interaction']),
+    ('report_module_dailysubjectreport', ['performance_notes']),
+    ('report_module_termreport', ['teacher_comment']),
+]
+
+
+def trigger_sql(table, columns):
+    first_column, columns = columns[0], ', '.join(columns)
+    return [
+        f"""
+        CREATE TRIGGER {table}_search_update
+        BEFORE INSERT OR UPDATE OF {columns} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION
+        tsvector_update_trigger(search_vector, 'pg_catalog.english', {columns})
+        """,
+        # Touch a source column once so the trigger fills existing rows
+        f"UPDATE {table} SET {first_column} = {first_column}",
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_module', '0007_notification_digest_key'),
+        ('student_app', '0001_initial'),
+        ('teacher_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyreport',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='dailysubjectreport',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='termreport',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='dailyreport',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='dailyreport_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailysubjectreport',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='dailysubject_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='termreport',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='termreport_search_idx'),
+        ),
+    ] + [
+        migrations.RunSQL(
+            trigger_sql(table, columns),
+            reverse_sql=f"DROP TRIGGER IF EXISTS {table}_search_update ON {table}",
+        )
+        for table, columns in SEARCH_TRIGGERS
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_module', '0008_report_search_vectors'),
+        ('student_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RubricProgression',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=200)),
+                ('introduced_on', models.DateField(blank=True, null=True)),
+                ('working_on', models.DateField(blank=True, null=True)),
+                ('mastered_on', models.DateField(blank=True, null=True)),
+                ('latest_rating', models.CharField(choices=[('introduced', 'Introduced'), ('working', 'Working'), ('mastered', 'Mastered'), ('not_applicable', 'Not Applicable')], max_length=20)),
+                ('latest_on', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rubric_progressions', to='student_app.studentprofile')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='report_module.subject')),
+            ],
+            options={
+                'unique_together': {('student', 'subject', 'topic')},
+            },
+        ),
+    ]
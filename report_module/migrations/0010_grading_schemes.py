@@ -0,0 +1,43 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:01
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_module', '0009_rubric_progression'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingScheme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('exam_weight', models.PositiveSmallIntegerField(default=60, help_text='Percent of the total')),
+                ('continuous_assessment_weight', models.PositiveSmallIntegerField(default=25, help_text='Percent of the total')),
+                ('participation_weight', models.PositiveSmallIntegerField(default=15, help_text='Percent of the total')),
+                ('is_active', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='one_active_grading_scheme')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GradeBoundary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('letter', models.CharField(choices=[('A+', 'A+'), ('A', 'A'), ('A-', 'A-'), ('B+', 'B+'), ('B', 'B'), ('B-', 'B-'), ('C+', 'C+'), ('C', 'C'), ('C-', 'C-'), ('D+', 'D+'), ('D', 'D'), ('F', 'F')], max_length=2)),
+                ('min_score', models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('scheme', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='boundaries', to='report_module.gradingscheme')),
+            ],
+            options={
+                'unique_together': {('scheme', 'letter'), ('scheme', 'min_score')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_module', '0010_grading_schemes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='termreport',
+            name='class_percentile',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='termreport',
+            name='class_position',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='termreport',
+            name='class_size',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='termsubjectreport',
+            name='subject_percentile',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='termsubjectreport',
+            name='subject_rank',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
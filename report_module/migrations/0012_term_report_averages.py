@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_module', '0011_term_rankings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='termreport',
+            name='overall_average',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='termreport',
+            name='subject_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_module', '0012_term_report_averages'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classlevel',
+            name='is_final_level',
+            field=models.BooleanField(default=False, help_text='Students promoted from this class graduate'),
+        ),
+        migrations.AddField(
+            model_name='classlevel',
+            name='next_level',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='previous_levels', to='report_module.classlevel'),
+        ),
+    ]
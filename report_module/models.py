@@ -1,9 +1,28 @@
 # report_module/models.py
-from django.db import models
+import calendar
+import json
+import logging
+import time
+import uuid
+from bisect import bisect_right
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import groupby
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models.functions import Coalesce, Round
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from public_app.models import TenantUser
 
+from .deferred import defer_until_commit
+
+logger = logging.getLogger(__name__)
+
 
 class Subject(models.Model):
     """Subjects offered in the school"""
@@ -24,6 +43,10 @@ class ClassLevel(models.Model):
     age_range = models.CharField(max_length=20, help_text="e.g., '2-3 years'")
     is_toddler_class = models.BooleanField(default=False, help_text="Special reports for toddler classes")
     subjects = models.ManyToManyField(Subject, related_name='class_levels_offered', blank=True)
+    # Promotion order: promoted students move to next_level; students promoted out of a final level graduate
+    next_level = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='previous_levels')
+    is_final_level = models.BooleanField(default=False, help_text="Students promoted from this class graduate")
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -64,12 +87,35 @@ class Attendance(models.Model):
         indexes = [
             models.Index(fields=['student', 'date']),
             models.Index(fields=['date', 'status']),
+            # Keyset pagination order for attendance listings
+            models.Index(fields=['-date', '-id'], name='attendance_date_id_idx'),
+            models.Index(fields=['student', '-date', '-id'], name='attendance_student_date_id_idx'),
         ]
 
     def __str__(self):
         return f"{self.student.user.username} - {self.date} - {self.status}"
 
 
+class GateScan(models.Model):
+    """Raw gate scanner check-ins, queued until they are folded into Attendance"""
+    admission_number = models.CharField(max_length=20)
+    scanned_at = models.DateTimeField()
+    device_id = models.CharField(max_length=50, blank=True)
+    # Use string reference to avoid circular import
+    recorded_by = models.ForeignKey('teacher_app.TeacherProfile', on_delete=models.CASCADE)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    error = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['processed_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.admission_number} - {self.scanned_at}"
+
+
 class DailyReport(models.Model):
     """Daily reports sent by teachers to parents"""
     # Use string references to avoid circular imports
@@ -103,6 +149,8 @@ class DailyReport(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     sent_to_parent = models.BooleanField(default=False)
     sent_at = models.DateTimeField(null=True, blank=True)
+    # Maintained by a database trigger from general_notes, parent_message and social_interaction
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         unique_together = ['student', 'date']
@@ -110,6 +158,7 @@ class DailyReport(models.Model):
             models.Index(fields=['student', 'date']),
             models.Index(fields=['teacher', 'date']),
             models.Index(fields=['class_level', 'date']),
+            GinIndex(fields=['search_vector'], name='dailyreport_search_idx'),
         ]
 
     def __str__(self):
@@ -143,14 +192,50 @@ class DailySubjectReport(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by a database trigger from performance_notes
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         unique_together = ['daily_report', 'subject']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='dailysubject_search_idx'),
+        ]
 
     def __str__(self):
         return f"{self.daily_report.student.user.username} - {self.subject.name} - {self.daily_report.date}"
 
 
+class ParentNotification(models.Model):
+    """Transactional outbox of messages to parents, drained by the notification worker"""
+
+    class DeliveryStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    daily_report = models.ForeignKey(DailyReport, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='notifications')
+    # Set on digest messages so re-running a digest window never queues a message twice
+    digest_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=DeliveryStatus.choices, default=DeliveryStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient} - {self.subject} - {self.status}"
+
+
 class WeeklyReport(models.Model):
     """Weekly summary reports"""
     # Use string references to avoid circular imports
@@ -282,11 +367,24 @@ class TermReport(models.Model):
     finalized = models.BooleanField(default=False)
     finalized_at = models.DateTimeField(null=True, blank=True)
 
+    # Average total_score and number of subject rows, maintained by refresh_averages()
+    overall_average = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, editable=False)
+    subject_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Class ranking by average total score, maintained by report_module.ranking
+    class_position = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    class_size = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    class_percentile = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, editable=False)
+
+    # Maintained by a database trigger from teacher_comment
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         unique_together = ['student', 'academic_year', 'term']
         indexes = [
             models.Index(fields=['student', 'academic_year', 'term']),
             models.Index(fields=['teacher', 'academic_year', 'term']),
+            GinIndex(fields=['search_vector'], name='termreport_search_idx'),
         ]
 
     def save(self, *args, **kwargs):
@@ -302,10 +400,183 @@ class TermReport(models.Model):
 
         super().save(*args, **kwargs)
 
+    @classmethod
+    def schedule_refresh_averages(cls, term_report_id):
+        """Refresh this report's averages once when the transaction commits"""
+        defer_until_commit(
+            'term_report_averages', term_report_id, lambda ids: cls.refresh_averages(pk__in=ids)
+        )
+
+    @classmethod
+    def refresh_averages(cls, **filters):
+        """
+        Recompute overall_average and subject_count for the matching reports in one UPDATE.
+
+        Call after any write to TermSubjectReport rows; updated_at is bumped so
+        anything keyed on it (such as cached report cards) sees the change.
+        """
+        subject_rows = TermSubjectReport.objects.filter(term_report=models.OuterRef('pk')).order_by().values(
+            'term_report'
+        )
+        return cls.objects.filter(**filters).update(
+            overall_average=models.Subquery(
+                subject_rows.annotate(average=Round(models.Avg('total_score'), 2)).values('average')
+            ),
+            subject_count=Coalesce(models.Subquery(subject_rows.annotate(count=models.Count('id')).values('count')), 0),
+            updated_at=timezone.now()
+        )
+
     def __str__(self):
         return f"Term Report - {self.student.user.username} - {self.term} {self.academic_year}"
 
 
+# Weights used when a school has no active grading scheme: 60% exam, 25% continuous assessment, 15% participation
+SCORE_WEIGHTS = (60, 25, 15)
+
+# Lower bound of each letter grade in hundredths of a point, ascending; below the first bound is an F
+GRADE_BOUNDARIES = [6000, 6400, 6700, 7000, 7400, 7700, 8000, 8400, 8700, 9000, 9500]
+GRADE_LETTERS = ['F', 'D', 'D+', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A', 'A+']
+
+
+def to_hundredths(score):
+    """Exact integer hundredths of a two-decimal score"""
+    return int((Decimal(str(score)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def weighted_total_hundredths(components, weights=SCORE_WEIGHTS):
+    """Weighted total in hundredths, rounded half up, from component scores in hundredths and percent weights"""
+    # Scores are non-negative, so adding half the divisor before flooring rounds half up
+    return (sum(score * weight for score, weight in zip(components, weights)) + 50) // 100
+
+
+def grade_for_hundredths(total, boundaries=GRADE_BOUNDARIES, letters=GRADE_LETTERS):
+    """Letter grade for a total in hundredths"""
+    return letters[bisect_right(boundaries, total)]
+
+
+GRADE_CHOICES = [
+    ('A+', 'A+'), ('A', 'A'), ('A-', 'A-'),
+    ('B+', 'B+'), ('B', 'B'), ('B-', 'B-'),
+    ('C+', 'C+'), ('C', 'C'), ('C-', 'C-'),
+    ('D+', 'D+'), ('D', 'D'), ('F', 'F'),
+]
+
+
+class GradingScheme(models.Model):
+    """A school's score weights and grade boundaries; at most one is active"""
+    name = models.CharField(max_length=100)
+    exam_weight = models.PositiveSmallIntegerField(default=60, help_text="Percent of the total")
+    continuous_assessment_weight = models.PositiveSmallIntegerField(default=25, help_text="Percent of the total")
+    participation_weight = models.PositiveSmallIntegerField(default=15, help_text="Percent of the total")
+    is_active = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['is_active'], condition=models.Q(is_active=True),
+                                    name='one_active_grading_scheme'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.is_active:
+            GradingScheme.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
+        super().save(*args, **kwargs)
+
+    def compile(self):
+        """Weights and bisect tables for this scheme, as used by CompiledGradingScheme"""
+        boundaries = sorted(self.boundaries.all(), key=lambda boundary: boundary.min_score)
+        return CompiledGradingScheme(
+            weights=(self.exam_weight, self.continuous_assessment_weight, self.participation_weight),
+            # The lowest boundary catches every score below the next one
+            boundaries=[to_hundredths(boundary.min_score) for boundary in boundaries[1:]],
+            letters=[boundary.letter for boundary in boundaries]
+        )
+
+    def __str__(self):
+        return f"{self.name}{' (active)' if self.is_active else ''}"
+
+
+class GradeBoundary(models.Model):
+    """Lowest total score that earns a letter grade within a scheme"""
+    scheme = models.ForeignKey(GradingScheme, on_delete=models.CASCADE, related_name='boundaries')
+    letter = models.CharField(max_length=2, choices=GRADE_CHOICES)
+    min_score = models.DecimalField(max_digits=5, decimal_places=2,
+                                    validators=[MinValueValidator(0), MaxValueValidator(100)])
+
+    class Meta:
+        unique_together = [['scheme', 'letter'], ['scheme', 'min_score']]
+
+    def __str__(self):
+        return f"{self.scheme.name}: {self.letter} from {self.min_score}"
+
+
+class CompiledGradingScheme:
+    """
+    The active grading scheme of each tenant schema, compiled once per process.
+
+    Every change to a scheme or boundary bumps a per-schema version in the
+    shared cache once it commits; each use compares that version with the one
+    the local copy was compiled from, so all workers recompile on their next
+    use. If the shared cache is unreachable, entries still expire after
+    GRADING_SCHEME_CACHE_SECONDS. Schools without an active scheme use the
+    built-in 60/25/15 weights and A+..F boundaries.
+    """
+    _cache = {}
+
+    def __init__(self, weights, boundaries, letters):
+        self.weights = weights
+        self.boundaries = boundaries
+        self.letters = letters
+
+    def total(self, components):
+        """Weighted total in hundredths from component scores in hundredths"""
+        return weighted_total_hundredths(components, self.weights)
+
+    def grade(self, total):
+        """Letter grade for a total in hundredths"""
+        return grade_for_hundredths(total, self.boundaries, self.letters)
+
+    @staticmethod
+    def version_key(schema_name):
+        return f"grading-scheme-version:{schema_name}"
+
+    @classmethod
+    def shared_version(cls, schema_name):
+        try:
+            return cache.get(cls.version_key(schema_name))
+        except Exception:
+            logger.warning("Grading scheme version unavailable; relying on the cache timeout", exc_info=True)
+            return None
+
+    @classmethod
+    def current(cls):
+        schema_name = getattr(connection, 'schema_name', None)
+        version = cls.shared_version(schema_name)
+        cached = cls._cache.get(schema_name)
+        if cached and cached[0] > time.monotonic() and cached[1] == version:
+            return cached[2]
+
+        scheme = GradingScheme.objects.filter(is_active=True).prefetch_related('boundaries').first()
+        if scheme is not None and scheme.boundaries.all():
+            compiled = scheme.compile()
+        else:
+            compiled = cls(SCORE_WEIGHTS, GRADE_BOUNDARIES, GRADE_LETTERS)
+        ttl = getattr(settings, 'GRADING_SCHEME_CACHE_SECONDS', 300)
+        cls._cache[schema_name] = (time.monotonic() + ttl, version, compiled)
+        return compiled
+
+    @classmethod
+    def invalidate(cls):
+        schema_name = getattr(connection, 'schema_name', None)
+        cls._cache.pop(schema_name, None)
+        try:
+            cache.set(cls.version_key(schema_name), uuid.uuid4().hex, timeout=None)
+        except Exception:
+            logger.warning("Could not publish the grading scheme version; other workers wait for the timeout",
+                           exc_info=True)
+
+
 class TermSubjectReport(models.Model):
     """Subject-specific performance for term reports"""
     term_report = models.ForeignKey(TermReport, on_delete=models.CASCADE, related_name='subject_reports')
@@ -338,12 +609,7 @@ class TermSubjectReport(models.Model):
     # Grade (auto-computed based on total score)
     grade = models.CharField(
         max_length=2,
-        choices=[
-            ('A+', 'A+'), ('A', 'A'), ('A-', 'A-'),
-            ('B+', 'B+'), ('B', 'B'), ('B-', 'B-'),
-            ('C+', 'C+'), ('C', 'C'), ('C-', 'C-'),
-            ('D+', 'D+'), ('D', 'D'), ('F', 'F'),
-        ],
+        choices=GRADE_CHOICES,
         editable=False
     )
 
@@ -355,51 +621,366 @@ class TermSubjectReport(models.Model):
     key_topics_mastered = models.JSONField(default=list, help_text="List of topics student mastered")
     topics_needing_work = models.JSONField(default=list, help_text="List of topics needing more work")
 
+    # Rank within the class for this subject and term, maintained by report_module.ranking
+    subject_rank = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    subject_percentile = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Derived on every write; bulk writers must include these in their update fields
+    computed_fields = ['total_score', 'grade']
+
     class Meta:
         unique_together = ['term_report', 'subject']
 
     def calculate_grade(self, score):
         """Calculate letter grade based on numerical score"""
-        if score >= 95:
-            return 'A+'
-        elif score >= 90:
-            return 'A'
-        elif score >= 87:
-            return 'A-'
-        elif score >= 84:
-            return 'B+'
-        elif score >= 80:
-            return 'B'
-        elif score >= 77:
-            return 'B-'
-        elif score >= 74:
-            return 'C+'
-        elif score >= 70:
-            return 'C'
-        elif score >= 67:
-            return 'C-'
-        elif score >= 64:
-            return 'D+'
-        elif score >= 60:
-            return 'D'
-        else:
-            return 'F'
+        return CompiledGradingScheme.current().grade(to_hundredths(score))
+
+    def compute_scores(self):
+        """Set total_score and grade from the component scores using the school's grading scheme"""
+        scheme = CompiledGradingScheme.current()
+        total = scheme.total(
+            (to_hundredths(self.exam_score), to_hundredths(self.continuous_assessment),
+             to_hundredths(self.class_participation))
+        )
+        self.total_score = Decimal(total).scaleb(-2)
+        self.grade = scheme.grade(total)
 
     def save(self, *args, **kwargs):
-        # Auto-calculate total score (weighted average)
-        # 60% exam, 25% continuous assessment, 15% participation
-        self.total_score = (
-                (self.exam_score * 0.60) +
-                (self.continuous_assessment * 0.25) +
-                (self.class_participation * 0.15)
+        self.compute_scores()
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.term_report.student.user.username} - {self.subject.name} - {self.term_report.term}"
+
+
+class TermCalendar(models.Model):
+    """Start and end dates of each academic term"""
+    academic_year = models.CharField(max_length=20, help_text="e.g., 2024-2025")
+    term = models.CharField(max_length=10, choices=TermReport.TermChoices.choices)
+    start_date = models.DateField()
+    end_date = models.DateField()
+
+    class Meta:
+        unique_together = ['academic_year', 'term']
+        indexes = [
+            models.Index(fields=['start_date', 'end_date']),
+        ]
+
+    @property
+    def length(self):
+        return (self.end_date - self.start_date).days + 1
+
+    def contains(self, date):
+        return self.start_date <= date <= self.end_date
+
+    @transaction.atomic
+    def rebuild_bitmaps(self):
+        """Recreate every student's bitmap for this term from the Attendance rows"""
+        self.attendance_bitmaps.all().delete()
+
+        days_by_student = {}
+        records = Attendance.objects.filter(
+            date__range=[self.start_date, self.end_date]
+        ).values_list('student_id', 'date', 'status').iterator(chunk_size=2000)
+        for student_id, date, status in records:
+            days = days_by_student.setdefault(student_id, bytearray(self.length))
+            days[(date - self.start_date).days] = AttendanceBitmap.STATUS_CODES[status]
+
+        AttendanceBitmap.objects.bulk_create(
+            [
+                AttendanceBitmap(student_id=student_id, term_calendar=self, days=bytes(days))
+                for student_id, days in days_by_student.items()
+            ],
+            batch_size=500
         )
+        return len(days_by_student)
+
+    def __str__(self):
+        return f"{self.get_term_display()} {self.academic_year} ({self.start_date} - {self.end_date})"
 
-        # Auto-calculate grade
-        self.grade = self.calculate_grade(self.total_score)
 
-        super().save(*args, **kwargs)
+class AttendanceBitmap(models.Model):
+    """Compact per-term attendance: one status byte per calendar day, maintained alongside Attendance"""
+
+    # Byte values stored per day; 0 means no attendance was recorded for that day
+    STATUS_CODES = {'present': 1, 'absent': 2, 'late': 3, 'excused': 4}
+    CODE_STATUSES = {code: status for status, code in STATUS_CODES.items()}
+
+    student = models.ForeignKey('student_app.StudentProfile', on_delete=models.CASCADE,
+                                related_name='attendance_bitmaps')
+    term_calendar = models.ForeignKey(TermCalendar, on_delete=models.CASCADE, related_name='attendance_bitmaps')
+    days = models.BinaryField(default=bytes)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['student', 'term_calendar']
+
+    @classmethod
+    def apply(cls, changes):
+        """
+        Fold attendance changes into the bitmaps.
+
+        `changes` is an iterable of (student_id, date, status) tuples; a status of
+        None clears the day. Days outside every TermCalendar are ignored.
+        """
+        changes = list(changes)
+        if not changes:
+            return
+
+        dates = [date for _, date, _ in changes]
+        terms = list(TermCalendar.objects.filter(start_date__lte=max(dates), end_date__gte=min(dates)))
+        if not terms:
+            return
+
+        located = []
+        for student_id, date, status in changes:
+            term = next((term for term in terms if term.contains(date)), None)
+            if term is not None:
+                located.append((student_id, term, date, status))
+        if not located:
+            return
+
+        with transaction.atomic():
+            student_ids = {student_id for student_id, _, _, _ in located}
+            term_ids = {term.id for _, term, _, _ in located}
+            bitmaps = {
+                (bitmap.student_id, bitmap.term_calendar_id): bitmap
+                for bitmap in cls.objects.select_for_update().filter(
+                    student_id__in=student_ids, term_calendar_id__in=term_ids
+                )
+            }
+
+            buffers = {}
+            for student_id, term, date, status in located:
+                key = (student_id, term.id)
+                if status is None and key not in bitmaps and key not in buffers:
+                    # Nothing recorded to clear; creating a bitmap here would also resurrect
+                    # rows for a student whose bitmaps were just removed in a cascade delete
+                    continue
+                if key not in buffers:
+                    existing = bitmaps.get(key)
+                    days = bytearray(existing.days) if existing else bytearray()
+                    if len(days) < term.length:
+                        days.extend(bytes(term.length - len(days)))
+                    buffers[key] = days
+                buffers[key][(date - term.start_date).days] = cls.STATUS_CODES[status] if status else 0
+
+            to_create, to_update = [], []
+            now = timezone.now()
+            for (student_id, term_id), days in buffers.items():
+                bitmap = bitmaps.get((student_id, term_id))
+                if bitmap is None:
+                    to_create.append(cls(student_id=student_id, term_calendar_id=term_id, days=bytes(days)))
+                else:
+                    # bulk_update skips auto_now
+                    bitmap.days, bitmap.updated_at = bytes(days), now
+                    to_update.append(bitmap)
+
+            cls.objects.bulk_create(to_create, batch_size=500)
+            cls.objects.bulk_update(to_update, ['days', 'updated_at'], batch_size=500)
+
+    def iter_days(self):
+        """Yield (date, status) for every recorded day of the term"""
+        start = self.term_calendar.start_date
+        for offset, code in enumerate(bytes(self.days)):
+            if code:
+                yield start + timedelta(days=offset), self.CODE_STATUSES[code]
+
+    def summary(self):
+        """Counts, attendance rate, streaks and day-of-week pattern computed from the bitmap"""
+        counts = {status: 0 for status in self.STATUS_CODES}
+        weekdays = {name: {status: 0 for status in self.STATUS_CODES} for name in calendar.day_name}
+        current_streak = longest_streak = 0
+
+        for date, status in self.iter_days():
+            counts[status] += 1
+            weekdays[calendar.day_name[date.weekday()]][status] += 1
+
+            # Present and late days extend a streak, absences break it, excused days are neutral
+            if status in ('present', 'late'):
+                current_streak += 1
+                longest_streak = max(longest_streak, current_streak)
+            elif status == 'absent':
+                current_streak = 0
+
+        total_days = sum(counts.values())
+        present_days = counts['present']
+        return {
+            'total_days': total_days,
+            'present_days': present_days,
+            'absent_days': counts['absent'],
+            'late_days': counts['late'],
+            'excused_days': counts['excused'],
+            'attendance_rate': round(present_days / total_days * 100, 2) if total_days > 0 else 0,
+            'current_streak': current_streak,
+            'longest_streak': longest_streak,
+            'weekday_pattern': weekdays,
+        }
+
+    @classmethod
+    def student_totals(cls, student_id):
+        """
+        (days recorded, days present) for one student across every term.
+
+        Days inside a TermCalendar come from the bitmaps; records no term
+        covers, or all of them when the student has no bitmaps yet, are
+        counted from Attendance.
+        """
+        total_days = present_days = 0
+        records = Attendance.objects.filter(student_id=student_id)
+        bitmaps = list(cls.objects.filter(student_id=student_id).select_related('term_calendar'))
+        if bitmaps:
+            for bitmap in bitmaps:
+                summary = bitmap.summary()
+                total_days += summary['total_days']
+                present_days += summary['present_days']
+            covered = models.Q()
+            for start_date, end_date in TermCalendar.objects.values_list('start_date', 'end_date'):
+                covered |= models.Q(date__range=(start_date, end_date))
+            records = records.exclude(covered)
+
+        counts = records.aggregate(
+            total=models.Count('id'), present=models.Count('id', filter=models.Q(status='present'))
+        )
+        return total_days + counts['total'], present_days + counts['present']
+
+    def __str__(self):
+        return f"Attendance bitmap - {self.student_id} - {self.term_calendar}"
+
+
+class RubricProgression(models.Model):
+    """First date each rubric level was seen per student, subject and topic, maintained from DailySubjectReport"""
+
+    # Rubric level -> column holding the first date it was recorded; not_applicable is not tracked
+    LEVEL_FIELDS = {
+        Rubric.INTRODUCED: 'introduced_on',
+        Rubric.WORKING: 'working_on',
+        Rubric.MASTERED: 'mastered_on',
+    }
+
+    student = models.ForeignKey('student_app.StudentProfile', on_delete=models.CASCADE,
+                                related_name='rubric_progressions')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
+    topic = models.CharField(max_length=200)
+    introduced_on = models.DateField(null=True, blank=True)
+    working_on = models.DateField(null=True, blank=True)
+    mastered_on = models.DateField(null=True, blank=True)
+    latest_rating = models.CharField(max_length=20, choices=Rubric.choices)
+    latest_on = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['student', 'subject', 'topic']
+
+    @staticmethod
+    def observations(subject_reports):
+        """(student_id, subject_id, date, topics, rating) for DailySubjectReport instances with their report loaded"""
+        return [
+            (row.daily_report.student_id, row.subject_id, row.daily_report.date, row.topics_covered, row.rubric_rating)
+            for row in subject_reports
+        ]
+
+    @classmethod
+    def fold(cls, observations, rows):
+        """Merge observations into `rows` ((student_id, subject_id, topic) -> instance); return the changed keys"""
+        changed = set()
+        for student_id, subject_id, date, topics, rating in observations:
+            field = cls.LEVEL_FIELDS.get(rating)
+            if field is None:
+                continue
+            if not isinstance(topics, list):
+                topics = [topics] if topics else []
+            for topic in topics:
+                # topics_covered is free-form JSON; key dicts and lists by their JSON form, as weekly.merge_topics does
+                topic = (topic if isinstance(topic, str) else json.dumps(topic, sort_keys=True)).strip()[:200]
+                if not topic:
+                    continue
+                key = (student_id, subject_id, topic)
+                row = rows.get(key)
+                if row is None:
+                    row = rows[key] = cls(student_id=student_id, subject_id=subject_id, topic=topic,
+                                          latest_rating=rating, latest_on=date)
+                first_seen = getattr(row, field)
+                if first_seen is None or date < first_seen:
+                    setattr(row, field, date)
+                if date >= row.latest_on:
+                    row.latest_rating, row.latest_on = rating, date
+                changed.add(key)
+        return changed
+
+    @classmethod
+    def record(cls, observations):
+        """Fold newly written subject reports into the existing progression rows"""
+        observations = list(observations)
+        if not observations:
+            return
+
+        with transaction.atomic():
+            rows = {
+                (row.student_id, row.subject_id, row.topic): row
+                for row in cls.objects.select_for_update().filter(
+                    student_id__in={student_id for student_id, _, _, _, _ in observations},
+                    subject_id__in={subject_id for _, subject_id, _, _, _ in observations}
+                )
+            }
+            changed = [rows[key] for key in cls.fold(observations, rows)]
+            now = timezone.now()
+            for row in changed:
+                row.updated_at = now  # bulk_update skips auto_now
+
+            cls.objects.bulk_create([row for row in changed if row.pk is None], batch_size=500)
+            cls.objects.bulk_update(
+                [row for row in changed if row.pk is not None],
+                ['introduced_on', 'working_on', 'mastered_on', 'latest_rating', 'latest_on', 'updated_at'],
+                batch_size=500
+            )
+
+    @classmethod
+    def schedule_rebuild(cls, student_id, subject_ids):
+        """Rebuild these rows once when the transaction commits, however many writes asked for it"""
+        for subject_id in subject_ids:
+            defer_until_commit('rubric_progression', (student_id, subject_id), cls.rebuild_pairs)
+
+    @classmethod
+    def rebuild_pairs(cls, pairs):
+        """Rebuild the given (student_id, subject_id) pairs, one student at a time"""
+        subjects_by_student = {}
+        for student_id, subject_id in pairs:
+            subjects_by_student.setdefault(student_id, set()).add(subject_id)
+        for student_id, subject_ids in subjects_by_student.items():
+            cls.rebuild([student_id], subject_ids)
+
+    @classmethod
+    def rebuild(cls, student_ids=None, subject_ids=None):
+        """
+        Recompute progression rows from DailySubjectReport, optionally limited to
+        some students and subjects. Edits and deletions go through here because a
+        first-seen date cannot be un-folded. Returns the number of rows written.
+        """
+        existing = cls.objects.all()
+        reports = DailySubjectReport.objects.all()
+        if student_ids is not None:
+            existing = existing.filter(student_id__in=student_ids)
+            reports = reports.filter(daily_report__student_id__in=student_ids)
+        if subject_ids is not None:
+            existing = existing.filter(subject_id__in=subject_ids)
+            reports = reports.filter(subject_id__in=subject_ids)
+
+        written = 0
+        with transaction.atomic():
+            existing.delete()
+            # Fold one student at a time so memory stays bounded by a single student's history
+            observations = reports.values_list(
+                'daily_report__student_id', 'subject_id', 'daily_report__date', 'topics_covered', 'rubric_rating'
+            ).order_by('daily_report__student_id').iterator(chunk_size=2000)
+            for _, student_observations in groupby(observations, key=lambda row: row[0]):
+                rows = {}
+                cls.fold(student_observations, rows)
+                cls.objects.bulk_create(rows.values(), batch_size=500)
+                written += len(rows)
+        return written
 
     def __str__(self):
-        return f"{self.term_report.student.user.username} - {self.subject.name} - {self.term_report.term}"
\ No newline at end of file
+        return f"{self.student_id} - {self.subject_id} - {self.topic}: {self.latest_rating}"
@@ -0,0 +1,200 @@
+# report_module/notifications.py
+from datetime import timedelta
+from itertools import groupby
+
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DailyReport, ParentNotification
+
+
+# Use apps.get_model to avoid circular imports
+def get_parent_profile_model():
+    return apps.get_model('parent_app', 'ParentProfile')
+
+
+def get_parent_emails(student_ids):
+    """student id -> list of parent email addresses, resolved through ParentProfile.children in one query"""
+    ParentProfile = get_parent_profile_model()
+    parents = ParentProfile.children.through.objects.filter(
+        studentprofile_id__in=student_ids
+    ).exclude(parentprofile__user__email='').values_list('studentprofile_id', 'parentprofile__user__email')
+
+    emails = {}
+    for student_id, email in parents:
+        emails.setdefault(student_id, []).append(email)
+    return emails
+
+
+def render_daily_report(report):
+    """Subject line and plain-text body for one daily report row from .values()"""
+    student_name = f"{report['student__user__first_name']} {report['student__user__last_name']}".strip()
+    subject = f"Daily report for {student_name} - {report['date']}"
+
+    lines = [
+        f"Daily report for {student_name} on {report['date']}",
+        "",
+        f"General notes: {report['general_notes']}",
+        f"Mood and behavior: {report['mood_behavior']}",
+        f"Homework completed: {'Yes' if report['homework_completed'] else 'No'}",
+    ]
+    if report['parent_message']:
+        lines.append(f"Message from the teacher: {report['parent_message']}")
+    if report['requires_parent_action']:
+        lines.append(f"Action required: {report['parent_action_required']}")
+    return subject, "\n".join(lines)
+
+
+def enqueue_daily_report_notifications(report_ids):
+    """
+    Queue one outbox message per parent of each report.
+
+    Call this inside the transaction that marks the reports as sent so the
+    outbox rows commit or roll back together with that change. In digest mode
+    nothing is queued here; build_parent_digests picks the reports up instead.
+    """
+    if getattr(settings, 'PARENT_NOTIFICATION_MODE', 'immediate') == 'digest':
+        return 0
+
+    reports = list(DailyReport.objects.filter(id__in=report_ids).values(
+        'id', 'student_id', 'date', 'student__user__first_name', 'student__user__last_name',
+        'general_notes', 'mood_behavior', 'homework_completed',
+        'parent_message', 'requires_parent_action', 'parent_action_required'
+    ))
+    emails = get_parent_emails({report['student_id'] for report in reports})
+
+    notifications = []
+    for report in reports:
+        subject, body = render_daily_report(report)
+        for email in emails.get(report['student_id'], []):
+            notifications.append(ParentNotification(
+                recipient=email, subject=subject, body=body, daily_report_id=report['id']
+            ))
+
+    ParentNotification.objects.bulk_create(notifications, batch_size=500)
+    return len(notifications)
+
+
+def build_parent_digests(window_end=None, window_hours=None, batch_size=500):
+    """
+    Queue one combined message per parent for the reports sent in a window.
+
+    Reports are joined to their parents through the ParentProfile.children
+    table in a single query, streamed in parent order and grouped as they
+    arrive. The window ends at the start of the current hour by default and
+    spans PARENT_DIGEST_WINDOW_HOURS; each digest carries a key derived from
+    the parent and the window end, so running the same window twice is safe.
+    Returns the number of digests built, including any already queued.
+    """
+    window_hours = window_hours or getattr(settings, 'PARENT_DIGEST_WINDOW_HOURS', 24)
+    window_end = window_end or timezone.now().replace(minute=0, second=0, microsecond=0)
+    window_start = window_end - timedelta(hours=window_hours)
+
+    rows = DailyReport.objects.filter(
+        sent_to_parent=True,
+        sent_at__gte=window_start,
+        sent_at__lt=window_end,
+        student__parents__isnull=False
+    ).order_by(
+        'student__parents__user__email', 'student__user__first_name', 'date'
+    ).values(
+        'id', 'student_id', 'date', 'student__user__first_name', 'student__user__last_name',
+        'general_notes', 'mood_behavior', 'homework_completed',
+        'parent_message', 'requires_parent_action', 'parent_action_required',
+        'student__parents__user__email'
+    ).iterator(chunk_size=2000)
+
+    queued = 0
+    digests = []
+    for email, reports in groupby(rows, key=lambda row: row['student__parents__user__email']):
+        # Skipped per parent: excluding on the joined email would drop the child's other parents too
+        if not email:
+            continue
+        sections = [render_daily_report(report)[1] for report in reports]
+        digests.append(ParentNotification(
+            recipient=email,
+            subject=f"Daily reports - {window_end.date()}",
+            body="\n\n".join(sections),
+            digest_key=f"digest:{email}:{window_end.isoformat()}"
+        ))
+        if len(digests) >= batch_size:
+            queued += len(ParentNotification.objects.bulk_create(digests, ignore_conflicts=True))
+            digests = []
+
+    if digests:
+        queued += len(ParentNotification.objects.bulk_create(digests, ignore_conflicts=True))
+    return queued
+
+
+def retry_delay(attempts):
+    """Exponential backoff: PARENT_NOTIFICATION_RETRY_DELAY seconds, doubled per failed attempt"""
+    base = getattr(settings, 'PARENT_NOTIFICATION_RETRY_DELAY', 60)
+    return timedelta(seconds=base * 2 ** (attempts - 1))
+
+
+def deliver_pending_notifications(batch_size=None):
+    """
+    Send one batch of due outbox messages over a single mail connection.
+
+    Rows are locked with SKIP LOCKED so several workers can drain the outbox at
+    once. Failures are retried with backoff until PARENT_NOTIFICATION_MAX_ATTEMPTS,
+    then marked failed. Returns the number of messages attempted.
+    """
+    batch_size = batch_size or getattr(settings, 'PARENT_NOTIFICATION_BATCH_SIZE', 100)
+    max_attempts = getattr(settings, 'PARENT_NOTIFICATION_MAX_ATTEMPTS', 5)
+
+    with transaction.atomic():
+        notifications = list(
+            ParentNotification.objects.select_for_update(skip_locked=True).filter(
+                status=ParentNotification.DeliveryStatus.PENDING,
+                next_attempt_at__lte=timezone.now()
+            ).order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if not notifications:
+            return 0
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as exc:
+            # Nothing can be sent this round; count it as an attempt for the whole batch
+            for notification in notifications:
+                record_failure(notification, exc, max_attempts)
+        else:
+            try:
+                for notification in notifications:
+                    message = EmailMessage(
+                        subject=notification.subject,
+                        body=notification.body,
+                        to=[notification.recipient],
+                        connection=connection
+                    )
+                    try:
+                        message.send()
+                    except Exception as exc:
+                        record_failure(notification, exc, max_attempts)
+                    else:
+                        notification.attempts += 1
+                        notification.status = ParentNotification.DeliveryStatus.SENT
+                        notification.sent_at = timezone.now()
+                        notification.last_error = ''
+            finally:
+                connection.close()
+
+        ParentNotification.objects.bulk_update(
+            notifications, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+
+    return len(notifications)
+
+
+def record_failure(notification, exc, max_attempts):
+    notification.attempts += 1
+    notification.last_error = str(exc)[:1000]
+    if notification.attempts >= max_attempts:
+        notification.status = ParentNotification.DeliveryStatus.FAILED
+    else:
+        notification.next_attempt_at = timezone.now() + retry_delay(notification.attempts)
@@ -0,0 +1,88 @@
+# report_module/pagination.py
+import base64
+from datetime import date as date_cls
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class DateIdKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over (date, id), newest first.
+
+    Each page is fetched with `WHERE (date, id) < (cursor_date, cursor_id)` so it
+    costs the same index range scan however deep the client scrolls.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    date_field = 'date'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            cursor_date, cursor_id = cursor
+            queryset = queryset.filter(
+                Q(**{f'{self.date_field}__lt': cursor_date}) |
+                Q(**{self.date_field: cursor_date, 'id__lt': cursor_id})
+            )
+
+        # Fetch one extra row to know whether another page follows
+        page = list(queryset.order_by(f'-{self.date_field}', '-id')[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor_date, cursor_id = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            return date_cls.fromisoformat(cursor_date), int(cursor_id)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound('Invalid cursor')
+
+    def encode_cursor(self, instance):
+        position = f"{getattr(instance, self.date_field).isoformat()}|{instance.id}"
+        return base64.urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
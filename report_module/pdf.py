@@ -0,0 +1,119 @@
+# report_module/pdf.py
+"""
+A small PDF 1.4 writer for text-and-rule documents such as report cards.
+
+Only the standard Helvetica fonts are used, so nothing has to be embedded and
+the output stays a few kilobytes per page. Text is encoded as WinAnsi; text
+with characters outside it raises PdfEncodingError rather than printing a
+name or comment wrongly.
+"""
+import zlib
+
+PAGE_WIDTH = 595  # A4 in points
+PAGE_HEIGHT = 842
+
+# Font style -> (resource name used in content streams, base font)
+FONTS = {'regular': (b'R', b'Helvetica'), 'bold': (b'B', b'Helvetica-Bold')}
+
+# Average glyph width as a fraction of the font size, close enough for wrapping Helvetica
+AVERAGE_CHAR_WIDTH = 0.5
+
+
+class PdfEncodingError(ValueError):
+    """Text the standard fonts cannot show"""
+
+
+def escape(text):
+    try:
+        encoded = str(text).encode('cp1252')
+    except UnicodeEncodeError as exc:
+        raise PdfEncodingError(
+            f"Cannot print {exc.object[exc.start:exc.end]!r} in {exc.object!r}: only Western European text is supported"
+        ) from exc
+    return encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def wrap(text, size, width):
+    """Split text into lines that fit `width` points at `size`"""
+    max_chars = max(int(width / (size * AVERAGE_CHAR_WIDTH)), 1)
+    lines = []
+    for paragraph in str(text).splitlines() or ['']:
+        line = ''
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if len(candidate) <= max_chars:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            while len(word) > max_chars:
+                lines.append(word[:max_chars])
+                word = word[max_chars:]
+            line = word
+        lines.append(line)
+    return lines
+
+
+class PdfPage:
+    def __init__(self):
+        self.operations = []
+
+    def text(self, x, y, text, size=10, font='regular'):
+        self.operations.append(
+            b'BT /%s %d Tf %.2f %.2f Td (%s) Tj ET' % (FONTS[font][0], size, x, y, escape(text))
+        )
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self.operations.append(b'%.2f w %.2f %.2f m %.2f %.2f l S' % (width, x1, y1, x2, y2))
+
+    def content(self):
+        return b'\n'.join(self.operations)
+
+
+class PdfDocument:
+    def __init__(self, title=''):
+        self.title = title
+        self.pages = []
+
+    def add_page(self):
+        page = PdfPage()
+        self.pages.append(page)
+        return page
+
+    def to_bytes(self):
+        # Object numbers: 1 catalog, 2 page tree, 3 info, 4-5 fonts, then a page and its content per page
+        objects = {
+            3: b'<< /Title (%s) /Producer (ikekohub) >>' % escape(self.title),
+            4: b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>' % FONTS['regular'][1],
+            5: b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>' % FONTS['bold'][1],
+        }
+        page_refs = []
+        for index, page in enumerate(self.pages):
+            page_number, content_number = 6 + index * 2, 7 + index * 2
+            stream = zlib.compress(page.content())
+            objects[page_number] = (
+                b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+                b'/Resources << /Font << /%s 4 0 R /%s 5 0 R >> >> /Contents %d 0 R >>'
+                % (PAGE_WIDTH, PAGE_HEIGHT, FONTS['regular'][0], FONTS['bold'][0], content_number)
+            )
+            objects[content_number] = (
+                b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream)
+            )
+            page_refs.append(b'%d 0 R' % page_number)
+        objects[1] = b'<< /Type /Catalog /Pages 2 0 R >>'
+        objects[2] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(page_refs), len(page_refs))
+
+        output = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = {}
+        for number in sorted(objects):
+            offsets[number] = len(output)
+            output += b'%d 0 obj\n%s\nendobj\n' % (number, objects[number])
+
+        xref_offset = len(output)
+        output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        for number in sorted(objects):
+            output += b'%010d 00000 n \n' % offsets[number]
+        output += b'trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            len(objects) + 1, xref_offset
+        )
+        return bytes(output)
@@ -0,0 +1,103 @@
+# report_module/promotion.py
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import ClassLevel, TermReport
+
+
+# Use apps.get_model to avoid circular imports
+def get_student_profile_model():
+    return apps.get_model('student_app', 'StudentProfile')
+
+
+def rolling_students(from_year):
+    """
+    Students still on `from_year`, annotated with the promotion decision of their final term report.
+
+    The final report is the student's finalized third-term report of that
+    year; earlier terms and drafts carry the field's default, not a decision.
+    `final_promoted` is None when the student has no final report.
+    """
+    StudentProfile = get_student_profile_model()
+    final_report = TermReport.objects.filter(
+        student=OuterRef('pk'), academic_year=from_year, term=TermReport.TermChoices.THIRD, finalized=True
+    )
+    return StudentProfile.objects.filter(
+        academic_year=from_year, is_archived=False, class_level__isnull=False
+    ).annotate(final_promoted=Subquery(final_report.values('promoted_to_next_level')[:1]))
+
+
+def plan_promotion(from_year, class_level_ids=None):
+    """
+    Dry run: what a rollover from `from_year` would do to each class, from one grouped query.
+
+    Classes with no next level that are not marked final are reported as
+    unconfigured and are left alone by run_promotion().
+    """
+    students = rolling_students(from_year)
+    if class_level_ids:
+        students = students.filter(class_level_id__in=class_level_ids)
+    counts = students.values('class_level_id').annotate(
+        promoted=Count('id', filter=Q(final_promoted=True)),
+        held_back=Count('id', filter=Q(final_promoted=False)),
+        no_final_report=Count('id', filter=Q(final_promoted__isnull=True))
+    ).order_by()
+    levels = ClassLevel.objects.select_related('next_level').in_bulk([row['class_level_id'] for row in counts])
+
+    plan = []
+    for row in sorted(counts, key=lambda row: levels[row['class_level_id']].name):
+        level = levels[row['class_level_id']]
+        plan.append({
+            'class_level': {'id': level.id, 'name': level.name},
+            'next_level': {'id': level.next_level.id, 'name': level.next_level.name} if level.next_level else None,
+            'graduating': level.next_level is None and level.is_final_level,
+            'configured': level.next_level is not None or level.is_final_level,
+            'promoted': row['promoted'],
+            'held_back': row['held_back'],
+            'no_final_report': row['no_final_report'],
+        })
+    return plan
+
+
+def promote_class(level, from_year, to_year, now=None):
+    """
+    Roll one class from `from_year` to `to_year` in three UPDATEs inside one transaction.
+
+    Promoted students move to the next level, or are archived if the class is
+    final; everyone else stays in the class. Every statement only matches
+    students still on `from_year`, so students promoted into a class earlier
+    in the same run are not moved again. Returns the counts per outcome.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        students = rolling_students(from_year).filter(class_level=level)
+        promoted = students.filter(final_promoted=True)
+        if level.next_level_id is not None:
+            moved = promoted.update(class_level_id=level.next_level_id, academic_year=to_year)
+            graduated = 0
+        else:
+            moved = 0
+            graduated = promoted.update(class_level=None, is_archived=True, archived_at=now)
+        # Held back, or no final report to promote on
+        repeating = students.update(academic_year=to_year)
+    return {'promoted': moved, 'graduated': graduated, 'repeating': repeating}
+
+
+def run_promotion(from_year, to_year, class_level_ids=None):
+    """
+    Roll every configured class from `from_year` to `to_year`, each class in its own transaction.
+
+    Unconfigured classes are skipped untouched. Returns the dry-run plan
+    with each class's actual counts under 'result'.
+    """
+    plan = plan_promotion(from_year, class_level_ids)
+    levels = ClassLevel.objects.in_bulk([entry['class_level']['id'] for entry in plan])
+    now = timezone.now()
+    for entry in plan:
+        if entry['configured']:
+            entry['result'] = promote_class(levels[entry['class_level']['id']], from_year, to_year, now=now)
+        else:
+            entry['result'] = None
+    return plan
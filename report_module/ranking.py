@@ -0,0 +1,109 @@
+# report_module/ranking.py
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .deferred import defer_until_commit
+from .models import TermReport, TermSubjectReport
+
+
+def quoted(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+@transaction.atomic
+def refresh_rankings(class_level_id, academic_year, term):
+    """
+    Recompute class positions and subject ranks for one class and term.
+
+    Subject rank and percentile come from RANK() and PERCENT_RANK() over the
+    class's rows for each subject; the class position ranks every term report
+    by its average total score. Each is a single UPDATE ... FROM a windowed
+    subquery, and reports without subject scores are left unranked. Only rows
+    whose ranks actually change are written, and a term report's updated_at is
+    bumped when its own or any of its subjects' ranks change, so cached report
+    cards keyed on it are re-rendered.
+    """
+    term_reports, subject_reports = quoted(TermReport), quoted(TermSubjectReport)
+    group = [class_level_id, academic_year, term]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {subject_reports} AS s
+            SET subject_rank = ranked.subject_rank, subject_percentile = ranked.subject_percentile
+            FROM (
+                SELECT s.id,
+                       RANK() OVER (PARTITION BY s.subject_id ORDER BY s.total_score DESC) AS subject_rank,
+                       ROUND((PERCENT_RANK() OVER (PARTITION BY s.subject_id ORDER BY s.total_score)
+                              * 100)::numeric, 2) AS subject_percentile
+                FROM {subject_reports} AS s
+                JOIN {term_reports} AS t ON t.id = s.term_report_id
+                WHERE t.class_level_id = %s AND t.academic_year = %s AND t.term = %s
+            ) AS ranked
+            WHERE s.id = ranked.id
+              AND (s.subject_rank, s.subject_percentile)
+                  IS DISTINCT FROM (ranked.subject_rank, ranked.subject_percentile)
+            RETURNING s.term_report_id
+            """,
+            group
+        )
+        subjects_reranked = sorted({row[0] for row in cursor.fetchall()})
+
+        cursor.execute(
+            f"""
+            UPDATE {term_reports} AS t
+            SET class_position = ranked.class_position,
+                class_size = ranked.class_size,
+                class_percentile = ranked.class_percentile,
+                updated_at = %s
+            FROM (
+                SELECT g.id, r.class_position, r.class_size, r.class_percentile
+                FROM {term_reports} AS g
+                LEFT JOIN (
+                    SELECT t.id,
+                           RANK() OVER (ORDER BY AVG(s.total_score) DESC) AS class_position,
+                           COUNT(*) OVER () AS class_size,
+                           ROUND((PERCENT_RANK() OVER (ORDER BY AVG(s.total_score)) * 100)::numeric, 2)
+                               AS class_percentile
+                    FROM {term_reports} AS t
+                    JOIN {subject_reports} AS s ON s.term_report_id = t.id
+                    WHERE t.class_level_id = %s AND t.academic_year = %s AND t.term = %s
+                    GROUP BY t.id
+                ) AS r ON r.id = g.id
+                WHERE g.class_level_id = %s AND g.academic_year = %s AND g.term = %s
+            ) AS ranked
+            WHERE t.id = ranked.id
+              AND ((t.class_position, t.class_size, t.class_percentile)
+                   IS DISTINCT FROM (ranked.class_position, ranked.class_size, ranked.class_percentile)
+                   OR t.id = ANY(%s))
+            """,
+            [timezone.now(), *group, *group, subjects_reranked]
+        )
+
+
+def refresh_rankings_for_reports(term_report_ids):
+    """Refresh every class and term that the given term reports belong to"""
+    groups = TermReport.objects.filter(id__in=term_report_ids).values_list(
+        'class_level_id', 'academic_year', 'term'
+    ).order_by().distinct()
+    for group in groups:
+        refresh_rankings(*group)
+
+
+def refresh_year_rankings(academic_year):
+    """Refresh every class and term of an academic year"""
+    groups = TermReport.objects.filter(academic_year=academic_year).values_list(
+        'class_level_id', 'academic_year', 'term'
+    ).order_by().distinct()
+    for group in groups:
+        refresh_rankings(*group)
+
+
+def refresh_ranking_groups(groups):
+    for group in groups:
+        refresh_rankings(*group)
+
+
+def schedule_rankings(class_level_id, academic_year, term):
+    """Refresh one class and term when the transaction commits, once however many rows changed"""
+    defer_until_commit('term_rankings', (class_level_id, academic_year, term), refresh_ranking_groups)
@@ -0,0 +1,267 @@
+# report_module/report_cards.py
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+
+from .models import TermReport, TermSubjectReport
+from .pdf import PAGE_HEIGHT, PAGE_WIDTH, PdfDocument, PdfEncodingError, wrap
+
+# Part of every card's cache key; bump it when render_card() output changes
+CARD_LAYOUT_VERSION = 1
+
+MARGIN = 50
+SUBJECT_COLUMNS = [
+    # heading, key, x position
+    ('Subject', 'subject', MARGIN),
+    ('Exam', 'exam_score', 230),
+    ('C.A.', 'continuous_assessment', 280),
+    ('Part.', 'class_participation', 330),
+    ('Total', 'total_score', 380),
+    ('Grade', 'grade', 430),
+    ('Rank', 'subject_rank', 480),
+]
+
+
+def card_path(report_id, card):
+    """
+    Storage path of a rendered card, keyed on a hash of everything printed on it.
+
+    Any change that shows on the card, including a renamed student, teacher
+    or class or a re-ranked classmate, gives a new path; CARD_LAYOUT_VERSION
+    is bumped when render_card() itself changes.
+    """
+    schema_name = getattr(connection, 'schema_name', 'public')
+    content = json.dumps([CARD_LAYOUT_VERSION, card], sort_keys=True, default=str)
+    digest = hashlib.sha256(content.encode()).hexdigest()[:20]
+    return f"report_cards/{schema_name}/{report_id}-{digest}.pdf"
+
+
+def load_cards(term_report_ids):
+    """Plain, picklable card data for the given term reports, loaded in two queries"""
+    cards = {
+        row['id']: dict(row, subjects=[])
+        for row in TermReport.objects.filter(id__in=term_report_ids).values(
+            'id', 'academic_year', 'term', 'student__user__first_name', 'student__user__last_name',
+            'student__admission_number', 'class_level__name', 'teacher__user__first_name',
+            'teacher__user__last_name', 'total_school_days', 'days_present', 'days_absent', 'days_late',
+            'attendance_percentage', 'overall_grade', 'overall_average', 'class_position', 'class_size',
+            'behavior_rating', 'teacher_comment', 'principal_comment', 'strengths', 'areas_for_improvement',
+            'recommendations', 'promoted_to_next_level'
+        )
+    }
+    for row in TermSubjectReport.objects.filter(term_report_id__in=cards).values(
+        'term_report_id', 'subject__name', 'exam_score', 'continuous_assessment', 'class_participation',
+        'total_score', 'grade', 'subject_rank', 'subject_comment'
+    ).order_by('subject__name'):
+        row['subject'] = row.pop('subject__name')
+        cards[row.pop('term_report_id')]['subjects'].append(row)
+    return cards
+
+
+def render_card(card):
+    """Render one card from load_cards() data to PDF bytes; runs in pool workers, so no database access"""
+    student_name = f"{card['student__user__first_name']} {card['student__user__last_name']}".strip()
+    document = PdfDocument(title=f"Report card - {student_name} - {card['term']} term {card['academic_year']}")
+    page = document.add_page()
+    y = PAGE_HEIGHT - MARGIN
+
+    def advance(step):
+        nonlocal page, y
+        y -= step
+        if y < MARGIN:
+            page = document.add_page()
+            y = PAGE_HEIGHT - MARGIN - step
+
+    page.text(MARGIN, y, "Term Report Card", size=18, font='bold')
+    advance(26)
+    details = [
+        ('Student', f"{student_name} ({card['student__admission_number']})"),
+        ('Class', card['class_level__name']),
+        ('Term', f"{card['term'].title()} term {card['academic_year']}"),
+        ('Teacher', f"{card['teacher__user__first_name']} {card['teacher__user__last_name']}".strip()),
+    ]
+    for label, value in details:
+        page.text(MARGIN, y, f"{label}:", font='bold')
+        page.text(MARGIN + 70, y, value)
+        advance(14)
+
+    advance(10)
+    for heading, _, x in SUBJECT_COLUMNS:
+        page.text(x, y, heading, font='bold')
+    page.line(MARGIN, y - 4, PAGE_WIDTH - MARGIN, y - 4)
+    advance(16)
+    for subject in card['subjects']:
+        for _, key, x in SUBJECT_COLUMNS:
+            value = subject[key]
+            page.text(x, y, '' if value is None else value)
+        advance(14)
+        for line in wrap(subject['subject_comment'], 8, PAGE_WIDTH - 2 * MARGIN - 10) if subject['subject_comment'] else []:
+            page.text(MARGIN + 10, y, line, size=8)
+            advance(11)
+
+    advance(10)
+    position = (
+        f"{card['class_position']} of {card['class_size']}" if card['class_position'] else 'Not ranked'
+    )
+    summary = [
+        ('Overall average', card['overall_average'] if card['overall_average'] is not None else '-'),
+        ('Overall grade', card['overall_grade']),
+        ('Class position', position),
+        ('Attendance', f"{card['days_present']} of {card['total_school_days']} days "
+                       f"({card['attendance_percentage']}%), {card['days_late']} late"),
+        ('Behavior', card['behavior_rating']),
+        ('Promoted', 'Yes' if card['promoted_to_next_level'] else 'No'),
+    ]
+    for label, value in summary:
+        page.text(MARGIN, y, f"{label}:", font='bold')
+        page.text(MARGIN + 110, y, value)
+        advance(14)
+
+    for label, key in [
+        ('Strengths', 'strengths'), ('Areas for improvement', 'areas_for_improvement'),
+        ('Recommendations', 'recommendations'), ("Teacher's comment", 'teacher_comment'),
+        ("Principal's comment", 'principal_comment'),
+    ]:
+        if not card[key]:
+            continue
+        advance(8)
+        page.text(MARGIN, y, label, font='bold')
+        advance(14)
+        for line in wrap(card[key], 10, PAGE_WIDTH - 2 * MARGIN):
+            page.text(MARGIN, y, line)
+            advance(13)
+
+    return document.to_bytes()
+
+
+def render_card_or_error(card):
+    """render_card() for pool workers: (pdf bytes, None), or (None, reason) for text the PDF fonts can't show"""
+    try:
+        return render_card(card), None
+    except PdfEncodingError as exc:
+        return None, str(exc)
+
+
+def store_cards(paths, rendered, errors):
+    for report_id, (content, error) in rendered:
+        path = paths[report_id]
+        if error is not None:
+            if errors is None:
+                raise PdfEncodingError(error)
+            errors[report_id] = error
+            del paths[report_id]
+            continue
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        default_storage.save(path, ContentFile(content))
+
+
+def render_report_cards(term_report_ids, workers=None, force=False, executor=None, errors=None):
+    """
+    Make sure a current PDF exists in storage for each term report; returns report id -> path.
+
+    Cards are cached under card_path(), a hash of their printed data, so
+    unchanged cards are never rendered twice. Missing cards are rendered in
+    `executor` when one is given, otherwise in a process pool of
+    REPORT_CARD_RENDER_WORKERS processes (all cores by default); a single
+    card is rendered inline. A card whose text can't be printed raises
+    PdfEncodingError, or is left out of the result and recorded in the
+    `errors` dict when one is passed. Superseded files are left in storage
+    for a periodic cleanup.
+    """
+    cards = load_cards(term_report_ids)
+    paths = {report_id: card_path(report_id, card) for report_id, card in cards.items()}
+    missing = {
+        report_id: card for report_id, card in cards.items() if force or not default_storage.exists(paths[report_id])
+    }
+    if not missing:
+        return paths
+
+    workers = workers or getattr(settings, 'REPORT_CARD_RENDER_WORKERS', None) or os.cpu_count() or 1
+    if len(missing) == 1 or (executor is None and workers == 1):
+        store_cards(paths, zip(missing, map(render_card_or_error, missing.values())), errors)
+    elif executor is not None:
+        store_cards(paths, zip(missing, executor.map(render_card_or_error, missing.values(), chunksize=8)), errors)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as executor:
+            rendered = executor.map(render_card_or_error, missing.values(), chunksize=8)
+            store_cards(paths, zip(missing, rendered), errors)
+    return paths
+
+
+class ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink for ZipFile whose contents are drained chunk by chunk"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_report_card_zip(term_reports, chunk_size=32, workers=None):
+    """
+    Yield a ZIP archive of the report cards of `term_reports` as it is written.
+
+    Cards are rendered (or reused from storage) chunk_size at a time and each
+    one is copied into the archive straight from storage, so memory stays flat
+    however large the class is and the first bytes go out after the first
+    chunk. This runs inside a request, so missing cards are rendered inline
+    by default; REPORT_CARD_STREAM_WORKERS above 1 shares one spawned pool
+    across the stream, since forking a threaded web worker can deadlock.
+    Bulk rendering belongs to the render_report_cards command. Cards that
+    can't be printed are listed in an errors.txt member at the end. The sink
+    is unseekable, so ZipFile writes sizes in data descriptors after each
+    member. PDFs are already compressed and are stored as is.
+    """
+    members = list(term_reports.order_by('student__user__last_name', 'student__user__first_name', 'id').values_list(
+        'id', 'student__admission_number', 'student__user__first_name', 'student__user__last_name'
+    ))
+    workers = workers or getattr(settings, 'REPORT_CARD_STREAM_WORKERS', None) or 1
+    errors = {}
+    sink = ZipStream()
+    with contextlib.ExitStack() as stack:
+        # Spawned workers start from a fresh interpreter and import this module, so Django is set up first
+        executor = stack.enter_context(ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+        )) if workers > 1 else None
+        archive = stack.enter_context(zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED))
+        for start in range(0, len(members), chunk_size):
+            chunk = members[start:start + chunk_size]
+            paths = render_report_cards(
+                [member[0] for member in chunk], workers=1, executor=executor, errors=errors
+            )
+            for report_id, admission_number, first_name, last_name in chunk:
+                name = f"{admission_number}-{last_name}-{first_name}.pdf".replace('/', '-').replace(' ', '_')
+                if report_id in errors:
+                    errors[report_id] = f"{name}: {errors[report_id]}"
+                if report_id not in paths:
+                    continue  # deleted since the list was read, or not printable
+                with default_storage.open(paths[report_id], 'rb') as card, archive.open(name, mode='w') as member:
+                    for data in iter(lambda: card.read(64 * 1024), b''):
+                        member.write(data)
+                yield sink.drain()
+        if errors:
+            archive.writestr('errors.txt', ''.join(f"{error}\n" for error in errors.values()))
+    yield sink.drain()
@@ -0,0 +1,100 @@
+# report_module/search.py
+from html import escape
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Concat
+
+from .models import DailyReport, DailySubjectReport, TermReport
+
+
+SEARCH_CONFIG = 'english'
+
+# ts_headline brackets matches with these control characters; the narrative is HTML-escaped
+# afterwards and only they become <mark> tags, so teacher-entered markup is never passed through
+MATCH_START, MATCH_STOP = '\x02', '\x03'
+
+# kind -> model, narrative columns, date column, class level column, teacher column, extra values
+SEARCH_TARGETS = {
+    'daily': (
+        DailyReport, ['general_notes', 'parent_message', 'social_interaction'],
+        'date', 'class_level_id', 'teacher_id',
+        {'student_id': 'student_id', 'date': 'date', 'class_level_id': 'class_level_id',
+         'first_name': 'student__user__first_name', 'last_name': 'student__user__last_name'},
+    ),
+    'subject': (
+        DailySubjectReport, ['performance_notes'],
+        'daily_report__date', 'daily_report__class_level_id', 'daily_report__teacher_id',
+        {'student_id': 'daily_report__student_id', 'date': 'daily_report__date',
+         'class_level_id': 'daily_report__class_level_id', 'daily_report_id': 'daily_report_id',
+         'subject_name': 'subject__name',
+         'first_name': 'daily_report__student__user__first_name',
+         'last_name': 'daily_report__student__user__last_name'},
+    ),
+    'term': (
+        TermReport, ['teacher_comment'],
+        'created_at__date', 'class_level_id', 'teacher_id',
+        {'student_id': 'student_id', 'academic_year': 'academic_year', 'term': 'term',
+         'class_level_id': 'class_level_id',
+         'first_name': 'student__user__first_name', 'last_name': 'student__user__last_name'},
+    ),
+}
+
+
+def narrative(columns):
+    """The searched columns joined into one text expression for the headline"""
+    if len(columns) == 1:
+        return F(columns[0])
+    parts = []
+    for column in columns:
+        parts.extend([F(column), Value(' ')])
+    return Concat(*parts[:-1], output_field=TextField())
+
+
+def highlight(headline):
+    """Escape a ts_headline fragment for HTML and turn its match markers into <mark> tags"""
+    return escape(headline or '').replace(MATCH_START, '<mark>').replace(MATCH_STOP, '</mark>')
+
+
+def search_reports(text, kinds=None, class_level_id=None, start_date=None, end_date=None,
+                   teacher_id=None, limit=20):
+    """
+    Ranked full-text matches across report narratives, best first.
+
+    Each kind is one query that matches on the GIN-indexed search_vector column,
+    orders by ts_rank and stops at `limit`, so the headline is only built for
+    rows that are returned. Date filters apply to the report date (the creation
+    date for term reports).
+    """
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    results = []
+
+    for kind in kinds or SEARCH_TARGETS:
+        model, columns, date_field, class_field, teacher_field, values = SEARCH_TARGETS[kind]
+        queryset = model.objects.filter(search_vector=query)
+
+        if class_level_id:
+            queryset = queryset.filter(**{class_field: class_level_id})
+        if teacher_id:
+            queryset = queryset.filter(**{teacher_field: teacher_id})
+        if start_date:
+            queryset = queryset.filter(**{f'{date_field}__gte': start_date})
+        if end_date:
+            queryset = queryset.filter(**{f'{date_field}__lte': end_date})
+
+        rows = queryset.annotate(
+            rank=SearchRank(F('search_vector'), query),
+            headline=SearchHeadline(
+                narrative(columns), query, config=SEARCH_CONFIG,
+                start_sel=MATCH_START, stop_sel=MATCH_STOP, max_fragments=2
+            ),
+            **{key: F(path) for key, path in values.items() if key != path}
+        ).order_by('-rank', '-id').values('id', 'rank', 'headline', *values)[:limit]
+
+        for row in rows:
+            row['type'] = kind
+            row['headline'] = highlight(row['headline'])
+            results.append(row)
+
+    results.sort(key=lambda row: row['rank'], reverse=True)
+    return results[:limit]
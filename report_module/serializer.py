@@ -1,13 +1,18 @@
 # report_module/serializers.py
+import codecs
+
 from rest_framework import serializers
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django.db import transaction
+from django.core.exceptions import ValidationError as DjangoValidationError
 from decimal import Decimal
 from django.apps import apps
+from .ranking import refresh_rankings
 from .models import (
     Subject, ClassLevel, Attendance, DailyReport, DailySubjectReport,
-    WeeklyReport, WeeklySubjectSummary, TermReport, TermSubjectReport
+    WeeklyReport, WeeklySubjectSummary, TermReport, TermSubjectReport,
+    TermCalendar, GateScan, RubricProgression, GradingScheme, GradeBoundary, GRADE_LETTERS
 )
 
 
@@ -20,6 +25,97 @@ def get_teacher_profile_model():
     return apps.get_model('teacher_app', 'TeacherProfile')
 
 
+def to_id(value, field_name):
+    """An id from request data, or a ValidationError naming the field"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError(f"Invalid {field_name}: {value}")
+
+
+def clean_model_values(model, data):
+    """Run each named model field's clean() over `data`; returns the cleaned values and the errors by field"""
+    values, errors = {}, {}
+    for name, value in data.items():
+        try:
+            values[name] = model._meta.get_field(name).clean(value, None)
+        except DjangoValidationError as exc:
+            errors[name] = exc.messages
+    return values, errors
+
+
+def sync_subject_rows(model, parent_field, parent, subjects_data, created=False):
+    """
+    Keyed nested write of a report's per-subject rows.
+
+    Rows are matched to `subjects_data` by subject: changed rows are saved with
+    one bulk_update, new subjects with one bulk_create and subjects no longer
+    listed are deleted, so untouched rows keep their ids. Models that derive
+    fields on save expose compute_scores() and computed_fields, which are applied
+    here because bulk writes skip save(). Pass created=True for a report that
+    was just inserted to skip loading existing rows.
+    """
+    editable = {
+        field.name: field for field in model._meta.concrete_fields
+        if field.editable and field.name not in ('id', parent_field, 'subject', 'created_at')
+    }
+    computed_fields = getattr(model, 'computed_fields', [])
+
+    incoming = {}
+    for subject_data in subjects_data:
+        if 'subject' not in subject_data:
+            raise serializers.ValidationError({'subjects_data': "Each subject entry must have a subject"})
+        unknown = set(subject_data) - set(editable) - {'subject'}
+        if unknown:
+            raise serializers.ValidationError({'subjects_data': f"Unknown fields: {', '.join(sorted(unknown))}"})
+        try:
+            subject_id = int(subject_data['subject'])
+            values = {
+                name: editable[name].clean(value, None)
+                for name, value in subject_data.items() if name != 'subject'
+            }
+        except (TypeError, ValueError, DjangoValidationError) as exc:
+            raise serializers.ValidationError({'subjects_data': str(exc)})
+        if subject_id in incoming:
+            raise serializers.ValidationError({'subjects_data': f"Duplicate subject: {subject_id}"})
+        incoming[subject_id] = values
+
+    missing = set(incoming) - set(Subject.objects.filter(id__in=incoming).values_list('id', flat=True))
+    if missing:
+        raise serializers.ValidationError({'subjects_data': f"Subjects with IDs {sorted(missing)} do not exist"})
+
+    existing = {} if created else {row.subject_id: row for row in model.objects.filter(**{parent_field: parent})}
+
+    to_create, to_update, changed_fields = [], [], set()
+    for subject_id, values in incoming.items():
+        row = existing.get(subject_id)
+        if row is None:
+            row = model(**{parent_field: parent}, subject_id=subject_id, **values)
+            if computed_fields:
+                row.compute_scores()
+            to_create.append(row)
+            continue
+
+        changed = {name for name, value in values.items() if getattr(row, name) != value}
+        if changed:
+            for name in changed:
+                setattr(row, name, values[name])
+            if computed_fields:
+                row.compute_scores()
+            changed_fields |= changed
+            to_update.append(row)
+
+    removed = [row for subject_id, row in existing.items() if subject_id not in incoming]
+    if removed:
+        model.objects.filter(id__in=[row.id for row in removed]).delete()
+    if to_update:
+        model.objects.bulk_update(to_update, sorted(changed_fields) + computed_fields)
+    if to_create:
+        model.objects.bulk_create(to_create)
+
+    return to_create, to_update, removed
+
+
 class SubjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subject
@@ -34,6 +130,21 @@ class ClassLevelSerializer(serializers.ModelSerializer):
         model = ClassLevel
         fields = '__all__'
 
+    def validate(self, data):
+        next_level = data.get('next_level', getattr(self.instance, 'next_level', None))
+        is_final_level = data.get('is_final_level', getattr(self.instance, 'is_final_level', False))
+        if next_level is not None and is_final_level:
+            raise serializers.ValidationError("A final class level cannot have a next level")
+        # Following next_level must never lead back to this class
+        seen = {self.instance.pk} if self.instance is not None else set()
+        level = next_level
+        while level is not None:
+            if level.pk in seen:
+                raise serializers.ValidationError({'next_level': "Class progression cannot loop back on itself"})
+            seen.add(level.pk)
+            level = level.next_level
+        return data
+
 
 # ========== ATTENDANCE SERIALIZERS ==========
 
@@ -110,6 +221,138 @@ class AttendanceBulkSerializer(serializers.Serializer):
         return attendance_records
 
 
+class GateScanSerializer(serializers.ModelSerializer):
+    """A single gate scanner check-in"""
+    scanned_at = serializers.DateTimeField(required=False)
+
+    class Meta:
+        model = GateScan
+        fields = ['id', 'admission_number', 'scanned_at', 'device_id']
+
+    def validate_scanned_at(self, value):
+        if value > timezone.now() + timedelta(minutes=5):
+            raise serializers.ValidationError("Scan time cannot be in the future")
+        return value
+
+
+class BiometricLogUploadSerializer(serializers.Serializer):
+    """Upload of a biometric device punch log"""
+    file = serializers.FileField()
+    recorded_by = serializers.IntegerField(
+        required=False,
+        help_text="TeacherProfile id recorded as the marker; defaults to the uploading teacher"
+    )
+    encoding = serializers.CharField(required=False, default='utf-8')
+
+    def validate_encoding(self, value):
+        try:
+            codec = codecs.lookup(value)
+        except LookupError:
+            raise serializers.ValidationError(f"Unknown encoding '{value}'")
+        # Codecs such as base64 or rot13 cannot decode a text stream
+        if not getattr(codec, '_is_text_encoding', True):
+            raise serializers.ValidationError(f"'{value}' is not a text encoding")
+        return codec.name
+
+    def validate(self, data):
+        TeacherProfile = get_teacher_profile_model()
+        request = self.context['request']
+        if 'recorded_by' in data:
+            if not TeacherProfile.objects.filter(id=data['recorded_by']).exists():
+                raise serializers.ValidationError({'recorded_by': f"Teacher with ID {data['recorded_by']} does not exist"})
+        elif hasattr(request.user, 'teacher_profile'):
+            data['recorded_by'] = request.user.teacher_profile.id
+        else:
+            raise serializers.ValidationError({'recorded_by': "recorded_by is required"})
+        return data
+
+
+class TermCalendarSerializer(serializers.ModelSerializer):
+    term_display = serializers.CharField(source='get_term_display', read_only=True)
+
+    class Meta:
+        model = TermCalendar
+        fields = ['id', 'academic_year', 'term', 'term_display', 'start_date', 'end_date']
+
+    def validate(self, data):
+        start_date = data.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = data.get('end_date', getattr(self.instance, 'end_date', None))
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError("End date must be after start date")
+
+        overlapping = TermCalendar.objects.filter(start_date__lte=end_date, end_date__gte=start_date)
+        if self.instance:
+            overlapping = overlapping.exclude(pk=self.instance.pk)
+        if overlapping.exists():
+            raise serializers.ValidationError("Term dates overlap with an existing term")
+        return data
+
+
+class GradeBoundarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GradeBoundary
+        fields = ['letter', 'min_score']
+
+
+class GradingSchemeSerializer(serializers.ModelSerializer):
+    boundaries = GradeBoundarySerializer(many=True)
+
+    class Meta:
+        model = GradingScheme
+        fields = [
+            'id', 'name', 'exam_weight', 'continuous_assessment_weight', 'participation_weight',
+            'is_active', 'boundaries', 'created_at', 'updated_at'
+        ]
+
+    def validate_boundaries(self, value):
+        letters = [boundary['letter'] for boundary in value]
+        scores = [boundary['min_score'] for boundary in value]
+        if len(set(letters)) != len(letters) or len(set(scores)) != len(scores):
+            raise serializers.ValidationError("Each letter and minimum score may only appear once")
+        if min(scores, default=None) != 0:
+            raise serializers.ValidationError("The lowest grade boundary must start at 0")
+        # Letters from F up to A+ must need strictly higher scores, or the ranges would overlap
+        ordered = sorted(value, key=lambda boundary: GRADE_LETTERS.index(boundary['letter']))
+        for lower, higher in zip(ordered, ordered[1:]):
+            if higher['min_score'] <= lower['min_score']:
+                raise serializers.ValidationError(
+                    f"{higher['letter']} must start above {lower['letter']} ({lower['min_score']})"
+                )
+        return value
+
+    def validate(self, data):
+        weights = [
+            data.get(field, getattr(self.instance, field, GradingScheme._meta.get_field(field).default))
+            for field in ('exam_weight', 'continuous_assessment_weight', 'participation_weight')
+        ]
+        if sum(weights) != 100:
+            raise serializers.ValidationError("Weights must add up to 100")
+        return data
+
+    @transaction.atomic
+    def create(self, validated_data):
+        boundaries = validated_data.pop('boundaries')
+        scheme = super().create(validated_data)
+        GradeBoundary.objects.bulk_create([GradeBoundary(scheme=scheme, **boundary) for boundary in boundaries])
+        return scheme
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        boundaries = validated_data.pop('boundaries', None)
+        # Saving the scheme invalidates the compiled cache once the transaction commits
+        instance = super().update(instance, validated_data)
+        if boundaries is not None:
+            instance.boundaries.all().delete()
+            GradeBoundary.objects.bulk_create([GradeBoundary(scheme=instance, **boundary) for boundary in boundaries])
+        return instance
+
+
+class RecomputeGradesSerializer(serializers.Serializer):
+    """Academic year to regrade under the active grading scheme"""
+    academic_year = serializers.CharField(max_length=20)
+    include_finalized = serializers.BooleanField(default=False)
+
+
 class AttendanceReportSerializer(serializers.Serializer):
     """Serializer for attendance reports"""
     start_date = serializers.DateField()
@@ -193,11 +436,8 @@ class DailyReportSerializer(serializers.ModelSerializer):
         daily_report = super().create(validated_data)
 
         # Create subject reports
-        for subject_data in subjects_data:
-            DailySubjectReport.objects.create(
-                daily_report=daily_report,
-                **subject_data
-            )
+        created, _, _ = sync_subject_rows(DailySubjectReport, 'daily_report', daily_report, subjects_data, created=True)
+        RubricProgression.record(RubricProgression.observations(created))
 
         return daily_report
 
@@ -213,19 +453,102 @@ class DailyReportSerializer(serializers.ModelSerializer):
 
         # Update subject reports if provided
         if subjects_data:
-            # Delete existing subject reports
-            instance.subject_reports.all().delete()
-
-            # Create new ones
-            for subject_data in subjects_data:
-                DailySubjectReport.objects.create(
-                    daily_report=instance,
-                    **subject_data
-                )
+            created, updated, _ = sync_subject_rows(DailySubjectReport, 'daily_report', instance, subjects_data)
+            # Removed rows are handled by the post_delete signal
+            RubricProgression.record(RubricProgression.observations(created))
+            if updated:
+                RubricProgression.schedule_rebuild(instance.student_id, [row.subject_id for row in updated])
 
         return instance
 
 
+class DailyReportProjection:
+    """
+    Read-only fast path producing the same shape as DailyReportSerializer.
+
+    Reports are read with a single .values() query (names joined in) and their
+    subject reports with one more, so the query count is constant and no
+    ModelSerializer field machinery runs per row.
+    """
+    report_fields = [
+        'id', 'student', 'student__admission_number', 'student__user__first_name', 'student__user__last_name',
+        'teacher', 'teacher__user__first_name', 'teacher__user__last_name', 'date', 'class_level',
+        'class_level__name', 'class_level__is_toddler_class',
+        'general_notes', 'mood_behavior', 'social_interaction',
+        'potty_activities', 'meal_notes', 'nap_time', 'diaper_changes',
+        'homework_completed', 'homework_notes',
+        'parent_message', 'requires_parent_action', 'parent_action_required',
+        'created_at', 'updated_at', 'sent_to_parent', 'sent_at'
+    ]
+    subject_fields = [
+        'id', 'daily_report_id', 'subject', 'subject__name', 'subject__code', 'topics_covered',
+        'learning_objectives', 'rubric_rating', 'performance_notes',
+        'activities_completed', 'engagement_level', 'created_at'
+    ]
+
+    @staticmethod
+    def full_name(first_name, last_name):
+        # Mirrors AbstractUser.get_full_name
+        return f"{first_name} {last_name}".strip()
+
+    @classmethod
+    def serialize(cls, queryset):
+        rows = list(queryset.values(*cls.report_fields))
+
+        subject_reports = {}
+        if rows:
+            subject_rows = DailySubjectReport.objects.filter(
+                daily_report_id__in=[row['id'] for row in rows]
+            ).order_by('id').values(*cls.subject_fields)
+            for subject_row in subject_rows:
+                subject_reports.setdefault(subject_row['daily_report_id'], []).append({
+                    'id': subject_row['id'],
+                    'subject': subject_row['subject'],
+                    'subject_name': subject_row['subject__name'],
+                    'subject_code': subject_row['subject__code'],
+                    'topics_covered': subject_row['topics_covered'],
+                    'learning_objectives': subject_row['learning_objectives'],
+                    'rubric_rating': subject_row['rubric_rating'],
+                    'performance_notes': subject_row['performance_notes'],
+                    'activities_completed': subject_row['activities_completed'],
+                    'engagement_level': subject_row['engagement_level'],
+                    'created_at': subject_row['created_at'],
+                })
+
+        return [
+            {
+                'id': row['id'],
+                'student': row['student'],
+                'student_name': cls.full_name(row['student__user__first_name'], row['student__user__last_name']),
+                'student_admission_number': row['student__admission_number'],
+                'teacher': row['teacher'],
+                'teacher_name': cls.full_name(row['teacher__user__first_name'], row['teacher__user__last_name']),
+                'date': row['date'],
+                'class_level': row['class_level'],
+                'class_level_name': row['class_level__name'],
+                'is_toddler_class': row['class_level__is_toddler_class'],
+                'general_notes': row['general_notes'],
+                'mood_behavior': row['mood_behavior'],
+                'social_interaction': row['social_interaction'],
+                'potty_activities': row['potty_activities'],
+                'meal_notes': row['meal_notes'],
+                'nap_time': row['nap_time'],
+                'diaper_changes': row['diaper_changes'],
+                'homework_completed': row['homework_completed'],
+                'homework_notes': row['homework_notes'],
+                'parent_message': row['parent_message'],
+                'requires_parent_action': row['requires_parent_action'],
+                'parent_action_required': row['parent_action_required'],
+                'subject_reports': subject_reports.get(row['id'], []),
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at'],
+                'sent_to_parent': row['sent_to_parent'],
+                'sent_at': row['sent_at'],
+            }
+            for row in rows
+        ]
+
+
 # ========== WEEKLY REPORT SERIALIZERS ==========
 
 class WeeklySubjectSummarySerializer(serializers.ModelSerializer):
@@ -301,11 +624,7 @@ class WeeklyReportSerializer(serializers.ModelSerializer):
         weekly_report = super().create(validated_data)
 
         # Create subject summaries
-        for subject_data in subjects_data:
-            WeeklySubjectSummary.objects.create(
-                weekly_report=weekly_report,
-                **subject_data
-            )
+        sync_subject_rows(WeeklySubjectSummary, 'weekly_report', weekly_report, subjects_data, created=True)
 
         return weekly_report
 
@@ -316,16 +635,47 @@ class WeeklyReportSerializer(serializers.ModelSerializer):
 
         # Update subject summaries if provided
         if subjects_data:
-            instance.subject_summaries.all().delete()
-            for subject_data in subjects_data:
-                WeeklySubjectSummary.objects.create(
-                    weekly_report=instance,
-                    **subject_data
-                )
+            sync_subject_rows(WeeklySubjectSummary, 'weekly_report', instance, subjects_data)
 
         return instance
 
 
+class WeeklyReportGenerateSerializer(serializers.Serializer):
+    """Class and week to draft weekly reports for"""
+    class_level = serializers.PrimaryKeyRelatedField(queryset=ClassLevel.objects.all())
+    week_start_date = serializers.DateField()
+    teacher = serializers.IntegerField(
+        required=False,
+        help_text="TeacherProfile id the drafts belong to (admins only); defaults to the class teacher"
+    )
+
+    def validate(self, data):
+        TeacherProfile = get_teacher_profile_model()
+        user = self.context['request'].user
+
+        # Teachers draft for their own class only, always as themselves
+        if hasattr(user, 'teacher_profile') and not hasattr(user, 'admin_profile'):
+            if user.teacher_profile.class_level_id != data['class_level'].id:
+                raise serializers.ValidationError({'class_level': "You can only draft reports for your own class"})
+            data['teacher'] = user.teacher_profile
+            return data
+
+        if 'teacher' in data:
+            teacher = TeacherProfile.objects.filter(id=data['teacher']).first()
+            if teacher is None:
+                raise serializers.ValidationError({'teacher': f"Teacher with ID {data['teacher']} does not exist"})
+        elif hasattr(user, 'teacher_profile'):
+            teacher = user.teacher_profile
+        else:
+            teacher = TeacherProfile.objects.filter(class_level=data['class_level']).order_by('id').first()
+            if teacher is None:
+                raise serializers.ValidationError(
+                    {'teacher': "This class has no teacher; pass the teacher the drafts belong to"}
+                )
+        data['teacher'] = teacher
+        return data
+
+
 # ========== TERM REPORT SERIALIZERS ==========
 
 class TermSubjectReportSerializer(serializers.ModelSerializer):
@@ -337,10 +687,10 @@ class TermSubjectReportSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'subject', 'subject_name', 'subject_code',
             'exam_score', 'continuous_assessment', 'class_participation',
-            'total_score', 'grade', 'overall_rubric', 'subject_comment',
+            'total_score', 'grade', 'subject_rank', 'subject_percentile', 'overall_rubric', 'subject_comment',
             'key_topics_mastered', 'topics_needing_work', 'created_at'
         ]
-        read_only_fields = ['total_score', 'grade']
+        read_only_fields = ['total_score', 'grade', 'subject_rank', 'subject_percentile']
 
     def validate(self, data):
         # Validate scores are within 0-100 range
@@ -360,7 +710,7 @@ class TermReportSerializer(serializers.ModelSerializer):
     subject_reports = TermSubjectReportSerializer(many=True, read_only=True)
 
     # Calculated fields
-    overall_average = serializers.SerializerMethodField()
+    overall_average = serializers.DecimalField(max_digits=5, decimal_places=2, read_only=True, coerce_to_string=False)
     attendance_rate = serializers.SerializerMethodField()
 
     # Write-only fields for creating subject reports
@@ -378,22 +728,17 @@ class TermReportSerializer(serializers.ModelSerializer):
             'teacher', 'teacher_name', 'academic_year', 'term',
             'class_level', 'class_level_name', 'total_school_days',
             'days_present', 'days_absent', 'days_late', 'attendance_percentage',
-            'attendance_rate', 'overall_grade', 'overall_average', 'behavior_rating',
+            'attendance_rate', 'overall_grade', 'overall_average', 'subject_count', 'class_position', 'class_size',
+            'class_percentile', 'behavior_rating',
             'teacher_comment', 'principal_comment', 'strengths',
             'areas_for_improvement', 'recommendations', 'promoted_to_next_level',
             'promotion_notes', 'subject_reports', 'subjects_data',
             'finalized', 'finalized_at', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['teacher', 'attendance_percentage', 'finalized_at']
-
-    def get_overall_average(self, obj):
-        """Calculate overall average from subject reports"""
-        subject_reports = obj.subject_reports.all()
-        if not subject_reports:
-            return None
-
-        total_score = sum(report.total_score for report in subject_reports)
-        return round(total_score / len(subject_reports), 2)
+        read_only_fields = [
+            'teacher', 'attendance_percentage', 'finalized_at', 'subject_count',
+            'class_position', 'class_size', 'class_percentile'
+        ]
 
     def get_attendance_rate(self, obj):
         """Return formatted attendance rate"""
@@ -440,11 +785,10 @@ class TermReportSerializer(serializers.ModelSerializer):
         term_report = super().create(validated_data)
 
         # Create subject reports
-        for subject_data in subjects_data:
-            TermSubjectReport.objects.create(
-                term_report=term_report,
-                **subject_data
-            )
+        sync_subject_rows(TermSubjectReport, 'term_report', term_report, subjects_data, created=True)
+        TermReport.refresh_averages(pk=term_report.pk)
+        refresh_rankings(term_report.class_level_id, term_report.academic_year, term_report.term)
+        term_report.refresh_from_db(fields=['overall_average', 'subject_count', 'updated_at'])
 
         return term_report
 
@@ -458,16 +802,20 @@ class TermReportSerializer(serializers.ModelSerializer):
         elif not validated_data.get('finalized', True):
             validated_data['finalized_at'] = None
 
+        previous_group = (instance.class_level_id, instance.academic_year, instance.term)
         instance = super().update(instance, validated_data)
 
         # Update subject reports if provided
         if subjects_data:
-            instance.subject_reports.all().delete()
-            for subject_data in subjects_data:
-                TermSubjectReport.objects.create(
-                    term_report=instance,
-                    **subject_data
-                )
+            sync_subject_rows(TermSubjectReport, 'term_report', instance, subjects_data)
+            TermReport.refresh_averages(pk=instance.pk)
+            instance.refresh_from_db(fields=['overall_average', 'subject_count', 'updated_at'])
+
+        group = (instance.class_level_id, instance.academic_year, instance.term)
+        if subjects_data or group != previous_group:
+            refresh_rankings(*group)
+        if group != previous_group:
+            refresh_rankings(*previous_group)
 
         return instance
 
@@ -518,6 +866,16 @@ class ReportingDashboardSerializer(serializers.Serializer):
 
 # ========== BULK OPERATIONS SERIALIZERS ==========
 
+def cache_related(instance, related_name, objects):
+    """Store already-loaded objects as the prefetched result of instance.<related_name>.all()"""
+    queryset = getattr(instance, related_name).all()
+    queryset._result_cache = list(objects)
+    queryset._prefetch_done = True
+    if not hasattr(instance, '_prefetched_objects_cache'):
+        instance._prefetched_objects_cache = {}
+    instance._prefetched_objects_cache[related_name] = queryset
+
+
 class BulkDailyReportSerializer(serializers.Serializer):
     """Serializer for creating multiple daily reports at once"""
     date = serializers.DateField()
@@ -527,58 +885,351 @@ class BulkDailyReportSerializer(serializers.Serializer):
         help_text="List of report data for each student"
     )
 
+    report_fields = {
+        'general_notes', 'mood_behavior', 'social_interaction',
+        'potty_activities', 'meal_notes', 'nap_time', 'diaper_changes',
+        'homework_completed', 'homework_notes',
+        'parent_message', 'requires_parent_action', 'parent_action_required'
+    }
+    subject_fields = {
+        'subject', 'topics_covered', 'learning_objectives', 'rubric_rating',
+        'performance_notes', 'activities_completed', 'engagement_level'
+    }
+
     def validate_reports_data(self, value):
         StudentProfile = get_student_profile_model()
-        student_ids = []
-        for report_data in value:
+        student_ids = set()
+        subject_ids = set()
+        # Row index -> field errors; bulk_create skips model validation, so every value is cleaned here
+        row_errors = {}
+        for index, report_data in enumerate(value):
             if 'student_id' not in report_data:
                 raise serializers.ValidationError("Each report must have a student_id")
 
-            student_id = report_data['student_id']
+            student_id = report_data['student_id'] = to_id(report_data['student_id'], 'student_id')
             if student_id in student_ids:
                 raise serializers.ValidationError(f"Duplicate student_id: {student_id}")
-            student_ids.append(student_id)
+            student_ids.add(student_id)
 
-            # Validate student exists
-            try:
-                StudentProfile.objects.get(id=student_id)
-            except StudentProfile.DoesNotExist:
-                raise serializers.ValidationError(f"Student with ID {student_id} does not exist")
+            unknown = set(report_data) - self.report_fields - {'student_id', 'subjects_data'}
+            if unknown:
+                raise serializers.ValidationError(f"Unknown report fields: {', '.join(sorted(unknown))}")
+            values, errors = clean_model_values(
+                DailyReport, {name: report_data[name] for name in self.report_fields if name in report_data}
+            )
+            report_data.update(values)
+
+            report_subject_ids = set()
+            subject_errors = {}
+            for subject_index, subject_data in enumerate(report_data.get('subjects_data', [])):
+                if 'subject' not in subject_data:
+                    raise serializers.ValidationError("Each subject report must have a subject")
+                unknown = set(subject_data) - self.subject_fields
+                if unknown:
+                    raise serializers.ValidationError(f"Unknown subject report fields: {', '.join(sorted(unknown))}")
+                subject_id = subject_data['subject'] = to_id(subject_data['subject'], 'subject')
+                if subject_id in report_subject_ids:
+                    raise serializers.ValidationError(f"Duplicate subject {subject_id} for student {student_id}")
+                report_subject_ids.add(subject_id)
+                subject_values, subject_errors[subject_index] = clean_model_values(
+                    DailySubjectReport, {name: item for name, item in subject_data.items() if name != 'subject'}
+                )
+                subject_data.update(subject_values)
+            subject_ids |= report_subject_ids
+
+            subject_errors = {subject_index: item for subject_index, item in subject_errors.items() if item}
+            if subject_errors:
+                errors['subjects_data'] = subject_errors
+            if errors:
+                row_errors[index] = errors
+
+        if row_errors:
+            raise serializers.ValidationError(row_errors)
+
+        # Validate students and subjects exist with one query each
+        self._students = StudentProfile.objects.select_related('user').in_bulk(student_ids)
+        missing = student_ids - set(self._students)
+        if missing:
+            raise serializers.ValidationError(
+                f"Students with IDs {sorted(missing)} do not exist"
+            )
+
+        self._subjects = Subject.objects.in_bulk(subject_ids)
+        missing = subject_ids - set(self._subjects)
+        if missing:
+            raise serializers.ValidationError(
+                f"Subjects with IDs {sorted(missing)} do not exist"
+            )
 
         return value
 
+    def validate(self, data):
+        existing = DailyReport.objects.filter(
+            date=data['date'],
+            student_id__in=[report_data['student_id'] for report_data in data['reports_data']]
+        ).values_list('student_id', flat=True)
+        if existing:
+            raise serializers.ValidationError(
+                f"Daily reports already exist on {data['date']} for students {sorted(existing)}"
+            )
+        return data
+
     @transaction.atomic
     def create(self, validated_data):
-        StudentProfile = get_student_profile_model()
         teacher = self.context['request'].user.teacher_profile
         date = validated_data['date']
         class_level = validated_data['class_level']
-        reports_created = []
 
+        reports = []
+        subjects_by_report = []
         for report_data in validated_data['reports_data']:
-            student = StudentProfile.objects.get(id=report_data.pop('student_id'))
-
-            # Remove subjects_data if present for separate processing
-            subjects_data = report_data.pop('subjects_data', [])
-
-            daily_report = DailyReport.objects.create(
-                student=student,
+            fields = {key: value for key, value in report_data.items() if key in self.report_fields}
+            reports.append(DailyReport(
+                student=self._students[report_data['student_id']],
                 teacher=teacher,
                 date=date,
                 class_level=class_level,
-                **report_data
-            )
+                **fields
+            ))
+            subjects_by_report.append(report_data.get('subjects_data', []))
+
+        # PostgreSQL returns the new primary keys, so subject rows can reference them straight away
+        DailyReport.objects.bulk_create(reports)
 
-            # Create subject reports
-            for subject_data in subjects_data:
-                DailySubjectReport.objects.create(
+        subject_reports = []
+        for daily_report, subjects_data in zip(reports, subjects_by_report):
+            rows = [
+                DailySubjectReport(
                     daily_report=daily_report,
-                    **subject_data
+                    subject=self._subjects[subject_data['subject']],
+                    **{key: value for key, value in subject_data.items() if key != 'subject'}
                 )
+                for subject_data in subjects_data
+            ]
+            cache_related(daily_report, 'subject_reports', rows)
+            subject_reports.extend(rows)
 
-            reports_created.append(daily_report)
+        DailySubjectReport.objects.bulk_create(subject_reports)
+        RubricProgression.record(RubricProgression.observations(subject_reports))
 
-        return reports_created
+        return reports
+
+
+class DailyReportTemplateSerializer(serializers.Serializer):
+    """
+    One class-level daily report template plus small per-student overrides.
+
+    The template carries what is identical for the whole class (subjects, topics,
+    objectives, activities and optional shared report fields); each student entry
+    only adds what differs. The server expands it and creates everything through
+    BulkDailyReportSerializer.
+    """
+    date = serializers.DateField()
+    class_level = serializers.PrimaryKeyRelatedField(queryset=ClassLevel.objects.all())
+    shared = serializers.DictField(
+        required=False,
+        default=dict,
+        help_text="Report fields applied to every student, e.g. {'general_notes': str, 'homework_notes': str}"
+    )
+    subjects = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        default=list,
+        help_text="List of {'subject': int, 'topics_covered': list, 'learning_objectives': str, "
+                  "'activities_completed': list}"
+    )
+    students = serializers.ListField(
+        child=serializers.DictField(),
+        help_text="List of {'student_id': int, <report field overrides>, "
+                  "'subjects': {subject_id: {'rubric_rating', 'engagement_level', 'performance_notes'}}}"
+    )
+
+    template_subject_fields = {'subject', 'topics_covered', 'learning_objectives', 'activities_completed'}
+    student_subject_fields = {'rubric_rating', 'engagement_level', 'performance_notes'}
+
+    def validate(self, data):
+        subjects = {}
+        for subject_data in data['subjects']:
+            if 'subject' not in subject_data:
+                raise serializers.ValidationError("Each template subject must have a subject")
+            unknown = set(subject_data) - self.template_subject_fields
+            if unknown:
+                raise serializers.ValidationError(f"Unknown template subject fields: {', '.join(sorted(unknown))}")
+            subjects[str(subject_data['subject'])] = subject_data
+
+        reports_data = []
+        for student_data in data['students']:
+            student_data = dict(student_data)
+            overrides = student_data.pop('subjects', {}) or {}
+            unknown = {str(subject_id) for subject_id in overrides} - set(subjects)
+            if unknown:
+                raise serializers.ValidationError(
+                    f"Subject overrides for subjects not in the template: {', '.join(sorted(unknown))}"
+                )
+
+            subjects_data = []
+            for subject_id, template in subjects.items():
+                override = overrides.get(subject_id, overrides.get(template['subject'], {}))
+                unknown = set(override) - self.student_subject_fields
+                if unknown:
+                    raise serializers.ValidationError(f"Unknown subject override fields: {', '.join(sorted(unknown))}")
+                subjects_data.append({**template, **override})
+
+            reports_data.append({**data['shared'], **student_data, 'subjects_data': subjects_data})
+
+        self._bulk = BulkDailyReportSerializer(
+            data={'date': data['date'], 'class_level': data['class_level'].pk, 'reports_data': reports_data},
+            context=self.context
+        )
+        self._bulk.is_valid(raise_exception=True)
+        return data
+
+    def create(self, validated_data):
+        return self._bulk.save()
+
+
+class BulkTermGradingSerializer(serializers.Serializer):
+    """
+    A class x subject score matrix for one term: `subjects` gives the column order and
+    each row holds one [exam, continuous_assessment, participation] cell per subject,
+    or null to leave that subject untouched
+    """
+    class_level = serializers.PrimaryKeyRelatedField(queryset=ClassLevel.objects.all())
+    academic_year = serializers.CharField(max_length=20)
+    term = serializers.ChoiceField(choices=TermReport.TermChoices.choices)
+    subjects = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    rows = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_subjects(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Duplicate subject in columns")
+        missing = set(value) - set(Subject.objects.filter(id__in=value).values_list('id', flat=True))
+        if missing:
+            raise serializers.ValidationError(f"Subjects with IDs {sorted(missing)} do not exist")
+        return value
+
+    def validate(self, data):
+        columns = len(data['subjects'])
+        score_field = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=0, max_value=100)
+        scores = {}
+        for row in data['rows']:
+            student_id = to_id(row.get('student_id'), 'student_id')
+            if student_id in scores:
+                raise serializers.ValidationError(f"Duplicate student_id: {student_id}")
+            cells = row.get('scores')
+            if not isinstance(cells, list) or len(cells) != columns:
+                raise serializers.ValidationError(f"Student {student_id} needs exactly {columns} score cells")
+            parsed = []
+            for cell in cells:
+                if cell is None:
+                    parsed.append(None)
+                    continue
+                if not isinstance(cell, list) or len(cell) != 3:
+                    raise serializers.ValidationError(
+                        f"Student {student_id}: each cell is [exam, continuous_assessment, participation]"
+                    )
+                parsed.append([score_field.run_validation(value) for value in cell])
+            scores[student_id] = parsed
+
+        # One query resolves every row to its term report
+        term_reports = TermReport.objects.filter(
+            class_level=data['class_level'], academic_year=data['academic_year'], term=data['term'],
+            student_id__in=scores
+        )
+        user = self.context['request'].user
+        if hasattr(user, 'teacher_profile') and not hasattr(user, 'admin_profile'):
+            term_reports = term_reports.filter(teacher=user.teacher_profile)
+        reports = {student_id: (report_id, finalized) for report_id, student_id, finalized in
+                   term_reports.values_list('id', 'student_id', 'finalized')}
+
+        missing = set(scores) - set(reports)
+        if missing:
+            raise serializers.ValidationError(f"No editable term report for students {sorted(missing)}")
+        finalized = sorted(student_id for student_id, (_, is_final) in reports.items() if is_final)
+        if finalized:
+            raise serializers.ValidationError(f"Term reports are finalized for students {finalized}")
+
+        data['entries'] = [
+            (reports[student_id][0], subject_id, *cell)
+            for student_id, cells in scores.items()
+            for subject_id, cell in zip(data['subjects'], cells) if cell is not None
+        ]
+        return data
+
+
+class TermAttendanceFillSerializer(serializers.Serializer):
+    """Class and term whose term reports get their attendance filled from Attendance"""
+    class_level = serializers.PrimaryKeyRelatedField(queryset=ClassLevel.objects.all())
+    academic_year = serializers.CharField(max_length=20)
+    term = serializers.ChoiceField(choices=TermReport.TermChoices.choices)
+
+    def validate(self, data):
+        try:
+            data['term_calendar'] = TermCalendar.objects.get(academic_year=data['academic_year'], term=data['term'])
+        except TermCalendar.DoesNotExist:
+            raise serializers.ValidationError(
+                f"No term calendar for {data['term']} term {data['academic_year']}; add its dates first"
+            )
+        return data
+
+
+class BulkFinalizeTermReportSerializer(serializers.Serializer):
+    """Select the term reports to finalize: a class and term, or an explicit list of ids"""
+    class_level = serializers.PrimaryKeyRelatedField(queryset=ClassLevel.objects.all(), required=False)
+    academic_year = serializers.CharField(max_length=20, required=False)
+    term = serializers.ChoiceField(choices=TermReport.TermChoices.choices, required=False)
+    report_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+
+    def validate(self, data):
+        by_class = all(field in data for field in ('class_level', 'academic_year', 'term'))
+        if by_class == ('report_ids' in data):
+            raise serializers.ValidationError("Provide either class_level, academic_year and term, or report_ids")
+        return data
+
+
+class ReportCardArchiveSerializer(serializers.Serializer):
+    """Select the class and term whose report cards are downloaded as one archive"""
+    class_level = serializers.PrimaryKeyRelatedField(queryset=ClassLevel.objects.all())
+    academic_year = serializers.CharField(max_length=20)
+    term = serializers.ChoiceField(choices=TermReport.TermChoices.choices)
+    finalized_only = serializers.BooleanField(default=False)
+
+
+class TermComparisonSerializer(serializers.Serializer):
+    """Optionally narrow a term comparison to one term"""
+    academic_year = serializers.RegexField(r'^\d{4}-\d{4}$', required=False)
+    term = serializers.ChoiceField(choices=TermReport.TermChoices.choices, required=False)
+
+    def validate(self, data):
+        if ('academic_year' in data) != ('term' in data):
+            raise serializers.ValidationError("Provide both academic_year and term, or neither")
+        return data
+
+
+class PromotionSerializer(serializers.Serializer):
+    """Roll students from one academic year to the next; a dry run only previews the plan"""
+    from_academic_year = serializers.RegexField(r'^\d{4}-\d{4}$')
+    to_academic_year = serializers.RegexField(r'^\d{4}-\d{4}$')
+    class_levels = serializers.PrimaryKeyRelatedField(queryset=ClassLevel.objects.all(), many=True, required=False)
+    dry_run = serializers.BooleanField(default=True)
+
+    def validate(self, data):
+        if data['to_academic_year'] <= data['from_academic_year']:
+            raise serializers.ValidationError("to_academic_year must come after from_academic_year")
+        return data
+
+
+class BulkSendDailyReportSerializer(serializers.Serializer):
+    """Select the daily reports to send: a class and date, or an explicit list of ids"""
+    class_level = serializers.PrimaryKeyRelatedField(queryset=ClassLevel.objects.all(), required=False)
+    date = serializers.DateField(required=False)
+    report_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+
+    def validate(self, data):
+        by_class = 'class_level' in data and 'date' in data
+        if by_class == ('report_ids' in data):
+            raise serializers.ValidationError("Provide either class_level and date, or report_ids")
+        return data
 
 
 class ReportExportSerializer(serializers.Serializer):
@@ -604,4 +1255,22 @@ class ReportExportSerializer(serializers.Serializer):
     def validate(self, data):
         if data['end_date'] < data['start_date']:
             raise serializers.ValidationError("End date must be after start date")
-        return data
\ No newline at end of file
+        return data
+
+
+class ReportSearchSerializer(serializers.Serializer):
+    """Query parameters for full-text search over report narratives"""
+    q = serializers.CharField(max_length=200)
+    type = serializers.MultipleChoiceField(
+        choices=[('daily', 'Daily Reports'), ('subject', 'Daily Subject Notes'), ('term', 'Term Reports')],
+        required=False
+    )
+    class_level = serializers.IntegerField(required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate(self, data):
+        if data.get('start_date') and data.get('end_date') and data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("End date must be after start date")
+        return data
@@ -0,0 +1,90 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+
+from report_module.models import (
+    Attendance, AttendanceBitmap, DailyReport, DailySubjectReport, RubricProgression,
+    GradingScheme, GradeBoundary, CompiledGradingScheme, TermReport, TermSubjectReport
+)
+from report_module.ranking import schedule_rankings
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_previous_attendance_day(sender, instance, **kwargs):
+    # An edit may move the record to another student or day; that old day has to be cleared
+    instance._previous_day = None
+    if instance.pk:
+        instance._previous_day = Attendance.objects.filter(pk=instance.pk).values_list(
+            'student_id', 'date'
+        ).first()
+
+
+@receiver(post_save, sender=Attendance)
+def update_attendance_bitmap(sender, instance, **kwargs):
+    changes = []
+    previous_day = getattr(instance, '_previous_day', None)
+    if previous_day and previous_day != (instance.student_id, instance.date):
+        changes.append((previous_day[0], previous_day[1], None))
+    changes.append((instance.student_id, instance.date, instance.status))
+    AttendanceBitmap.apply(changes)
+
+
+@receiver(post_delete, sender=Attendance)
+def clear_attendance_bitmap_day(sender, instance, **kwargs):
+    AttendanceBitmap.apply([(instance.student_id, instance.date, None)])
+
+
+@receiver(post_save, sender=DailySubjectReport)
+def update_rubric_progression(sender, instance, created, **kwargs):
+    if created:
+        RubricProgression.record(RubricProgression.observations([instance]))
+    else:
+        RubricProgression.schedule_rebuild(instance.daily_report.student_id, [instance.subject_id])
+
+
+@receiver(post_delete, sender=DailySubjectReport)
+def clear_rubric_progression(sender, instance, **kwargs):
+    # Deleting a daily report removes all its subject rows; the rebuild runs once per subject at commit
+    RubricProgression.schedule_rebuild(instance.daily_report.student_id, [instance.subject_id])
+
+
+@receiver(pre_save, sender=DailyReport)
+def remember_previous_daily_report_day(sender, instance, **kwargs):
+    instance._previous_day = None
+    if instance.pk:
+        instance._previous_day = DailyReport.objects.filter(pk=instance.pk).values_list(
+            'student_id', 'date'
+        ).first()
+
+
+@receiver(post_save, sender=DailyReport)
+def refresh_progression_for_moved_report(sender, instance, created, **kwargs):
+    # First-seen dates come from the report date, so moving a report re-derives its subjects
+    previous_day = getattr(instance, '_previous_day', None)
+    if created or not previous_day or previous_day == (instance.student_id, instance.date):
+        return
+    subject_ids = list(instance.subject_reports.values_list('subject_id', flat=True))
+    RubricProgression.schedule_rebuild(instance.student_id, subject_ids)
+    if previous_day[0] != instance.student_id:
+        RubricProgression.schedule_rebuild(previous_day[0], subject_ids)
+
+
+@receiver([post_save, post_delete], sender=GradingScheme)
+@receiver([post_save, post_delete], sender=GradeBoundary)
+def invalidate_grading_scheme(sender, **kwargs):
+    # Wait for the commit so boundaries written after the scheme are compiled too
+    transaction.on_commit(CompiledGradingScheme.invalidate)
+
+
+@receiver([post_save, post_delete], sender=TermSubjectReport)
+def refresh_subject_rankings(sender, instance, **kwargs):
+    # Deferred to commit, so deleting a term report or saving many rows refreshes each class once;
+    # bulk writers skip this signal and refresh the averages and rankings themselves
+    TermReport.schedule_refresh_averages(instance.term_report_id)
+    report = instance.term_report
+    schedule_rankings(report.class_level_id, report.academic_year, report.term)
+
+
+@receiver(post_delete, sender=TermReport)
+def refresh_class_rankings(sender, instance, **kwargs):
+    schedule_rankings(instance.class_level_id, instance.academic_year, instance.term)
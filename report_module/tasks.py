@@ -0,0 +1,51 @@
+# report_module/tasks.py
+from celery import shared_task
+from django_tenants.utils import get_public_schema_name, get_tenant_model, schema_context
+
+from .grading import recompute_term_scores
+from .models import TermReport
+from .ranking import refresh_year_rankings
+from .notifications import deliver_pending_notifications, build_parent_digests as queue_parent_digests
+
+
+def tenant_schemas():
+    return get_tenant_model().objects.exclude(
+        schema_name=get_public_schema_name()
+    ).values_list('schema_name', flat=True)
+
+
+@shared_task
+def drain_parent_notifications(max_batches=50):
+    """Drain every school's parent notification outbox, a batch at a time"""
+    sent = 0
+    for schema_name in tenant_schemas():
+        with schema_context(schema_name):
+            for _ in range(max_batches):
+                delivered = deliver_pending_notifications()
+                sent += delivered
+                if not delivered:
+                    break
+    return sent
+
+
+@shared_task
+def build_parent_digests(window_hours=None):
+    """Queue every school's per-parent digest for the window that just ended"""
+    queued = 0
+    for schema_name in tenant_schemas():
+        with schema_context(schema_name):
+            queued += queue_parent_digests(window_hours=window_hours)
+    return queued
+
+
+@shared_task
+def recompute_term_grades(schema_name, academic_year, include_finalized=False):
+    """Regrade one school's academic year after its grading scheme changed"""
+    with schema_context(schema_name):
+        updated = recompute_term_scores(academic_year, include_finalized=include_finalized)
+        regraded = {'academic_year': academic_year} if include_finalized else {
+            'academic_year': academic_year, 'finalized': False
+        }
+        TermReport.refresh_averages(**regraded)
+        refresh_year_rankings(academic_year)
+        return updated
@@ -1,3 +1,1062 @@
-from django.test import TestCase
+import csv
+import json
+from decimal import Decimal
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+import io
+import re
+import zipfile
+from smtplib import SMTPException
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from parent_app.models import ParentProfile
+from public_app.models import TenantUser
+from student_app.models import StudentProfile
+from teacher_app.models import TeacherProfile
+from report_module.attendance import fill_term_attendance, flush_gate_scans, ingest_punch_log
+from report_module.comparison import term_comparisons
+from report_module.grading import grade_matrix, upsert_term_scores
+from report_module.ranking import refresh_rankings
+from report_module.search import search_reports
+from report_module.pdf import PdfEncodingError
+from report_module.report_cards import load_cards, render_card, render_report_cards, stream_report_card_zip
+from report_module.views import (
+    AttendanceExportView, AttendanceListCreateView, BulkFinalizeTermReportsView, BulkSendDailyReportsView,
+    ClassReportCardsArchiveView, DailyReportListCreateView
+)
+from report_module.models import (
+    Attendance, AttendanceBitmap, ClassLevel, DailyReport, DailySubjectReport, GateScan, ParentNotification,
+    CompiledGradingScheme, GradeBoundary, GradingScheme, RubricProgression, Subject, TermCalendar, TermReport, TermSubjectReport
+)
+from report_module.serializer import (
+    BulkDailyReportSerializer, DailyReportTemplateSerializer, GradingSchemeSerializer, WeeklyReportGenerateSerializer,
+    sync_subject_rows
+)
+from report_module.weekly import generate_weekly_reports
+from report_module.notifications import (
+    enqueue_daily_report_notifications, deliver_pending_notifications, build_parent_digests
+)
+from report_module.promotion import plan_promotion, run_promotion
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SchoolTestCase(TenantTestCase):
+    """A tenant with one class and its teacher, plus helpers for students and term reports"""
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = f'{cls.__name__} School'
+        tenant.admin_email = 'admin@school.test'
+        tenant.admin_first_name = 'Ada'
+        tenant.admin_last_name = 'Admin'
+
+    def setUp(self):
+        self.class_level = ClassLevel.objects.create(name='Grade 1', code='G1', age_range='6-7 years')
+        self.teacher = self.make_teacher('teacher', 'Tom')
+
+    def make_teacher(self, username, first_name):
+        user = TenantUser.objects.create(
+            username=username, email=f'{username}@school.test', first_name=first_name, last_name='Teacher',
+            password='unused-password', school=self.tenant
+        )
+        return TeacherProfile.objects.create(user=user, class_level=self.class_level)
+
+    def make_student(self, number, class_level=None, academic_year='2024-2025'):
+        user = TenantUser.objects.create(
+            username=f'student{number}', email=f'student{number}@school.test', first_name='Sam',
+            last_name=f'Student{number}', password='unused-password', school=self.tenant
+        )
+        return StudentProfile.objects.create(
+            user=user, admission_number=f'S{number:03d}', date_of_birth=date(2018, 1, 1),
+            parent_name='Pat Parent', parent_contact='+1234567890', parent_email=f'parent{number}@school.test',
+            address='1 School Road', class_level=class_level or self.class_level, academic_year=academic_year
+        )
+
+    def make_daily_report(self, student, day, teacher=None, **fields):
+        fields.setdefault('general_notes', 'A good day')
+        fields.setdefault('mood_behavior', 'Happy')
+        return DailyReport.objects.create(
+            student=student, teacher=teacher or self.teacher, date=day, class_level=student.class_level, **fields
+        )
+
+    def make_term_report(self, student, academic_year='2024-2025', term='first', teacher=None, **fields):
+        return TermReport.objects.create(
+            student=student, teacher=teacher or self.teacher, academic_year=academic_year, term=term,
+            class_level=student.class_level, total_school_days=60, days_present=60, days_absent=0, days_late=0,
+            attendance_percentage=100, behavior_rating='good', **fields
+        )
+
+    def make_subject_report(self, term_report, subject, score):
+        """A subject row whose three components, and so its total, all equal `score`"""
+        return TermSubjectReport.objects.create(
+            term_report=term_report, subject=subject, exam_score=score, continuous_assessment=score,
+            class_participation=score, overall_rubric='working', subject_comment='Comment'
+        )
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class ParentNotificationOutboxTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Creating the student links a parent account for parent_email through the admin_app signal
+        self.student = self.make_student(1, self.class_level)
+        self.report = self.make_daily_report(
+            self.student, date(2025, 1, 15), parent_message='Please sign the form',
+            sent_to_parent=True, sent_at=timezone.now()
+        )
+
+    def test_enqueue_resolves_parents_and_worker_delivers(self):
+        queued = enqueue_daily_report_notifications([self.report.id])
+
+        self.assertEqual(queued, 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+        delivered = deliver_pending_notifications()
+
+        self.assertEqual(delivered, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['parent1@school.test'])
+        self.assertIn('Please sign the form', mail.outbox[0].body)
+        notification = ParentNotification.objects.get()
+        self.assertEqual(notification.status, ParentNotification.DeliveryStatus.SENT)
+        self.assertIsNotNone(notification.sent_at)
+
+    @override_settings(PARENT_NOTIFICATION_MAX_ATTEMPTS=2)
+    def test_failed_delivery_backs_off_then_gives_up(self):
+        enqueue_daily_report_notifications([self.report.id])
+
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=SMTPException('mailbox unavailable')):
+            deliver_pending_notifications()
+            notification = ParentNotification.objects.get()
+            self.assertEqual(notification.status, ParentNotification.DeliveryStatus.PENDING)
+            self.assertEqual(notification.attempts, 1)
+            self.assertGreater(notification.next_attempt_at, timezone.now())
+
+            # Not due yet, so the next drain leaves it alone
+            self.assertEqual(deliver_pending_notifications(), 0)
+
+            ParentNotification.objects.update(next_attempt_at=timezone.now())
+            deliver_pending_notifications()
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, ParentNotification.DeliveryStatus.FAILED)
+        self.assertEqual(notification.attempts, 2)
+        self.assertIn('mailbox unavailable', notification.last_error)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(PARENT_NOTIFICATION_MODE='digest')
+    def test_digest_mode_groups_reports_per_parent_once_per_window(self):
+        self.make_daily_report(
+            self.student, date(2025, 1, 16), general_notes='Another good day', mood_behavior='Calm',
+            sent_to_parent=True, sent_at=timezone.now()
+        )
+        self.assertEqual(enqueue_daily_report_notifications([self.report.id]), 0)
+
+        window_end = timezone.now() + timedelta(minutes=1)
+        build_parent_digests(window_end=window_end)
+        build_parent_digests(window_end=window_end)
+
+        digest = ParentNotification.objects.get()
+        self.assertEqual(digest.recipient, 'parent1@school.test')
+        self.assertIn('A good day', digest.body)
+        self.assertIn('Another good day', digest.body)
+
+    @override_settings(PARENT_NOTIFICATION_MODE='digest')
+    def test_digest_reaches_parents_even_when_another_parent_has_no_email(self):
+        no_email_user = TenantUser.objects.create(
+            username='no-email-parent', email='', first_name='Nia', last_name='Parent',
+            password='unused-password', school=self.tenant
+        )
+        ParentProfile.objects.create(user=no_email_user).children.add(self.student)
+
+        build_parent_digests(window_end=timezone.now() + timedelta(minutes=1))
+
+        self.assertEqual(list(ParentNotification.objects.values_list('recipient', flat=True)), ['parent1@school.test'])
+
+
+class PromotionTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.final_level = ClassLevel.objects.create(
+            name='Grade 2', code='G2', age_range='7-8 years', is_final_level=True
+        )
+        self.first_level = self.class_level
+        self.first_level.next_level = self.final_level
+        self.first_level.save(update_fields=['next_level'])
+
+    def make_decided_student(self, number, class_level, decisions):
+        """A student with a finalized term report per `{term: promoted_to_next_level}` entry"""
+        student = self.make_decided_student(number, class_level)
+        for term, promoted in decisions.items():
+            self.make_term_report(student, term=term, promoted_to_next_level=promoted, finalized=True)
+        return student
+
+    def test_rollover_follows_final_term_decision_and_archives_graduates(self):
+        # Only the third term's decision counts, whatever the earlier terms said
+        promoted = self.make_decided_student(1, self.first_level, {'first': False, 'third': True})
+        held_back = self.make_decided_student(2, self.first_level, {'first': True, 'third': False})
+        graduate = self.make_decided_student(3, self.final_level, {'third': True})
+
+        plan = {entry['class_level']['id']: entry for entry in plan_promotion('2024-2025')}
+        self.assertEqual((plan[self.first_level.id]['promoted'], plan[self.first_level.id]['held_back']), (1, 1))
+        self.assertTrue(plan[self.final_level.id]['graduating'])
+        promoted.refresh_from_db()
+        self.assertEqual(promoted.academic_year, '2024-2025')
+
+        run_promotion('2024-2025', '2025-2026')
+
+        for student in (promoted, held_back, graduate):
+            student.refresh_from_db()
+        # Promoted into the final class, but not graduated again when that class rolled over
+        self.assertEqual((promoted.class_level, promoted.academic_year), (self.final_level, '2025-2026'))
+        self.assertFalse(promoted.is_archived)
+        self.assertEqual((held_back.class_level, held_back.academic_year), (self.first_level, '2025-2026'))
+        self.assertTrue(graduate.is_archived)
+        self.assertIsNone(graduate.class_level)
+
+    def test_students_without_a_finalized_third_term_report_stay_in_their_class(self):
+        # Earlier terms default to promoted, and a draft third term is not a decision yet
+        first_term_only = self.make_decided_student(1, self.first_level, {'first': True})
+        draft = self.make_decided_student(2, self.first_level, {'third': True})
+        TermReport.objects.filter(student=draft).update(finalized=False)
+
+        plan = {entry['class_level']['id']: entry for entry in plan_promotion('2024-2025')}
+        self.assertEqual(
+            (plan[self.first_level.id]['promoted'], plan[self.first_level.id]['no_final_report']), (0, 2)
+        )
+
+        run_promotion('2024-2025', '2025-2026')
+
+        for student in (first_term_only, draft):
+            student.refresh_from_db()
+            self.assertEqual((student.class_level, student.academic_year), (self.first_level, '2025-2026'))
+
+
+class AttendanceBitmapTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.term = TermCalendar.objects.create(
+            academic_year='2024-2025', term='first', start_date=date(2024, 9, 2), end_date=date(2024, 12, 13)
+        )
+        self.student = self.make_student(1)
+
+    def record(self, day, status):
+        return Attendance.objects.create(student=self.student, date=day, status=status, recorded_by=self.teacher)
+
+    def test_attendance_writes_keep_the_bitmap_in_step(self):
+        self.record(date(2024, 9, 2), 'present')
+        self.record(date(2024, 9, 3), 'late')
+        absent = self.record(date(2024, 9, 4), 'absent')
+        absent.status = 'excused'
+        absent.save()
+
+        bitmap = AttendanceBitmap.objects.get(student=self.student, term_calendar=self.term)
+        summary = bitmap.summary()
+        self.assertEqual((summary['present_days'], summary['late_days'], summary['excused_days']), (1, 1, 1))
+        self.assertEqual(summary['longest_streak'], 2)
+
+        absent.delete()
+        previous_update = bitmap.updated_at
+        bitmap.refresh_from_db()
+        self.assertEqual(bitmap.summary()['total_days'], 2)
+        self.assertGreater(bitmap.updated_at, previous_update)
+
+    def test_deleting_a_student_with_attendance_leaves_no_bitmap_behind(self):
+        self.record(date(2024, 9, 2), 'present')
+        self.record(date(2024, 9, 3), 'absent')
+        student_id = self.student.id
+
+        self.student.delete()
+
+        self.assertFalse(AttendanceBitmap.objects.filter(student_id=student_id).exists())
+        # Deferred foreign keys are only checked at commit, which a test never reaches
+        connection.check_constraints()
+
+    def test_student_totals_count_days_that_no_term_covers(self):
+        self.record(date(2024, 9, 2), 'present')
+        self.record(date(2024, 9, 3), 'absent')
+        self.record(date(2025, 1, 10), 'present')  # after the only term
+
+        self.assertEqual(AttendanceBitmap.student_totals(self.student.id), (3, 2))
+
+        # Without term dates there are no bitmaps, and every record is counted from Attendance
+        self.term.delete()
+        self.assertEqual(AttendanceBitmap.student_totals(self.student.id), (3, 2))
+
+
+@override_settings(ATTENDANCE_LATE_CUTOFF='08:00')
+class PunchUpsertTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.make_student(1)
+
+    def test_punch_logs_merge_first_in_and_last_out_across_imports(self):
+        stats = ingest_punch_log(['S001,2025-01-15 08:20:00', 's001,2025-01-15 14:00:00', 'X999,2025-01-15 08:00'],
+                                 self.teacher.id)
+        self.assertEqual((stats['attendance_rows'], stats['unmatched_punches']), (1, 1))
+        record = Attendance.objects.get(student=self.student)
+        self.assertEqual((record.status, record.time_in, record.time_out), ('late', time(8, 20), time(14, 0)))
+
+        # An earlier punch from another device moves time_in back and clears the lateness
+        ingest_punch_log(['S001\t2025-01-15 07:50:00'], self.teacher.id)
+        record.refresh_from_db()
+        self.assertEqual((record.status, record.time_in, record.time_out), ('present', time(7, 50), time(14, 0)))
+
+    def test_excused_days_keep_their_status(self):
+        Attendance.objects.create(student=self.student, date=date(2025, 1, 15), status='excused',
+                                  recorded_by=self.teacher)
+        ingest_punch_log(['S001,2025-01-15 09:30'], self.teacher.id)
+        record = Attendance.objects.get(student=self.student)
+        self.assertEqual((record.status, record.time_in), ('excused', time(9, 30)))
+
+    def test_gate_scans_are_dated_and_judged_in_the_school_time_zone(self):
+        self.addCleanup(setattr, connection.tenant, 'time_zone', connection.tenant.time_zone)
+        connection.tenant.time_zone = 'Africa/Lagos'  # UTC+1
+        # 07:30 UTC is 08:30 in Lagos; 23:30 UTC is already the next day there
+        GateScan.objects.create(admission_number='S001', recorded_by=self.teacher,
+                                scanned_at=datetime(2025, 1, 15, 7, 30, tzinfo=dt_timezone.utc))
+        GateScan.objects.create(admission_number='S001', recorded_by=self.teacher,
+                                scanned_at=datetime(2025, 1, 15, 23, 30, tzinfo=dt_timezone.utc))
+        GateScan.objects.create(admission_number='NOPE', recorded_by=self.teacher, scanned_at=timezone.now())
+
+        self.assertEqual(flush_gate_scans(), 3)
+
+        records = {record.date: record for record in Attendance.objects.filter(student=self.student)}
+        self.assertEqual(records[date(2025, 1, 15)].status, 'late')
+        self.assertEqual(records[date(2025, 1, 16)].time_in, time(0, 30))
+        self.assertEqual(GateScan.objects.get(admission_number='NOPE').error, 'Unknown admission number')
+        self.assertFalse(GateScan.objects.filter(processed_at__isnull=True).exists())
+
+
+class WeeklyReportGenerationTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.make_student(1)
+        self.subject = Subject.objects.create(name='Mathematics', code='MATH')
+
+    def test_drafts_merge_free_form_topics_and_modal_rubric(self):
+        monday = date(2025, 1, 13)
+        for offset, topics, rating in [
+            (0, ['Counting', {'unit': 'Shapes', 'part': 1}], 'working'),
+            (1, [{'part': 1, 'unit': 'Shapes'}, ['nested']], 'working'),
+            (2, ['Counting'], 'mastered'),
+        ]:
+            report = self.make_daily_report(self.student, monday + timedelta(days=offset), homework_completed=offset < 2)
+            DailySubjectReport.objects.create(
+                daily_report=report, subject=self.subject, topics_covered=topics, rubric_rating=rating,
+                learning_objectives='Numbers', performance_notes='Fine'
+            )
+
+        reports, skipped = generate_weekly_reports(self.class_level, monday, self.teacher)
+
+        self.assertEqual((len(reports), skipped), (1, []))
+        self.assertEqual(reports[0].homework_completion_rate, 67)
+        summary = reports[0].subject_summaries.get()
+        self.assertEqual(summary.topics_covered, ['Counting', {'unit': 'Shapes', 'part': 1}, ['nested']])
+        self.assertEqual(summary.overall_rubric_rating, 'working')
+
+    def test_teachers_can_only_draft_for_their_own_class(self):
+        other_class = ClassLevel.objects.create(name='Grade 2', code='G2', age_range='7-8 years')
+        request = SimpleNamespace(user=self.teacher.user)
+
+        serializer = WeeklyReportGenerateSerializer(
+            data={'class_level': other_class.id, 'week_start_date': '2025-01-13'}, context={'request': request}
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('class_level', serializer.errors)
+
+        serializer = WeeklyReportGenerateSerializer(
+            data={'class_level': self.class_level.id, 'week_start_date': '2025-01-13'}, context={'request': request}
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['teacher'], self.teacher)
+
+
+class RubricProgressionTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.make_student(1)
+        self.maths = Subject.objects.create(name='Mathematics', code='MATH')
+        self.reading = Subject.objects.create(name='Reading', code='READ')
+
+    def observe(self, day, rating, topics, subjects=None):
+        report = self.make_daily_report(self.student, day)
+        for subject in subjects or [self.maths]:
+            DailySubjectReport.objects.create(
+                daily_report=report, subject=subject, topics_covered=topics, rubric_rating=rating,
+                learning_objectives='Objectives', performance_notes='Notes'
+            )
+        return report
+
+    def progression(self, topic, subject=None):
+        return RubricProgression.objects.get(student=self.student, subject=subject or self.maths, topic=topic)
+
+    def test_first_seen_dates_per_level_and_latest_rating(self):
+        self.observe(date(2025, 1, 13), 'introduced', ['Fractions'])
+        self.observe(date(2025, 1, 15), 'mastered', ['Fractions'])
+        # Recorded late but dated earlier: fills working_on without changing the latest rating
+        self.observe(date(2025, 1, 14), 'working', ['Fractions', 'Decimals'])
+
+        fractions = self.progression('Fractions')
+        self.assertEqual(
+            (fractions.introduced_on, fractions.working_on, fractions.mastered_on),
+            (date(2025, 1, 13), date(2025, 1, 14), date(2025, 1, 15))
+        )
+        self.assertEqual((fractions.latest_rating, fractions.latest_on), ('mastered', date(2025, 1, 15)))
+        self.assertIsNone(self.progression('Decimals').introduced_on)
+
+    def test_structured_topics_are_keyed_by_their_json_form(self):
+        self.observe(date(2025, 1, 13), 'introduced', [{'unit': 3, 'name': 'Fractions'}])
+        key = json.dumps({'name': 'Fractions', 'unit': 3}, sort_keys=True)
+        first_updated_at = self.progression(key).updated_at
+
+        # Same topic with its keys in another order, and a bare string rather than a list
+        self.observe(date(2025, 1, 14), 'working', [{'name': 'Fractions', 'unit': 3}])
+        self.observe(date(2025, 1, 15), 'mastered', 'Decimals')
+
+        fractions = self.progression(key)
+        self.assertEqual((fractions.introduced_on, fractions.working_on), (date(2025, 1, 13), date(2025, 1, 14)))
+        self.assertGreater(fractions.updated_at, first_updated_at)
+        self.assertEqual(self.progression('Decimals').mastered_on, date(2025, 1, 15))
+        self.assertEqual(RubricProgression.objects.count(), 2)
+
+    def test_deleting_a_report_rebuilds_each_subject_once_at_commit(self):
+        self.observe(date(2025, 1, 13), 'introduced', ['Fractions'], subjects=[self.maths, self.reading])
+        report = self.observe(date(2025, 1, 14), 'working', ['Fractions'], subjects=[self.maths, self.reading])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            report.delete()
+
+        self.assertEqual(len(callbacks), 1)
+        for subject in (self.maths, self.reading):
+            progression = self.progression('Fractions', subject)
+            self.assertIsNone(progression.working_on)
+            self.assertEqual(progression.latest_rating, 'introduced')
+
+    def test_moving_a_report_to_another_date_refreshes_first_seen_dates(self):
+        report = self.observe(date(2025, 1, 20), 'introduced', ['Fractions'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report.date = date(2025, 1, 6)
+            report.save()
+
+        self.assertEqual(self.progression('Fractions').introduced_on, date(2025, 1, 6))
+
+
+class BulkGradingTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        CompiledGradingScheme.invalidate()
+        self.addCleanup(CompiledGradingScheme.invalidate)
+        self.maths = Subject.objects.create(name='Mathematics', code='MATH')
+        self.reading = Subject.objects.create(name='Reading', code='READ')
+
+    def test_grade_matrix_matches_compute_scores_with_half_up_rounding(self):
+        cells = [
+            (Decimal('0'), Decimal('0.02'), Decimal('0')),  # 0.005 rounds up to 0.01
+            (Decimal('80'), Decimal('70'), Decimal('90')),
+            (Decimal('100'), Decimal('100'), Decimal('100')),
+        ]
+        graded = grade_matrix(cells)
+
+        self.assertEqual(graded, [(Decimal('0.01'), 'F'), (Decimal('79.00'), 'C+'), (Decimal('100.00'), 'A+')])
+        for (exam, assessment, participation), (total, grade) in zip(cells, graded):
+            row = TermSubjectReport(exam_score=exam, continuous_assessment=assessment, class_participation=participation)
+            row.compute_scores()
+            self.assertEqual((row.total_score, row.grade), (total, grade))
+
+    def test_upsert_keeps_comments_and_refreshes_report_totals(self):
+        report = self.make_term_report(self.make_student(1))
+        TermSubjectReport.objects.create(
+            term_report=report, subject=self.maths, exam_score=10, continuous_assessment=10,
+            class_participation=10, subject_comment='Keep practising'
+        )
+
+        upsert_term_scores([
+            (report.id, self.maths.id, Decimal('90'), Decimal('80'), Decimal('70')),
+            (report.id, self.reading.id, Decimal('50'), Decimal('50'), Decimal('50')),
+        ])
+
+        maths = TermSubjectReport.objects.get(term_report=report, subject=self.maths)
+        self.assertEqual((maths.total_score, maths.subject_comment), (Decimal('84.50'), 'Keep practising'))
+        report.refresh_from_db()
+        self.assertEqual((report.subject_count, report.overall_average), (2, Decimal('67.25')))
+
+
+class GradingSchemeTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        CompiledGradingScheme.invalidate()
+        self.addCleanup(CompiledGradingScheme.invalidate)
+
+    def test_boundaries_must_rise_with_the_letter(self):
+        serializer = GradingSchemeSerializer(data={
+            'name': 'Overlapping', 'exam_weight': 50, 'continuous_assessment_weight': 30, 'participation_weight': 20,
+            'boundaries': [
+                {'letter': 'F', 'min_score': '0'}, {'letter': 'C', 'min_score': '60'}, {'letter': 'B', 'min_score': '55'}
+            ]
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('boundaries', serializer.errors)
+
+    def test_other_workers_recompile_when_the_shared_version_changes(self):
+        self.assertEqual(CompiledGradingScheme.current().weights, (60, 25, 15))
+
+        # Written as another worker would: its commit only clears that worker's local copy
+        scheme = GradingScheme.objects.create(
+            name='Pass/fail', exam_weight=50, continuous_assessment_weight=30, participation_weight=20, is_active=True
+        )
+        GradeBoundary.objects.bulk_create([
+            GradeBoundary(scheme=scheme, letter='F', min_score=0),
+            GradeBoundary(scheme=scheme, letter='A', min_score=50),
+        ])
+        self.assertEqual(CompiledGradingScheme.current().weights, (60, 25, 15))
+
+        cache.set(CompiledGradingScheme.version_key(connection.schema_name), 'bumped-elsewhere', timeout=None)
+
+        compiled = CompiledGradingScheme.current()
+        self.assertEqual(compiled.weights, (50, 30, 20))
+        self.assertEqual(compiled.grade(4999), 'F')
+        self.assertEqual(compiled.grade(5000), 'A')
+
+
+class ClassRankingTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.maths = Subject.objects.create(name='Mathematics', code='MATH')
+        self.reading = Subject.objects.create(name='Reading', code='READ')
+        # Average totals 90, 80 and 80: a tie for second place
+        self.reports = []
+        with self.captureOnCommitCallbacks(execute=True):
+            for number, (maths, reading) in enumerate([(100, 80), (70, 90), (80, 80)], start=1):
+                report = self.make_term_report(self.make_student(number))
+                self.make_subject_report(report, self.maths, maths)
+                self.make_subject_report(report, self.reading, reading)
+                self.reports.append(report)
+
+    def ranks(self):
+        refreshed = TermReport.objects.in_bulk([report.id for report in self.reports])
+        return [
+            (refreshed[report.id].class_position, refreshed[report.id].class_size)
+            for report in self.reports if report.id in refreshed
+        ]
+
+    def test_positions_ties_and_subject_ranks(self):
+        refresh_rankings(self.class_level.id, '2024-2025', 'first')
+
+        self.assertEqual(self.ranks(), [(1, 3), (2, 3), (2, 3)])
+        first = TermReport.objects.get(pk=self.reports[0].pk)
+        self.assertEqual(first.class_percentile, Decimal('100.00'))
+        reading_ranks = list(TermSubjectReport.objects.filter(subject=self.reading).order_by(
+            'term_report__student__admission_number'
+        ).values_list('subject_rank', flat=True))
+        self.assertEqual(reading_ranks, [2, 1, 2])
+
+    def test_deleting_a_report_reranks_the_class_once_at_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.reports[0].delete()
+
+        # One averages batch and one rankings batch, not one per deleted subject row
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(self.ranks(), [(1, 2), (1, 2)])
+
+
+@override_settings(REPORT_CARD_STREAM_WORKERS=1, STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class ReportCardTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.maths = Subject.objects.create(name='Mathematics', code='MATH')
+        self.reports = []
+        with self.captureOnCommitCallbacks(execute=True):
+            for number, score in enumerate([90, 70], start=1):
+                report = self.make_term_report(self.make_student(number))
+                self.make_subject_report(report, self.maths, score)
+                self.reports.append(report)
+
+    def page_count(self, pdf):
+        return int(re.search(rb'/Count (\d+)', pdf).group(1))
+
+    def test_long_comments_run_onto_further_pages(self):
+        card = load_cards([self.reports[0].id])[self.reports[0].id]
+        pdf = render_card(card)
+        self.assertTrue(pdf.startswith(b'%PDF-1.4'))
+        self.assertEqual(self.page_count(pdf), 1)
+
+        card['teacher_comment'] = 'Works hard and helps classmates. ' * 300
+        self.assertGreater(self.page_count(render_card(card)), 1)
+
+    def test_reranking_a_classmate_renders_a_fresh_card(self):
+        first = self.reports[0]
+        old_path = render_report_cards([first.id], workers=1)[first.id]
+        self.assertTrue(default_storage.exists(old_path))
+
+        # The classmate overtakes the first student, whose own rows are untouched
+        with self.captureOnCommitCallbacks(execute=True):
+            row = TermSubjectReport.objects.get(term_report=self.reports[1])
+            row.exam_score = row.continuous_assessment = row.class_participation = 100
+            row.save()
+
+        first.refresh_from_db()
+        self.assertEqual(first.class_position, 2)
+        new_path = render_report_cards([first.id], workers=1)[first.id]
+        self.assertNotEqual(new_path, old_path)
+        self.assertTrue(default_storage.exists(new_path))
+
+    def test_renaming_the_student_renders_a_fresh_card(self):
+        first = self.reports[0]
+        old_path = render_report_cards([first.id])[first.id]
+
+        # A rename does not touch the term report row at all
+        first.student.user.first_name = 'Samantha'
+        first.student.user.save()
+
+        self.assertNotEqual(render_report_cards([first.id])[first.id], old_path)
+
+    def test_unprintable_names_are_refused_rather_than_garbled(self):
+        second = self.reports[1]
+        second.student.user.first_name = 'Саша'
+        second.student.user.save()
+
+        with self.assertRaises(PdfEncodingError):
+            render_report_cards([second.id])
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(stream_report_card_zip(TermReport.objects.all()))))
+        self.assertEqual(archive.namelist(), ['S001-Student1-Sam.pdf', 'errors.txt'])
+        self.assertIn('S002-Student2-Саша.pdf', archive.read('errors.txt').decode())
+
+    def test_archive_holds_one_card_per_student_across_chunks(self):
+        chunks = list(stream_report_card_zip(TermReport.objects.all(), chunk_size=1))
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        self.assertEqual(archive.namelist(), ['S001-Student1-Sam.pdf', 'S002-Student2-Sam.pdf'])
+        for name in archive.namelist():
+            self.assertTrue(archive.read(name).startswith(b'%PDF-1.4'))
+
+    def test_archive_endpoint_streams_the_class_cards(self):
+        request = APIRequestFactory().get('/term-reports/report-cards/', {
+            'class_level': self.class_level.id, 'academic_year': '2024-2025', 'term': 'first'
+        })
+        force_authenticate(request, user=TenantUser.objects.get(username='admin@school.test'))
+        response = ClassReportCardsArchiveView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="report_cards_Grade_1_2024-2025_first.zip"')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(archive.namelist()), 2)
+
+
+class TermAttendanceFillTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.term = TermCalendar.objects.create(
+            academic_year='2024-2025', term='first', start_date=date(2024, 9, 2), end_date=date(2024, 12, 13)
+        )
+
+    def record(self, student, day, status):
+        Attendance.objects.create(student=student, date=day, status=status, recorded_by=self.teacher)
+
+    def summary(self, report):
+        return TermReport.objects.filter(pk=report.pk).values_list(
+            'total_school_days', 'days_present', 'days_absent', 'days_late', 'attendance_percentage'
+        ).get()
+
+    def test_counts_come_from_the_class_attendance_in_the_term(self):
+        first, second, finished = self.make_student(1), self.make_student(2), self.make_student(3)
+        first_report, second_report = self.make_term_report(first), self.make_term_report(second)
+        finalized_report = self.make_term_report(finished, finalized=True)
+        self.record(first, date(2024, 9, 2), 'present')
+        self.record(first, date(2024, 9, 3), 'late')
+        self.record(first, date(2024, 9, 4), 'present')
+        self.record(first, date(2024, 12, 20), 'present')  # after the term ends
+        self.record(second, date(2024, 9, 2), 'absent')
+        self.record(second, date(2024, 9, 3), 'present')
+        self.record(finished, date(2024, 9, 5), 'present')  # finalized reports are left out
+
+        filled = fill_term_attendance(self.term, self.class_level)
+
+        self.assertEqual({report.id for report in filled}, {first_report.id, second_report.id})
+        self.assertEqual(self.summary(first_report), (3, 2, 0, 1, Decimal('66.67')))
+        self.assertEqual(self.summary(second_report), (3, 1, 1, 0, Decimal('33.33')))
+        self.assertEqual(self.summary(finalized_report), (60, 60, 0, 0, Decimal('100.00')))
+
+
+class TermReportAverageTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.maths = Subject.objects.create(name='Mathematics', code='MATH')
+        self.reading = Subject.objects.create(name='Reading', code='READ')
+        self.report = self.make_term_report(self.make_student(1))
+
+    def stored(self):
+        self.report.refresh_from_db(fields=['overall_average', 'subject_count'])
+        return self.report.overall_average, self.report.subject_count
+
+    def test_average_and_count_follow_subject_row_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_subject_report(self.report, self.maths, Decimal('90'))
+            reading = self.make_subject_report(self.report, self.reading, Decimal('75.5'))
+        self.assertEqual(self.stored(), (Decimal('82.75'), 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reading.delete()
+        self.assertEqual(self.stored(), (Decimal('90.00'), 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.report.subject_reports.all().delete()
+        self.assertEqual(self.stored(), (None, 0))
+
+
+class BulkFinalizeTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.maths = Subject.objects.create(name='Mathematics', code='MATH')
+        self.other_teacher = self.make_teacher('other', 'Olive')
+
+    def finalize(self, data):
+        request = APIRequestFactory().post('/term-reports/finalize/', data, format='json')
+        force_authenticate(request, user=self.teacher.user)
+        return BulkFinalizeTermReportsView.as_view()(request)
+
+    def test_teachers_finalize_their_ready_reports_and_learn_why_others_were_skipped(self):
+        ready = self.make_term_report(self.make_student(1))
+        self.make_subject_report(ready, self.maths, 80)
+        empty = self.make_term_report(self.make_student(2))
+        done = self.make_term_report(self.make_student(3), finalized=True)
+        self.make_subject_report(done, self.maths, 70)
+        theirs = self.make_term_report(self.make_student(4), teacher=self.other_teacher)
+        self.make_subject_report(theirs, self.maths, 60)
+        missing_id = theirs.id + 1000
+
+        response = self.finalize({'report_ids': [ready.id, empty.id, done.id, theirs.id, missing_id]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['finalized_ids'], [ready.id])
+        self.assertEqual(
+            sorted((entry['id'], entry['reason']) for entry in response.data['skipped']),
+            sorted([
+                (empty.id, 'Cannot finalize report without subject reports'),
+                (done.id, 'Already finalized'),
+                (theirs.id, 'You can only finalize your own reports'),
+                (missing_id, 'Term report not found'),
+            ])
+        )
+        finalized = dict(TermReport.objects.values_list('id', 'finalized'))
+        self.assertEqual(finalized, {ready.id: True, empty.id: False, done.id: True, theirs.id: False})
+
+    def test_a_selection_needs_a_class_and_term_or_ids(self):
+        response = self.finalize({'class_level': self.class_level.id, 'academic_year': '2024-2025'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class TermComparisonTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.maths = Subject.objects.create(name='Mathematics', code='MATH')
+        self.reading = Subject.objects.create(name='Reading', code='READ')
+        self.student = self.make_student(1)
+        for academic_year, term, scores in [
+            # Created out of order: the comparison must follow the calendar, not insertion
+            ('2025-2026', 'first', {self.maths: 75}),
+            ('2024-2025', 'first', {self.maths: 70}),
+            ('2024-2025', 'second', {self.maths: 80, self.reading: 60}),
+        ]:
+            report = self.make_term_report(self.student, academic_year=academic_year, term=term)
+            for subject, score in scores.items():
+                self.make_subject_report(report, subject, score)
+
+    def summary(self, comparisons):
+        return [
+            (row['academic_year'], row['term'], row['subject'], row['previous_term'], row['delta'])
+            for row in comparisons
+        ]
+
+    def test_each_score_is_compared_with_the_previous_term_of_that_subject(self):
+        self.assertEqual(self.summary(term_comparisons([self.student])), [
+            ('2024-2025', 'first', 'Mathematics', None, None),
+            ('2024-2025', 'second', 'Mathematics', 'first', Decimal('10.00')),
+            ('2024-2025', 'second', 'Reading', None, None),
+            ('2025-2026', 'first', 'Mathematics', 'second', Decimal('-5.00')),
+        ])
+
+    def test_up_to_returns_only_that_term_with_earlier_terms_still_compared(self):
+        comparisons = term_comparisons([self.student], up_to=('2024-2025', 'second'))
+
+        self.assertEqual(self.summary(comparisons), [
+            ('2024-2025', 'second', 'Mathematics', 'first', Decimal('10.00')),
+            ('2024-2025', 'second', 'Reading', None, None),
+        ])
+        self.assertEqual(comparisons[0]['previous_score'], Decimal('70.00'))
+
+
+class SubjectRowSyncTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.maths = Subject.objects.create(name='Mathematics', code='MATH')
+        self.reading = Subject.objects.create(name='Reading', code='READ')
+        self.science = Subject.objects.create(name='Science', code='SCI')
+        self.report = self.make_term_report(self.make_student(1))
+        self.maths_row = self.make_subject_report(self.report, self.maths, 10)
+        self.make_subject_report(self.report, self.reading, 50)
+
+    def scores(self, subject_id, score):
+        return {
+            'subject': subject_id, 'exam_score': score, 'continuous_assessment': score,
+            'class_participation': score, 'subject_comment': 'Comment'
+        }
+
+    def test_rows_are_updated_inserted_and_deleted_by_subject(self):
+        sync_subject_rows(TermSubjectReport, 'term_report', self.report, [
+            self.scores(self.maths.id, '90'), self.scores(self.science.id, '70')
+        ])
+
+        rows = {row.subject_id: row for row in TermSubjectReport.objects.filter(term_report=self.report)}
+        self.assertEqual(set(rows), {self.maths.id, self.science.id})
+        # Matched by subject, so the maths row keeps its id and gets a recomputed total
+        self.assertEqual(rows[self.maths.id].id, self.maths_row.id)
+        self.assertEqual(rows[self.maths.id].total_score, Decimal('90.00'))
+        self.assertEqual(rows[self.science.id].total_score, Decimal('70.00'))
+
+    def test_invalid_values_are_rejected_before_anything_is_written(self):
+        with self.assertRaises(serializers.ValidationError):
+            sync_subject_rows(TermSubjectReport, 'term_report', self.report, [
+                self.scores(self.maths.id, 'ninety')
+            ])
+
+        self.assertEqual(TermSubjectReport.objects.filter(term_report=self.report).count(), 2)
+
+
+class AttendanceListTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        other_level = ClassLevel.objects.create(name='Grade 2', code='G2', age_range='7-8 years')
+        self.students = [self.make_student(number) for number in range(1, 4)]
+        self.other_student = self.make_student(4, class_level=other_level)
+        for day in (date(2024, 9, 2), date(2024, 9, 3)):
+            for student in self.students + [self.other_student]:
+                Attendance.objects.create(student=student, date=day, status='present', recorded_by=self.teacher)
+
+    def fetch(self, params):
+        request = APIRequestFactory().get('/attendance/', params)
+        force_authenticate(request, user=self.teacher.user)
+        response = AttendanceListCreateView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_walk_every_record_once_across_equal_dates(self):
+        params = {'class_level': 'Grade 1', 'page_size': 2}
+        seen = []
+        while True:
+            page = self.fetch(params)
+            seen.extend(record['id'] for record in page['results'])
+            if not page['next']:
+                break
+            params['cursor'] = parse_qs(urlparse(page['next']).query)['cursor'][0]
+
+        expected = list(Attendance.objects.filter(student__in=self.students).order_by(
+            '-date', '-id'
+        ).values_list('id', flat=True))
+        self.assertEqual(len(expected), 6)
+        self.assertEqual(seen, expected)
+
+
+class AttendanceExportTests(SchoolTestCase):
+
+    def test_export_streams_one_csv_row_per_record_in_the_range(self):
+        first, second = self.make_student(1), self.make_student(2)
+        for student, day, status in [
+            (first, date(2024, 9, 2), 'present'), (second, date(2024, 9, 2), 'late'),
+            (first, date(2024, 9, 3), 'absent'), (first, date(2024, 10, 1), 'present'),  # after the range
+        ]:
+            Attendance.objects.create(student=student, date=day, status=status, recorded_by=self.teacher)
+
+        request = APIRequestFactory().get('/attendance/export/', {
+            'start_date': '2024-09-01', 'end_date': '2024-09-30', 'class_level': 'Grade 1'
+        })
+        force_authenticate(request, user=self.teacher.user)
+        response = AttendanceExportView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], AttendanceExportView.header)
+        self.assertEqual([(row[0], row[1], row[5]) for row in rows[1:]], [
+            ('2024-09-02', 'S001', 'present'), ('2024-09-02', 'S002', 'late'), ('2024-09-03', 'S001', 'absent'),
+        ])
+
+
+class DailyReportListingTests(SchoolTestCase):
+
+    def fetch(self, params):
+        request = APIRequestFactory().get('/daily-reports/', params)
+        force_authenticate(request, user=self.teacher.user)
+        response = DailyReportListCreateView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.render().content)
+
+    def test_projection_returns_the_serializer_payload(self):
+        maths = Subject.objects.create(name='Mathematics', code='MATH')
+        reading = Subject.objects.create(name='Reading', code='READ')
+        first, second = self.make_student(1), self.make_student(2)
+        for student, day in [(first, date(2024, 9, 2)), (second, date(2024, 9, 2)), (first, date(2024, 9, 3))]:
+            report = self.make_daily_report(student, day, general_notes=f'Notes for {day}')
+            for subject in (maths, reading):
+                DailySubjectReport.objects.create(
+                    daily_report=report, subject=subject, topics_covered=['Counting'], rubric_rating='working',
+                    learning_objectives='Objectives', performance_notes='Notes'
+                )
+
+        params = {'start_date': '2024-09-01', 'end_date': '2024-09-30'}
+        listed = self.fetch(params)
+        self.assertEqual(len(listed), 3)
+        self.assertEqual(self.fetch(dict(params, projection='true')), listed)
+
+
+class BulkDailyReportTests(SchoolTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.maths = Subject.objects.create(name='Mathematics', code='MATH')
+        self.first, self.second = self.make_student(1), self.make_student(2)
+
+    def bulk(self, reports_data):
+        return BulkDailyReportSerializer(
+            data={'date': '2025-01-15', 'class_level': self.class_level.id, 'reports_data': reports_data},
+            context={'request': SimpleNamespace(user=self.teacher.user)}
+        )
+
+    def report_data(self, student, **fields):
+        return {
+            'student_id': student.id, 'general_notes': 'Good day', 'mood_behavior': 'Happy',
+            'subjects_data': [{
+                'subject': self.maths.id, 'topics_covered': ['Counting'], 'learning_objectives': 'Count to 20',
+                'rubric_rating': 'working', 'performance_notes': 'Counted to 15'
+            }],
+            **fields
+        }
+
+    def test_reports_subject_rows_and_progression_are_created_together(self):
+        serializer = self.bulk([self.report_data(self.first), self.report_data(self.second, homework_completed=True)])
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        reports = serializer.save()
+
+        self.assertEqual([report.student_id for report in reports], [self.first.id, self.second.id])
+        self.assertTrue(all(report.pk for report in reports))
+        self.assertEqual(DailySubjectReport.objects.filter(daily_report__in=reports).count(), 2)
+        self.assertTrue(DailyReport.objects.get(student=self.second).homework_completed)
+        self.assertEqual(
+            RubricProgression.objects.filter(topic='Counting', latest_rating='working').count(), 2
+        )
+
+    def test_invalid_values_are_reported_per_row_instead_of_failing_the_insert(self):
+        bad_subject = self.report_data(self.second)
+        bad_subject['subjects_data'][0]['rubric_rating'] = 'excellent'
+        serializer = self.bulk([self.report_data(self.first, mood_behavior='x' * 201), bad_subject])
+
+        self.assertFalse(serializer.is_valid())
+        errors = serializer.errors['reports_data']
+        self.assertEqual(set(errors), {0, 1})
+        self.assertIn('mood_behavior', errors[0])
+        self.assertIn('rubric_rating', errors[1]['subjects_data'][0])
+        self.assertFalse(DailyReport.objects.exists())
+
+    def test_templates_expand_shared_fields_and_per_student_overrides(self):
+        serializer = DailyReportTemplateSerializer(data={
+            'date': '2025-01-15',
+            'class_level': self.class_level.id,
+            'shared': {'general_notes': 'Trip to the museum', 'mood_behavior': 'Excited'},
+            'subjects': [{
+                'subject': self.maths.id, 'topics_covered': ['Counting'], 'learning_objectives': 'Count exhibits',
+                'activities_completed': ['Tally chart']
+            }],
+            'students': [
+                {'student_id': self.first.id, 'subjects': {
+                    str(self.maths.id): {'rubric_rating': 'mastered', 'performance_notes': 'Counted every exhibit'}
+                }},
+                {'student_id': self.second.id, 'mood_behavior': 'Tired'},
+            ],
+        }, context={'request': SimpleNamespace(user=self.teacher.user)})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        serializer.save()
+
+        first = DailyReport.objects.get(student=self.first)
+        second = DailyReport.objects.get(student=self.second)
+        self.assertEqual((first.general_notes, first.mood_behavior), ('Trip to the museum', 'Excited'))
+        self.assertEqual((second.general_notes, second.mood_behavior), ('Trip to the museum', 'Tired'))
+        first_maths, second_maths = first.subject_reports.get(), second.subject_reports.get()
+        self.assertEqual(first_maths.activities_completed, ['Tally chart'])
+        self.assertEqual((first_maths.rubric_rating, second_maths.rubric_rating), ('mastered', 'introduced'))
+
+
+class BulkSendDailyReportTests(SchoolTestCase):
+
+    def test_teachers_only_send_their_own_unsent_reports(self):
+        other_teacher = self.make_teacher('other', 'Olive')
+        day = date(2025, 1, 15)
+        own = self.make_daily_report(self.make_student(1), day)
+        theirs = self.make_daily_report(self.make_student(2), day, teacher=other_teacher)
+        already_sent = self.make_daily_report(
+            self.make_student(3), day, sent_to_parent=True, sent_at=timezone.now() - timedelta(hours=1)
+        )
+
+        request = APIRequestFactory().post(
+            '/daily-reports/send/', {'report_ids': [own.id, theirs.id, already_sent.id]}, format='json'
+        )
+        force_authenticate(request, user=self.teacher.user)
+        response = BulkSendDailyReportsView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['report_ids'], [own.id])
+        self.assertEqual(response.data['skipped_ids'], sorted([theirs.id, already_sent.id]))
+        sent = dict(DailyReport.objects.values_list('id', 'sent_to_parent'))
+        self.assertEqual(sent, {own.id: True, theirs.id: False, already_sent.id: True})
+
+
+class ReportSearchTests(SchoolTestCase):
+
+    def test_matches_are_ranked_scoped_and_headlines_escaped(self):
+        other_teacher = self.make_teacher('other', 'Olive')
+        day = date(2025, 1, 15)
+        match = self.make_daily_report(self.make_student(1), day, general_notes='Built a <b>volcano</b> model')
+        self.make_daily_report(self.make_student(2), day, general_notes='Painted a volcano', teacher=other_teacher)
+        self.make_daily_report(self.make_student(3), day, general_notes='Read a story')
+
+        # The search vector is maintained by a database trigger, so the new rows are searchable at once
+        results = search_reports('volcano', kinds=['daily'], teacher_id=self.teacher.id)
+
+        self.assertEqual([result['id'] for result in results], [match.id])
+        headline = results[0]['headline']
+        self.assertIn('<mark>volcano</mark>', headline)
+        self.assertNotIn('<b>', headline)
+        self.assertEqual(len(search_reports('volcano', kinds=['daily'])), 2)
@@ -8,6 +8,12 @@ urlpatterns = [
     path('subjects/<int:pk>/', views.SubjectDetailView.as_view(), name='subject-detail'),
     path('class-levels/', views.ClassLevelListCreateView.as_view(), name='class-level-list-create'),
     path('class-levels/<int:pk>/', views.ClassLevelDetailView.as_view(), name='class-level-detail'),
+    path('term-calendars/', views.TermCalendarListCreateView.as_view(), name='term-calendar-list-create'),
+    path('term-calendars/<int:pk>/', views.TermCalendarDetailView.as_view(), name='term-calendar-detail'),
+    path('grading-schemes/', views.GradingSchemeListCreateView.as_view(), name='grading-scheme-list-create'),
+    path('grading-schemes/<int:pk>/', views.GradingSchemeDetailView.as_view(), name='grading-scheme-detail'),
+    path('grading-schemes/recompute/', views.RecomputeGradesView.as_view(), name='grading-scheme-recompute'),
+    path('promotions/', views.PromotionView.as_view(), name='promotion'),
 
     # ========== ATTENDANCE ENDPOINTS ==========
     path('attendance/', views.AttendanceListCreateView.as_view(), name='attendance-list-create'),
@@ -15,28 +21,50 @@ urlpatterns = [
     path('attendance/bulk/', views.BulkAttendanceView.as_view(), name='attendance-bulk'),
     path('attendance/report/', views.AttendanceReportView.as_view(), name='attendance-report'),
     path('attendance/class-summary/', views.ClassAttendanceSummaryView.as_view(), name='class-attendance-summary'),
+    path('attendance/check-in/', views.GateCheckInView.as_view(), name='attendance-check-in'),
+    path('attendance/biometric-import/', views.BiometricLogImportView.as_view(), name='attendance-biometric-import'),
+    path('attendance/export/', views.AttendanceExportView.as_view(), name='attendance-export'),
+    path('attendance/calendar/<int:student_id>/', views.StudentAttendanceCalendarView.as_view(),
+         name='student-attendance-calendar'),
 
     # ========== DAILY REPORT ENDPOINTS ==========
     path('daily-reports/', views.DailyReportListCreateView.as_view(), name='daily-report-list-create'),
     path('daily-reports/<int:pk>/', views.DailyReportDetailView.as_view(), name='daily-report-detail'),
     path('daily-reports/bulk/', views.BulkDailyReportView.as_view(), name='daily-report-bulk'),
+    path('daily-reports/from-template/', views.DailyReportFromTemplateView.as_view(),
+         name='daily-report-from-template'),
+    path('daily-reports/send-to-parents/', views.BulkSendDailyReportsView.as_view(), name='send-daily-reports-bulk'),
     path('daily-reports/<int:report_id>/send-to-parent/', views.SendDailyReportToParentView.as_view(),
          name='send-daily-report'),
+    path('reports/search/', views.ReportSearchView.as_view(), name='report-search'),
 
     # ========== WEEKLY REPORT ENDPOINTS ==========
     path('weekly-reports/', views.WeeklyReportListCreateView.as_view(), name='weekly-report-list-create'),
     path('weekly-reports/<int:pk>/', views.WeeklyReportDetailView.as_view(), name='weekly-report-detail'),
+    path('weekly-reports/generate/', views.GenerateWeeklyReportsView.as_view(), name='weekly-report-generate'),
 
     # ========== TERM REPORT ENDPOINTS ==========
     path('term-reports/', views.TermReportListCreateView.as_view(), name='term-report-list-create'),
     path('term-reports/<int:pk>/', views.TermReportDetailView.as_view(), name='term-report-detail'),
+    path('term-reports/bulk-grade/', views.BulkTermGradingView.as_view(), name='term-report-bulk-grade'),
+    path('term-reports/fill-attendance/', views.FillTermAttendanceView.as_view(),
+         name='term-report-fill-attendance'),
     path('term-reports/<int:report_id>/finalize/', views.FinalizeTermReportView.as_view(), name='finalize-term-report'),
+    path('term-reports/finalize/', views.BulkFinalizeTermReportsView.as_view(), name='finalize-term-reports-bulk'),
+    path('term-reports/<int:report_id>/report-card/', views.TermReportCardView.as_view(), name='term-report-card'),
+    path('term-reports/report-cards/', views.ClassReportCardsArchiveView.as_view(), name='term-report-cards-archive'),
 
     # ========== DASHBOARD & ANALYTICS ENDPOINTS ==========
     path('dashboard/', views.ReportingDashboardView.as_view(), name='reporting-dashboard'),
     path('analytics/student/<int:student_id>/', views.StudentProgressAnalyticsView.as_view(), name='student-analytics'),
+    path('analytics/student/<int:student_id>/mastery/', views.StudentMasteryTimelineView.as_view(),
+         name='student-mastery-timeline'),
     path('analytics/class/<int:class_level_id>/', views.ClassPerformanceAnalyticsView.as_view(),
          name='class-analytics'),
+    path('analytics/student/<int:student_id>/term-comparison/', views.StudentTermComparisonView.as_view(),
+         name='student-term-comparison'),
+    path('analytics/class/<int:class_level_id>/term-comparison/', views.ClassTermComparisonView.as_view(),
+         name='class-term-comparison'),
 
     # ========== PARENT ACCESS ENDPOINTS ==========
     path('parent/reports/', views.ParentStudentReportsView.as_view(), name='parent-student-reports'),
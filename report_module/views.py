@@ -1,13 +1,17 @@
 # report_module/views.py
+import csv
+import io
+from django.core.files.storage import default_storage
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Avg, Count, Sum
+from django.db.models import Q, Avg, Count, Sum, Exists, OuterRef
 from django.utils import timezone
 from datetime import datetime, timedelta
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import action
-from django.db import transaction
+from django.db import connection, transaction
 from django.core.exceptions import ValidationError
 from django.apps import apps
 
@@ -15,9 +19,22 @@ from admin_app.permission import IsSchoolAdmin, AnyOf
 from teacher_app.permission import IsTeacher
 from student_app.permission import IsStudent
 
+from .attendance import ingest_punch_log, fill_term_attendance
+from .comparison import term_comparisons, term_ordinal
+from .grading import upsert_term_scores
+from .notifications import enqueue_daily_report_notifications
+from .pagination import DateIdKeysetPagination
+from .pdf import PdfEncodingError
+from .promotion import plan_promotion, run_promotion
+from .report_cards import render_report_cards, stream_report_card_zip
+from .search import search_reports
+from .tasks import recompute_term_grades
+from .weekly import generate_weekly_reports
+
 from .models import (
     Subject, ClassLevel, Attendance, DailyReport, DailySubjectReport,
-    WeeklyReport, WeeklySubjectSummary, TermReport, TermSubjectReport
+    WeeklyReport, WeeklySubjectSummary, TermReport, TermSubjectReport,
+    TermCalendar, AttendanceBitmap, GateScan, RubricProgression, GradingScheme
 )
 from .serializer import (
     SubjectSerializer, ClassLevelSerializer, AttendanceSerializer,
@@ -27,7 +44,12 @@ from .serializer import (
     TermReportSerializer, TermSubjectReportSerializer,
     StudentAttendanceSummarySerializer, ClassAttendanceSummarySerializer,
     StudentProgressSummarySerializer, ReportingDashboardSerializer,
-    BulkDailyReportSerializer, ReportExportSerializer
+    BulkDailyReportSerializer, ReportExportSerializer, TermCalendarSerializer,
+    GateScanSerializer, BiometricLogUploadSerializer, DailyReportProjection,
+    DailyReportTemplateSerializer, BulkSendDailyReportSerializer, ReportSearchSerializer,
+    WeeklyReportGenerateSerializer, BulkTermGradingSerializer, GradingSchemeSerializer,
+    RecomputeGradesSerializer, TermAttendanceFillSerializer, BulkFinalizeTermReportSerializer,
+    ReportCardArchiveSerializer, TermComparisonSerializer, PromotionSerializer
 )
 
 
@@ -80,15 +102,119 @@ class ClassLevelDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsSchoolAdmin]
 
 
+class TermCalendarListCreateView(generics.ListCreateAPIView):
+    """List term calendars or create a new one"""
+    queryset = TermCalendar.objects.all()
+    serializer_class = TermCalendarSerializer
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def get_permissions(self):
+        # Term dates define the school year and rebuild every bitmap, so only admins write them
+        if self.request.method not in permissions.SAFE_METHODS:
+            return [IsSchoolAdmin()]
+        return super().get_permissions()
+
+    def get_queryset(self):
+        queryset = TermCalendar.objects.all()
+        academic_year = self.request.query_params.get('academic_year', None)
+        if academic_year:
+            queryset = queryset.filter(academic_year=academic_year)
+        return queryset.order_by('-start_date')
+
+    def perform_create(self, serializer):
+        term_calendar = serializer.save()
+        term_calendar.rebuild_bitmaps()
+
+
+class TermCalendarDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """Retrieve, update or delete a term calendar"""
+    queryset = TermCalendar.objects.all()
+    serializer_class = TermCalendarSerializer
+    permission_classes = [IsSchoolAdmin]
+
+    def perform_update(self, serializer):
+        # Day offsets in the bitmaps depend on the term dates
+        term_calendar = serializer.save()
+        term_calendar.rebuild_bitmaps()
+
+
+class GradingSchemeListCreateView(generics.ListCreateAPIView):
+    """List grading schemes or create a new one"""
+    serializer_class = GradingSchemeSerializer
+    permission_classes = [IsSchoolAdmin]
+
+    def get_queryset(self):
+        return GradingScheme.objects.prefetch_related('boundaries').order_by('-is_active', 'name')
+
+
+class GradingSchemeDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """Retrieve, update or delete a grading scheme"""
+    queryset = GradingScheme.objects.prefetch_related('boundaries')
+    serializer_class = GradingSchemeSerializer
+    permission_classes = [IsSchoolAdmin]
+
+
+class RecomputeGradesView(APIView):
+    """Queue a regrade of an academic year's subject scores under the active grading scheme"""
+    permission_classes = [IsSchoolAdmin]
+
+    def post(self, request, *args, **kwargs):
+        serializer = RecomputeGradesSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        recompute_term_grades.delay(
+            connection.schema_name,
+            serializer.validated_data['academic_year'],
+            serializer.validated_data['include_finalized']
+        )
+        return Response({
+            'message': f"Recomputing grades for {serializer.validated_data['academic_year']}"
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class PromotionView(APIView):
+    """Preview or run the end-of-year promotion and academic-year rollover"""
+    permission_classes = [IsSchoolAdmin]
+
+    def post(self, request, *args, **kwargs):
+        serializer = PromotionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        class_level_ids = [level.id for level in data.get('class_levels', [])]
+        if data['dry_run']:
+            return Response({
+                'dry_run': True,
+                'from_academic_year': data['from_academic_year'],
+                'to_academic_year': data['to_academic_year'],
+                'classes': plan_promotion(data['from_academic_year'], class_level_ids)
+            }, status=status.HTTP_200_OK)
+
+        classes = run_promotion(data['from_academic_year'], data['to_academic_year'], class_level_ids)
+        skipped = [entry['class_level'] for entry in classes if entry['result'] is None]
+        return Response({
+            'dry_run': False,
+            'message': f'Rolled {len(classes) - len(skipped)} classes over to {data["to_academic_year"]}',
+            'from_academic_year': data['from_academic_year'],
+            'to_academic_year': data['to_academic_year'],
+            'classes': classes,
+            'skipped_unconfigured': skipped
+        }, status=status.HTTP_200_OK)
+
+
 # ========== ATTENDANCE VIEWS ==========
 
 class AttendanceListCreateView(generics.ListCreateAPIView):
-    """List attendance records or mark attendance"""
+    """List attendance records (keyset paginated, newest first) or mark attendance"""
     serializer_class = AttendanceSerializer
     permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+    pagination_class = DateIdKeysetPagination
 
     def get_queryset(self):
-        queryset = Attendance.objects.all()
+        # Load the users behind student and recorded_by in the same query as the attendance rows
+        queryset = Attendance.objects.select_related('student__user', 'recorded_by__user')
 
         # Filter by date
         date = self.request.query_params.get('date', None)
@@ -100,14 +226,24 @@ class AttendanceListCreateView(generics.ListCreateAPIView):
         if student_id:
             queryset = queryset.filter(student_id=student_id)
 
+        # Filter by class level name, like the attendance report and export
+        class_level = self.request.query_params.get('class_level', None)
+        if class_level:
+            queryset = queryset.filter(student__class_level__name=class_level)
+
+        # Filter by status
+        attendance_status = self.request.query_params.get('status', None)
+        if attendance_status:
+            queryset = queryset.filter(status=attendance_status)
+
         # Filter by date range
         start_date = self.request.query_params.get('start_date', None)
         end_date = self.request.query_params.get('end_date', None)
         if start_date and end_date:
             queryset = queryset.filter(date__range=[start_date, end_date])
 
-        return queryset.order_by('-date', 'student__user__first_name')
-
+        # Ordering matches the (date, id) keyset used by the paginator
+        return queryset.order_by('-date', '-id')
 
 
 class AttendanceDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -130,6 +266,57 @@ class BulkAttendanceView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class GateCheckInView(APIView):
+    """
+    Accept gate scanner check-ins by admission number.
+
+    Scans are only queued here (one INSERT) and acknowledged straight away; the
+    flush_gate_scans command folds them into Attendance in batches.
+    """
+    permission_classes = [IsTeacher]
+
+    def post(self, request, *args, **kwargs):
+        many = isinstance(request.data, list)
+        serializer = GateScanSerializer(data=request.data, many=many)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        scans_data = serializer.validated_data if many else [serializer.validated_data]
+        now = timezone.now()
+        teacher = request.user.teacher_profile
+        scans = GateScan.objects.bulk_create([
+            GateScan(
+                admission_number=scan['admission_number'],
+                scanned_at=scan.get('scanned_at', now),
+                device_id=scan.get('device_id', ''),
+                recorded_by=teacher
+            )
+            for scan in scans_data
+        ])
+
+        return Response({
+            'queued': len(scans),
+            'scan_ids': [scan.id for scan in scans]
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class BiometricLogImportView(APIView):
+    """Import a biometric device punch log file into attendance"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def post(self, request, *args, **kwargs):
+        serializer = BiometricLogUploadSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Read the upload line by line instead of loading it into memory
+        upload = serializer.validated_data['file']
+        lines = io.TextIOWrapper(upload.file, encoding=serializer.validated_data['encoding'], errors='replace')
+        stats = ingest_punch_log(lines, serializer.validated_data['recorded_by'])
+
+        return Response(stats, status=status.HTTP_200_OK)
+
+
 class AttendanceReportView(APIView):
     """Generate attendance reports"""
     permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
@@ -187,6 +374,104 @@ class AttendanceReportView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class Echo:
+    """File-like object whose write() hands the value back, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
+
+class AttendanceExportView(APIView):
+    """Stream attendance records as CSV, filtered like the attendance report"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+    chunk_size = 2000
+
+    header = [
+        'date', 'admission_number', 'first_name', 'last_name', 'class_level',
+        'status', 'time_in', 'time_out', 'notes'
+    ]
+
+    def get(self, request, *args, **kwargs):
+        serializer = AttendanceReportSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        start_date = serializer.validated_data['start_date']
+        end_date = serializer.validated_data['end_date']
+        student_id = serializer.validated_data.get('student_id')
+        class_level = serializer.validated_data.get('class_level')
+
+        queryset = Attendance.objects.filter(date__range=[start_date, end_date])
+        if student_id:
+            queryset = queryset.filter(student_id=student_id)
+        if class_level:
+            queryset = queryset.filter(student__class_level__name=class_level)
+
+        # Student names come from the same query; iterator() reads through a server-side cursor
+        rows = queryset.order_by('date', 'id').values_list(
+            'date', 'student__admission_number', 'student__user__first_name',
+            'student__user__last_name', 'student__class_level__name',
+            'status', 'time_in', 'time_out', 'notes'
+        ).iterator(chunk_size=self.chunk_size)
+
+        writer = csv.writer(Echo())
+
+        def stream():
+            yield writer.writerow(self.header)
+            for row in rows:
+                yield writer.writerow(row)
+
+        response = StreamingHttpResponse(stream(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="attendance_{start_date}_{end_date}.csv"'
+        return response
+
+
+class StudentAttendanceCalendarView(APIView):
+    """Get a student's attendance calendar and statistics for a term"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def get(self, request, student_id, *args, **kwargs):
+        StudentProfile = get_student_profile_model()
+        student = get_object_or_404(StudentProfile.objects.select_related('user'), id=student_id)
+
+        academic_year = request.query_params.get('academic_year')
+        term = request.query_params.get('term')
+        if academic_year and term:
+            term_calendar = TermCalendar.objects.filter(academic_year=academic_year, term=term).first()
+        else:
+            # Default to the term running today, otherwise the most recent one
+            today = timezone.now().date()
+            term_calendar = (
+                TermCalendar.objects.filter(start_date__lte=today, end_date__gte=today).first()
+                or TermCalendar.objects.filter(start_date__lte=today).order_by('-start_date').first()
+            )
+
+        if term_calendar is None:
+            return Response({
+                'error': 'Term calendar not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        bitmap = AttendanceBitmap.objects.filter(student=student, term_calendar=term_calendar).first()
+        if bitmap is None:
+            bitmap = AttendanceBitmap(student=student, term_calendar=term_calendar, days=b'')
+        else:
+            bitmap.term_calendar = term_calendar
+
+        return Response({
+            'student': {
+                'id': student.id,
+                'name': student.user.get_full_name(),
+                'admission_number': student.admission_number
+            },
+            'term': TermCalendarSerializer(term_calendar).data,
+            'days': [
+                {'date': date, 'status': day_status}
+                for date, day_status in bitmap.iter_days()
+            ],
+            'summary': bitmap.summary()
+        }, status=status.HTTP_200_OK)
+
+
 class ClassAttendanceSummaryView(APIView):
     """Get attendance summary by class"""
     permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
@@ -255,6 +540,17 @@ class DailyReportListCreateView(generics.ListCreateAPIView):
         if student_id:
             queryset = queryset.filter(student_id=student_id)
 
+        # Filter by class level
+        class_level = self.request.query_params.get('class_level', None)
+        if class_level:
+            queryset = queryset.filter(class_level_id=class_level)
+
+        # Filter by date range
+        start_date = self.request.query_params.get('start_date', None)
+        end_date = self.request.query_params.get('end_date', None)
+        if start_date and end_date:
+            queryset = queryset.filter(date__range=[start_date, end_date])
+
         # Filter by teacher (if teacher is making request)
         if hasattr(self.request.user, 'teacher_profile'):
             if not hasattr(self.request.user, 'admin_profile'):
@@ -262,6 +558,19 @@ class DailyReportListCreateView(generics.ListCreateAPIView):
 
         return queryset.order_by('-date', 'student__user__first_name')
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        # ?projection=true serves the read-only fast path
+        if request.query_params.get('projection') in ('1', 'true'):
+            return Response(DailyReportProjection.serialize(queryset), status=status.HTTP_200_OK)
+
+        queryset = queryset.select_related(
+            'student__user', 'teacher__user', 'class_level'
+        ).prefetch_related('subject_reports__subject')
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
 class DailyReportDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a daily report"""
@@ -284,6 +593,23 @@ class BulkDailyReportView(APIView):
 
     def post(self, request, *args, **kwargs):
         serializer = BulkDailyReportSerializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            reports = serializer.save()
+            # Students, subjects and subject reports are already loaded by the serializer
+            response_data = DailyReportSerializer(reports, many=True).data
+            return Response({
+                'message': f'Successfully created {len(reports)} daily reports',
+                'reports': response_data
+            }, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class DailyReportFromTemplateView(APIView):
+    """Create a whole class's daily reports from one template and per-student overrides"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def post(self, request, *args, **kwargs):
+        serializer = DailyReportTemplateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             reports = serializer.save()
             response_data = DailyReportSerializer(reports, many=True).data
@@ -310,17 +636,18 @@ class SendDailyReportToParentView(APIView):
                             'error': 'You can only send your own reports'
                         }, status=status.HTTP_403_FORBIDDEN)
 
-            # Mark as sent
-            report.sent_to_parent = True
-            report.sent_at = timezone.now()
-            report.save()
-
-            # Here you would typically send an email or notification to parents
-            # For now, we'll just return success
+            # Mark as sent and queue the parent emails in the same transaction;
+            # the notification worker delivers them outside the request
+            with transaction.atomic():
+                report.sent_to_parent = True
+                report.sent_at = timezone.now()
+                report.save()
+                queued = enqueue_daily_report_notifications([report.id])
 
             return Response({
                 'message': 'Daily report sent to parent successfully',
-                'sent_at': report.sent_at
+                'sent_at': report.sent_at,
+                'notifications_queued': queued
             }, status=status.HTTP_200_OK)
 
         except DailyReport.DoesNotExist:
@@ -329,6 +656,83 @@ class SendDailyReportToParentView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 
+class BulkSendDailyReportsView(APIView):
+    """Mark a class's (or a list of) unsent daily reports as sent and queue the parent notifications"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def post(self, request, *args, **kwargs):
+        serializer = BulkSendDailyReportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        now = timezone.now()
+        conditions = ['sent_to_parent = FALSE']
+        params = [now, now]
+        if 'report_ids' in data:
+            conditions.append('id = ANY(%s)')
+            params.append(data['report_ids'])
+        else:
+            conditions.append('class_level_id = %s AND date = %s')
+            params.extend([data['class_level'].id, data['date']])
+
+        # Teachers can only send their own reports; enforced in the UPDATE itself
+        if hasattr(request.user, 'teacher_profile'):
+            if not hasattr(request.user, 'admin_profile'):
+                conditions.append('teacher_id = %s')
+                params.append(request.user.teacher_profile.id)
+
+        sql = (
+            f"UPDATE {connection.ops.quote_name(DailyReport._meta.db_table)} "
+            f"SET sent_to_parent = TRUE, sent_at = %s, updated_at = %s "
+            f"WHERE {' AND '.join(conditions)} RETURNING id"
+        )
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                sent_ids = [row[0] for row in cursor.fetchall()]
+            queued = enqueue_daily_report_notifications(sent_ids) if sent_ids else 0
+
+        response = {
+            'message': f'Sent {len(sent_ids)} daily reports to parents',
+            'sent_at': now,
+            'report_ids': sent_ids,
+            'notifications_queued': queued
+        }
+        if 'report_ids' in data:
+            # Not found, not yours, or already sent
+            response['skipped_ids'] = sorted(set(data['report_ids']) - set(sent_ids))
+        return Response(response, status=status.HTTP_200_OK)
+
+
+class ReportSearchView(APIView):
+    """Ranked full-text search over daily, subject and term report narratives"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params.copy()
+        if 'type' in params:
+            params.setlist('type', params['type'].split(','))
+        serializer = ReportSearchSerializer(data=params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        # Teachers only search their own reports
+        teacher_id = None
+        if hasattr(request.user, 'teacher_profile') and not hasattr(request.user, 'admin_profile'):
+            teacher_id = request.user.teacher_profile.id
+
+        results = search_reports(
+            data['q'], kinds=data.get('type'), class_level_id=data.get('class_level'),
+            start_date=data.get('start_date'), end_date=data.get('end_date'),
+            teacher_id=teacher_id, limit=data['limit']
+        )
+        return Response({'query': data['q'], 'count': len(results), 'results': results},
+                        status=status.HTTP_200_OK)
+
+
 # ========== WEEKLY REPORT VIEWS ==========
 
 class WeeklyReportListCreateView(generics.ListCreateAPIView):
@@ -372,6 +776,31 @@ class WeeklyReportDetailView(generics.RetrieveUpdateDestroyAPIView):
         return queryset
 
 
+class GenerateWeeklyReportsView(APIView):
+    """Draft a class's weekly reports from that week's attendance and daily reports"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def post(self, request, *args, **kwargs):
+        serializer = WeeklyReportGenerateSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        reports, skipped = generate_weekly_reports(
+            serializer.validated_data['class_level'],
+            serializer.validated_data['week_start_date'],
+            serializer.validated_data['teacher']
+        )
+        reports = WeeklyReport.objects.filter(id__in=[report.id for report in reports]).select_related(
+            'student__user', 'teacher__user', 'class_level'
+        ).prefetch_related('subject_summaries__subject').order_by('student__user__first_name')
+
+        return Response({
+            'message': f'Drafted {len(reports)} weekly reports',
+            'skipped_student_ids': skipped,
+            'reports': WeeklyReportSerializer(reports, many=True).data
+        }, status=status.HTTP_201_CREATED)
+
+
 # ========== TERM REPORT VIEWS ==========
 
 class TermReportListCreateView(generics.ListCreateAPIView):
@@ -402,7 +831,10 @@ class TermReportListCreateView(generics.ListCreateAPIView):
             if not hasattr(self.request.user, 'admin_profile'):
                 queryset = queryset.filter(teacher=self.request.user.teacher_profile)
 
-        return queryset.order_by('-academic_year', 'term', 'student__user__first_name')
+        # overall_average is stored, so only the nested subject rows need loading
+        return queryset.select_related(
+            'student__user', 'teacher__user', 'class_level'
+        ).prefetch_related('subject_reports__subject').order_by('-academic_year', 'term', 'student__user__first_name')
 
 
 class TermReportDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -457,6 +889,189 @@ class FinalizeTermReportView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 
+class BulkFinalizeTermReportsView(APIView):
+    """Finalize every ready term report of a class and term (or a list of ids) at once"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def post(self, request, *args, **kwargs):
+        serializer = BulkFinalizeTermReportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        if 'report_ids' in data:
+            reports = TermReport.objects.filter(id__in=data['report_ids'])
+        else:
+            reports = TermReport.objects.filter(
+                class_level=data['class_level'], academic_year=data['academic_year'], term=data['term']
+            )
+
+        # Teachers can only finalize their own reports
+        teacher_id = None
+        if hasattr(request.user, 'teacher_profile'):
+            if not hasattr(request.user, 'admin_profile'):
+                teacher_id = request.user.teacher_profile.id
+
+        now = timezone.now()
+        skipped = []
+        with transaction.atomic():
+            # One locked read checks ownership, state and subject rows for every report
+            candidates = reports.select_for_update().annotate(
+                has_subjects=Exists(TermSubjectReport.objects.filter(term_report=OuterRef('pk')))
+            ).values_list('id', 'teacher_id', 'finalized', 'has_subjects')
+
+            ready = []
+            for report_id, report_teacher_id, finalized, has_subjects in candidates:
+                if teacher_id is not None and report_teacher_id != teacher_id:
+                    skipped.append({'id': report_id, 'reason': 'You can only finalize your own reports'})
+                elif finalized:
+                    skipped.append({'id': report_id, 'reason': 'Already finalized'})
+                elif not has_subjects:
+                    skipped.append({'id': report_id, 'reason': 'Cannot finalize report without subject reports'})
+                else:
+                    ready.append(report_id)
+
+            finalized_count = TermReport.objects.filter(id__in=ready).update(
+                finalized=True, finalized_at=now, updated_at=now
+            )
+
+        if 'report_ids' in data:
+            seen = set(ready) | {entry['id'] for entry in skipped}
+            skipped.extend(
+                {'id': report_id, 'reason': 'Term report not found'}
+                for report_id in sorted(set(data['report_ids']) - seen)
+            )
+
+        return Response({
+            'message': f'Finalized {finalized_count} term reports',
+            'finalized_at': now,
+            'finalized_ids': ready,
+            'skipped': skipped
+        }, status=status.HTTP_200_OK)
+
+
+class FillTermAttendanceView(APIView):
+    """Fill a class's term report attendance figures from the recorded attendance"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def post(self, request, *args, **kwargs):
+        serializer = TermAttendanceFillSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Teachers only fill their own reports
+        teacher = None
+        if hasattr(request.user, 'teacher_profile') and not hasattr(request.user, 'admin_profile'):
+            teacher = request.user.teacher_profile
+
+        reports = fill_term_attendance(
+            serializer.validated_data['term_calendar'], serializer.validated_data['class_level'], teacher
+        )
+        return Response({
+            'message': f'Filled attendance for {len(reports)} term reports',
+            'reports': [
+                {
+                    'id': report.id,
+                    'student': report.student_id,
+                    'total_school_days': report.total_school_days,
+                    'days_present': report.days_present,
+                    'days_absent': report.days_absent,
+                    'days_late': report.days_late,
+                    'attendance_percentage': report.attendance_percentage
+                }
+                for report in reports
+            ]
+        }, status=status.HTTP_200_OK)
+
+
+class BulkTermGradingView(APIView):
+    """Grade a class x subject score matrix for one term in a single upsert"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def post(self, request, *args, **kwargs):
+        serializer = BulkTermGradingSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = upsert_term_scores(serializer.validated_data['entries'])
+        return Response({
+            'message': f'Graded {len(rows)} subject scores',
+            'results': [
+                {
+                    'term_report': row.term_report_id,
+                    'subject': row.subject_id,
+                    'total_score': row.total_score,
+                    'grade': row.grade
+                }
+                for row in rows
+            ]
+        }, status=status.HTTP_200_OK)
+
+
+class TermReportCardView(APIView):
+    """Download a term report card as PDF, rendering it only if the stored copy is stale"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, report_id, *args, **kwargs):
+        user = request.user
+        reports = TermReport.objects.all()
+        if hasattr(user, 'admin_profile'):
+            pass
+        elif hasattr(user, 'teacher_profile'):
+            reports = reports.filter(teacher=user.teacher_profile)
+        elif hasattr(user, 'parent_profile'):
+            reports = reports.filter(student__in=user.parent_profile.children.all(), finalized=True)
+        else:
+            return Response({
+                'error': 'Access denied'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        report = reports.select_related('student').filter(id=report_id).first()
+        if report is None:
+            return Response({
+                'error': 'Term report not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            path = render_report_cards([report.id])[report.id]
+        except PdfEncodingError as exc:
+            return Response({
+                'error': str(exc)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        filename = f"{report.student.admission_number}-{report.academic_year}-{report.term}.pdf"
+        return FileResponse(
+            default_storage.open(path, 'rb'),
+            content_type='application/pdf',
+            filename=filename
+        )
+
+
+class ClassReportCardsArchiveView(APIView):
+    """Stream a ZIP of every report card of a class and term"""
+    permission_classes = [IsSchoolAdmin]
+
+    def get(self, request, *args, **kwargs):
+        serializer = ReportCardArchiveSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        reports = TermReport.objects.filter(
+            class_level=data['class_level'], academic_year=data['academic_year'], term=data['term']
+        )
+        if data['finalized_only']:
+            reports = reports.filter(finalized=True)
+        if not reports.exists():
+            return Response({
+                'error': 'No term reports found for this class and term'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        response = StreamingHttpResponse(stream_report_card_zip(reports), content_type='application/zip')
+        filename = f"report_cards_{data['class_level'].name}_{data['academic_year']}_{data['term']}.zip"
+        response['Content-Disposition'] = f'attachment; filename="{filename.replace(" ", "_")}"'
+        return response
+
+
 # ========== DASHBOARD AND ANALYTICS VIEWS ==========
 
 class ReportingDashboardView(APIView):
@@ -548,11 +1163,13 @@ class StudentProgressAnalyticsView(APIView):
             student = StudentProfile.objects.get(id=student_id)
 
             # Get term reports for analysis
-            term_reports = TermReport.objects.filter(student=student).order_by('-academic_year', 'term')
+            # Chronological, so the trend lists read oldest term first
+            term_reports = list(TermReport.objects.filter(student=student).prefetch_related(
+                'subject_reports__subject'
+            ).order_by(term_ordinal()))
 
-            # Get attendance summary
-            total_attendance = Attendance.objects.filter(student=student).count()
-            present_days = Attendance.objects.filter(student=student, status='present').count()
+            # Get attendance summary from the per-term bitmaps, plus any days no term covers
+            total_attendance, present_days = AttendanceBitmap.student_totals(student.id)
             attendance_rate = (present_days / total_attendance * 100) if total_attendance > 0 else 0
 
             # Get subject performance trends
@@ -569,16 +1186,13 @@ class StudentProgressAnalyticsView(APIView):
                         'rubric': subject_report.overall_rubric
                     })
 
-            # Calculate overall trends
+            # Calculate overall trends from the stored averages
             overall_scores = []
             for report in term_reports:
-                if report.subject_reports.exists():
-                    avg_score = report.subject_reports.aggregate(
-                        avg_score=Avg('total_score')
-                    )['avg_score']
+                if report.subject_count:
                     overall_scores.append({
                         'term': f"{report.term} {report.academic_year}",
-                        'average_score': round(float(avg_score), 2) if avg_score else 0
+                        'average_score': float(report.overall_average) if report.overall_average else 0
                     })
 
             analytics_data = {
@@ -597,7 +1211,7 @@ class StudentProgressAnalyticsView(APIView):
                     'overall_trends': overall_scores,
                     'subject_trends': subject_trends
                 },
-                'total_reports': term_reports.count()
+                'total_reports': len(term_reports)
             }
 
             return Response(analytics_data, status=status.HTTP_200_OK)
@@ -608,6 +1222,106 @@ class StudentProgressAnalyticsView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 
+class StudentTermComparisonView(APIView):
+    """Each subject score of a student next to the previous term's score, in term order"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def get(self, request, student_id, *args, **kwargs):
+        serializer = TermComparisonSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        StudentProfile = get_student_profile_model()
+        student = StudentProfile.objects.select_related('user').filter(id=student_id).first()
+        if student is None:
+            return Response({
+                'error': 'Student not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        data = serializer.validated_data
+        up_to = (data['academic_year'], data['term']) if 'academic_year' in data else None
+        comparisons = term_comparisons([student.id], up_to=up_to)
+        for row in comparisons:
+            del row['student_id']
+
+        return Response({
+            'student': {
+                'id': student.id,
+                'name': student.user.get_full_name(),
+                'admission_number': student.admission_number
+            },
+            'comparisons': comparisons
+        }, status=status.HTTP_200_OK)
+
+
+class ClassTermComparisonView(APIView):
+    """Term-over-term subject deltas for every student in a class, from one query"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def get(self, request, class_level_id, *args, **kwargs):
+        serializer = TermComparisonSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        class_level = ClassLevel.objects.filter(id=class_level_id).first()
+        if class_level is None:
+            return Response({
+                'error': 'Class level not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        # Students currently in the class, compared across their whole history
+        StudentProfile = get_student_profile_model()
+        students = StudentProfile.objects.filter(class_level=class_level)
+
+        data = serializer.validated_data
+        up_to = (data['academic_year'], data['term']) if 'academic_year' in data else None
+        comparisons = term_comparisons(students, up_to=up_to)
+
+        return Response({
+            'class_level': {'id': class_level.id, 'name': class_level.name},
+            'academic_year': data.get('academic_year'),
+            'term': data.get('term'),
+            'comparisons': comparisons
+        }, status=status.HTTP_200_OK)
+
+
+class StudentMasteryTimelineView(APIView):
+    """Per-topic rubric timeline for a student, read from the maintained progression table"""
+    permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
+
+    def get(self, request, student_id, *args, **kwargs):
+        progressions = RubricProgression.objects.filter(student_id=student_id)
+        subject_id = request.query_params.get('subject')
+        if subject_id:
+            progressions = progressions.filter(subject_id=subject_id)
+
+        # Ordered along the (student, subject, topic) unique index
+        subjects = {}
+        for row in progressions.order_by('subject_id', 'topic').values(
+            'subject_id', 'subject__name', 'topic', 'introduced_on', 'working_on', 'mastered_on',
+            'latest_rating', 'latest_on'
+        ):
+            subject = subjects.setdefault(row['subject_id'], {
+                'subject_id': row['subject_id'],
+                'subject_name': row['subject__name'],
+                'topics': []
+            })
+            subject['topics'].append({
+                'topic': row['topic'],
+                'introduced_on': row['introduced_on'],
+                'working_on': row['working_on'],
+                'mastered_on': row['mastered_on'],
+                'latest_rating': row['latest_rating'],
+                'latest_on': row['latest_on'],
+                'days_to_mastery': (
+                    (row['mastered_on'] - row['introduced_on']).days
+                    if row['mastered_on'] and row['introduced_on'] else None
+                )
+            })
+
+        return Response({'student_id': student_id, 'subjects': list(subjects.values())}, status=status.HTTP_200_OK)
+
+
 class ClassPerformanceAnalyticsView(APIView):
     """Get class performance analytics"""
     permission_classes = [AnyOf(IsSchoolAdmin, IsTeacher)]
@@ -651,19 +1365,14 @@ class ClassPerformanceAnalyticsView(APIView):
                     )['avg_score']
                     class_stats['class_average'] = round(float(class_average), 2) if class_average else 0
 
-                    # Subject averages
-                    subjects = Subject.objects.filter(
-                        termsubjectreport__term_report__in=term_reports
-                    ).distinct()
-
-                    for subject in subjects:
-                        subject_reports = all_subject_reports.filter(subject=subject)
-                        subject_avg = subject_reports.aggregate(
-                            avg_score=Avg('total_score')
-                        )['avg_score']
-                        class_stats['subject_averages'][subject.name] = round(
-                            float(subject_avg), 2
-                        ) if subject_avg else 0
+                    # Subject averages in one grouped query
+                    subject_averages = all_subject_reports.values('subject__name').annotate(
+                        avg_score=Avg('total_score')
+                    ).order_by('subject__name')
+                    for subject_avg in subject_averages:
+                        class_stats['subject_averages'][subject_avg['subject__name']] = round(
+                            float(subject_avg['avg_score']), 2
+                        ) if subject_avg['avg_score'] else 0
 
                     # Grade distribution
                     grade_counts = all_subject_reports.values('grade').annotate(
@@ -758,7 +1467,9 @@ class ParentStudentReportsView(APIView):
                 academic_year = request.query_params.get('academic_year')
                 if academic_year:
                     reports = reports.filter(academic_year=academic_year)
-                reports = reports.order_by('-academic_year', 'term')
+                reports = reports.select_related(
+                    'student__user', 'teacher__user', 'class_level'
+                ).prefetch_related('subject_reports__subject').order_by('-academic_year', 'term')
                 child_data['reports'] = TermReportSerializer(reports, many=True).data
 
             reports_data.append(child_data)
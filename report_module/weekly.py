@@ -0,0 +1,117 @@
+# report_module/weekly.py
+import json
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Attendance, DailyReport, DailySubjectReport, WeeklyReport, WeeklySubjectSummary
+
+
+# Use apps.get_model to avoid circular imports
+def get_student_profile_model():
+    return apps.get_model('student_app', 'StudentProfile')
+
+
+def modal_rubric(ratings):
+    """Most frequent rating; ties go to the one seen last in the week"""
+    counts = Counter(ratings)
+    last_seen = {rating: index for index, rating in enumerate(ratings)}
+    return max(counts, key=lambda rating: (counts[rating], last_seen[rating]))
+
+
+def merge_topics(topic_lists):
+    """Topics from every day in first-seen order, without repeats"""
+    # topics_covered is free-form JSON, so topics may be dicts or lists; compare them by their JSON form
+    merged = {}
+    for topics in topic_lists:
+        if not isinstance(topics, list):
+            topics = [topics] if topics else []
+        for topic in topics:
+            merged.setdefault(json.dumps(topic, sort_keys=True), topic)
+    return list(merged.values())
+
+
+@transaction.atomic
+def generate_weekly_reports(class_level, week_start, teacher):
+    """
+    Draft weekly reports for every student in a class from the week's daily data.
+
+    Attendance counts and the homework completion rate come from one grouped
+    aggregate each; subject summaries merge the week's DailySubjectReport rows
+    per student and subject. Students who already have a report for the week
+    are skipped. Narrative fields are left blank for the teacher to fill in.
+    Returns (created reports, skipped student ids).
+    """
+    StudentProfile = get_student_profile_model()
+    week_end = week_start + timedelta(days=6)
+
+    student_ids = set(StudentProfile.objects.filter(class_level=class_level).values_list('id', flat=True))
+    skipped = set(WeeklyReport.objects.filter(
+        student_id__in=student_ids, week_start_date=week_start
+    ).values_list('student_id', flat=True))
+    student_ids -= skipped
+    if not student_ids:
+        return [], sorted(skipped)
+
+    attendance = {
+        row['student_id']: row for row in Attendance.objects.filter(
+            student_id__in=student_ids, date__range=[week_start, week_end]
+        ).values('student_id').annotate(
+            present=Count('id', filter=Q(status='present')),
+            absent=Count('id', filter=Q(status='absent')),
+            late=Count('id', filter=Q(status='late'))
+        ).order_by()
+    }
+
+    homework = {
+        row['student_id']: row for row in DailyReport.objects.filter(
+            student_id__in=student_ids, date__range=[week_start, week_end]
+        ).values('student_id').annotate(
+            reports=Count('id'),
+            completed=Count('id', filter=Q(homework_completed=True))
+        ).order_by()
+    }
+
+    subject_days = {}
+    for row in DailySubjectReport.objects.filter(
+        daily_report__student_id__in=student_ids, daily_report__date__range=[week_start, week_end]
+    ).values_list(
+        'daily_report__student_id', 'subject_id', 'topics_covered', 'rubric_rating'
+    ).order_by('daily_report__date'):
+        student_id, subject_id, topics, rating = row
+        days = subject_days.setdefault((student_id, subject_id), ([], []))
+        days[0].append(topics)
+        days[1].append(rating)
+
+    reports = {}
+    for student_id in sorted(student_ids):
+        counts = attendance.get(student_id, {})
+        done = homework.get(student_id)
+        reports[student_id] = WeeklyReport(
+            student_id=student_id,
+            teacher=teacher,
+            week_start_date=week_start,
+            week_end_date=week_end,
+            class_level=class_level,
+            homework_completion_rate=round(done['completed'] * 100 / done['reports']) if done else 0,
+            days_present=counts.get('present', 0),
+            days_absent=counts.get('absent', 0),
+            days_late=counts.get('late', 0)
+        )
+
+    WeeklyReport.objects.bulk_create(reports.values())
+
+    WeeklySubjectSummary.objects.bulk_create([
+        WeeklySubjectSummary(
+            weekly_report=reports[student_id],
+            subject_id=subject_id,
+            topics_covered=merge_topics(topic_lists),
+            overall_rubric_rating=modal_rubric(ratings)
+        )
+        for (student_id, subject_id), (topic_lists, ratings) in subject_days.items()
+    ])
+
+    return list(reports.values()), sorted(skipped)
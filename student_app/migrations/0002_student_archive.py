@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='is_archived',
+            field=models.BooleanField(default=False),
+        ),
+    ]
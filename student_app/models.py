@@ -23,6 +23,9 @@ class StudentProfile(models.Model):
     academic_year = models.CharField(max_length=20)
     profile_picture = models.ImageField(upload_to='student_profiles/', blank=True)
     role = models.CharField(max_length=10, choices=Role.choices, default=Role.STUDENT)
+    # Set when the student graduates at the end of the final class level
+    is_archived = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(blank=True, null=True)
 
     def __str__(self):
         return f"{self.user.username} {self.role}"
\ No newline at end of file